@@ -0,0 +1,206 @@
+"""
+Adaptive sequential simulation with variance reduction.
+
+Matchups run in rounds. After each round, a matchup whose confidence
+interval on the first fighter's score (win 1, draw 0.5, loss 0) is
+narrower than `width` stops, and later rounds only go to matchups that are
+still uncertain. Lopsided matchups settle in a round or two.
+
+Two variance reduction tricks are used:
+
+* Antithetic d100s. Every replication is a pair of duels. The second
+  duel's `hit` rolls mirror the first's (`101 - roll`), so lucky and
+  unlucky streaks cancel within the pair. The pair's mean score is the
+  sample.
+* Common random numbers. Replication `r` uses the same seeds in every
+  matchup. Comparing two loadouts against the same opponent then
+  measures the loadouts, not the dice (see `compare`).
+"""
+import math
+import random
+
+import combat
+
+from collections import namedtuple
+from contextlib import contextmanager
+from simulation import build_fighter, duel, spec_key
+from typing import Dict, List, Optional
+
+DEFAULT_WIDTH = 0.05
+DEFAULT_ROUND = 50
+DEFAULT_MAX_PAIRS = 20000
+#Two-sided 95% normal quantile.
+Z_95 = 1.959964
+
+SequentialResult = namedtuple('SequentialResult', ('key', 'pairs', 'mean', 'half_width', 'converged'))
+
+class D100Stream:
+    """
+    A `combat.ROLLS.d100` source with its own RNG.
+    Given the rolls of another stream as `mirror_of`, it returns `101 - roll`
+    for each of them in order, then falls back to its own RNG.
+    """
+
+    def __init__(self, seed: int, mirror_of: Optional[List[int]]=None):
+        self.rng = random.Random(seed)
+        self.mirror_of = mirror_of
+        self.rolls: List[int] = []
+
+    def __call__(self) -> int:
+        idx = len(self.rolls)
+        if self.mirror_of is not None and idx < len(self.mirror_of):
+            roll = 101 - self.mirror_of[idx]
+        else:
+            roll = self.rng.randint(1, 100)
+        self.rolls.append(roll)
+        return roll
+
+@contextmanager
+def rolling_d100(source: D100Stream):
+    """Routes this thread's `combat.d100` rolls through `source` while active."""
+    saved = combat.ROLLS.d100
+    combat.ROLLS.d100 = source
+    try:
+        yield
+    finally:
+        combat.ROLLS.d100 = saved
+
+def replication_seed(seed: int, rep: int) -> int:
+    return seed * 1_000_003 + rep
+
+def score(first_spec: dict, second_spec: dict, rep_seed: int, stream: D100Stream) -> float:
+    """One seeded duel: 1 if the first fighter wins, 0.5 for a draw, 0 for a loss."""
+    first, second = build_fighter(first_spec), build_fighter(second_spec)
+    with rolling_d100(stream):
+        result = duel(first, second, rng=random.Random(rep_seed))
+    if result.winner is first:
+        return 1.0
+    elif result.winner is second:
+        return 0.0
+    return 0.5
+
+def antithetic_pair(first_spec: dict, second_spec: dict, rep_seed: int) -> float:
+    """Mean score of a duel and its mirrored-d100 twin."""
+    primary = D100Stream(rep_seed)
+    a = score(first_spec, second_spec, rep_seed, primary)
+    b = score(first_spec, second_spec, rep_seed, D100Stream(rep_seed ^ 0x5EED, primary.rolls))
+    return (a + b) / 2
+
+class MatchupRun:
+    """Per-replication scores of one matchup, in replication order."""
+
+    def __init__(self, first_spec: dict, second_spec: dict):
+        self.first_spec = first_spec
+        self.second_spec = second_spec
+        self.key = (spec_key(first_spec), spec_key(second_spec))
+        self.scores: List[float] = []
+
+    def run(self, seed: int, pairs: int):
+        start = len(self.scores)
+        for rep in range(start, start + pairs):
+            self.scores.append(antithetic_pair(self.first_spec, self.second_spec, replication_seed(seed, rep)))
+
+    @property
+    def mean(self) -> float:
+        return sum(self.scores) / len(self.scores) if self.scores else 0.0
+
+    def half_width(self, z: float=Z_95) -> float:
+        return half_width(self.scores, z)
+
+    def result(self, width: float) -> SequentialResult:
+        hw = self.half_width()
+        return SequentialResult(self.key, len(self.scores), self.mean, hw, 2 * hw <= width)
+
+def half_width(samples: List[float], z: float=Z_95, low: float=0.0, high: float=1.0) -> float:
+    """
+    Normal-approximation confidence half-width of the mean of `samples`, which lie in [`low`, `high`].
+    Like the Agresti-Coull interval, the variance is taken as if one `low` and one `high`
+    sample had been added, so a run of identical scores never reports a width of 0.
+    """
+    if len(samples) < 2:
+        return math.inf
+    padded = [*samples, low, high]
+    n = len(padded)
+    mean = sum(padded) / n
+    variance = sum((x - mean) ** 2 for x in padded) / (n - 1)
+    return z * math.sqrt(variance / n)
+
+def check_rounds(round_pairs: int, max_pairs: int):
+    if round_pairs < 1:
+        raise ValueError(f"round_pairs should be at least 1, got {round_pairs}")
+    if max_pairs < 2:
+        raise ValueError(f"max_pairs should be at least 2, got {max_pairs}")
+
+def run_adaptive(
+    matchups: List[tuple],
+    seed: int=0,
+    width: float=DEFAULT_WIDTH,
+    round_pairs: int=DEFAULT_ROUND,
+    max_pairs: int=DEFAULT_MAX_PAIRS,
+    min_rounds: int=2
+) -> List[MatchupRun]:
+    """
+    Runs `(first_spec, second_spec)` matchups in rounds of `round_pairs` antithetic pairs
+    until each one's confidence interval is at most `width` wide, or it reaches `max_pairs`.
+    Every matchup uses the same replication seeds.
+    """
+    check_rounds(round_pairs, max_pairs)
+    runs = [MatchupRun(first, second) for first, second in matchups]
+    active = list(runs)
+    rounds = 0
+    while active:
+        rounds += 1
+        for run in active:
+            run.run(seed, min(round_pairs, max_pairs - len(run.scores)))
+        if rounds >= min_rounds:
+            active = [
+                run for run in active
+                if 2 * run.half_width() > width and len(run.scores) < max_pairs
+            ]
+    return runs
+
+def compare(a: MatchupRun, b: MatchupRun, width: float=DEFAULT_WIDTH, z: float=Z_95) -> SequentialResult:
+    """
+    Difference in mean score between two runs over their shared replications.
+    It has converged once its confidence interval is at most `width` wide.
+    With common random numbers the paired differences vary far less than either run.
+    """
+    diffs = [x - y for x, y in zip(a.scores, b.scores)]
+    hw = half_width(diffs, z, -1.0, 1.0)
+    mean = sum(diffs) / len(diffs) if diffs else 0.0
+    return SequentialResult((a.key, b.key), len(diffs), mean, hw, 2 * hw <= width)
+
+def compare_loadouts(
+    candidates: List[dict],
+    opponent: dict,
+    seed: int=0,
+    width: float=DEFAULT_WIDTH,
+    round_pairs: int=DEFAULT_ROUND,
+    max_pairs: int=DEFAULT_MAX_PAIRS
+) -> Dict[str, SequentialResult]:
+    """
+    Scores each candidate against `opponent`, adding rounds until the paired difference
+    from the first candidate is known to within `width`.
+    Results are keyed by the candidate's `spec_key`; the first candidate's is its own score.
+    """
+    if not candidates:
+        raise ValueError("compare_loadouts needs at least one candidate")
+    check_rounds(round_pairs, max_pairs)
+    runs = [MatchupRun(candidate, opponent) for candidate in candidates]
+    base = runs[0]
+    #The base run always gets a round, so it stays at least as long as every candidate it's paired with.
+    pending = runs[1:]
+    while True:
+        for run in [base, *pending]:
+            run.run(seed, min(round_pairs, max_pairs - len(run.scores)))
+        pending = [
+            run for run in pending
+            if not compare(run, base, width).converged and len(run.scores) < max_pairs
+        ]
+        if not pending:
+            break
+
+    results = {spec_key(candidates[0]): base.result(width)}
+    for candidate, run in zip(candidates[1:], runs[1:]):
+        results[spec_key(candidate)] = compare(run, base, width)
+    return results
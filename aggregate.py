@@ -0,0 +1,214 @@
+import math
+
+from character import DamageType
+from collections import Counter
+from typing import Dict, Hashable, List, Optional, Tuple
+
+class RunningStats:
+    """Streaming count, mean, variance, min and max (Welford's method). Mergeable."""
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, x: float):
+        self.count += 1
+        delta = x - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (x - self.mean)
+        if x < self.min:
+            self.min = x
+        if x > self.max:
+            self.max = x
+
+    def merge(self, other: "RunningStats"):
+        """Folds `other` into these stats (Chan et al.'s parallel update)."""
+        if other.count == 0:
+            return
+        total = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / total
+        self.m2 += other.m2 + delta * delta * self.count * other.count / total
+        self.count = total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    @property
+    def variance(self) -> float:
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def stdev(self) -> float:
+        return math.sqrt(self.variance)
+
+class Histogram:
+    """Fixed-width bins over [`lo`, `hi`), with under- and overflow counts. Mergeable."""
+
+    def __init__(self, lo: float, hi: float, bins: int):
+        self.lo = lo
+        self.hi = hi
+        self.width = (hi - lo) / bins
+        self.counts = [0] * bins
+        self.under = 0
+        self.over = 0
+
+    def add(self, x: float):
+        if x < self.lo:
+            self.under += 1
+        elif x >= self.hi:
+            self.over += 1
+        else:
+            self.counts[int((x - self.lo) / self.width)] += 1
+
+    def merge(self, other: "Histogram"):
+        if (other.lo, other.hi, len(other.counts)) != (self.lo, self.hi, len(self.counts)):
+            raise ValueError("can only merge histograms with the same bins")
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        self.under += other.under
+        self.over += other.over
+
+class QuantileSketch:
+    """
+    Streaming quantile estimates in bounded memory. Mergeable.
+
+    A simplified KLL sketch: level `h` holds up to `k` items, each standing
+    for 2**h inputs. A full level is sorted and every other item is promoted.
+    Which half gets promoted alternates, so the sketch never touches the
+    global RNG and results stay reproducible.
+    """
+
+    def __init__(self, k: int=200):
+        self.k = k
+        self.count = 0
+        self.levels: List[List[float]] = [[]]
+        self._offset = 0
+
+    def add(self, x: float):
+        self.count += 1
+        self.levels[0].append(x)
+        if len(self.levels[0]) >= self.k:
+            self.compact(0)
+
+    def compact(self, level: int):
+        items = sorted(self.levels[level])
+        self.levels[level] = []
+        if len(items) % 2:
+            #Keep the odd item out at this level so no weight is lost.
+            self.levels[level].append(items.pop())
+        if level + 1 == len(self.levels):
+            self.levels.append([])
+        self.levels[level + 1].extend(items[self._offset::2])
+        self._offset ^= 1
+        if len(self.levels[level + 1]) >= self.k:
+            self.compact(level + 1)
+
+    def merge(self, other: "QuantileSketch"):
+        self.count += other.count
+        while len(self.levels) < len(other.levels):
+            self.levels.append([])
+        for level, items in enumerate(other.levels):
+            self.levels[level].extend(items)
+        for level in range(len(self.levels)):
+            if len(self.levels[level]) >= self.k:
+                self.compact(level)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimates the `q` quantile (0 to 1), or `None` if empty."""
+        weighted = sorted(
+            (x, 1 << level)
+            for level, items in enumerate(self.levels)
+            for x in items
+        )
+        if not weighted:
+            return None
+        target = q * sum(w for _, w in weighted)
+        acc = 0
+        for x, w in weighted:
+            acc += w
+            if acc >= target:
+                return x
+        return weighted[-1][0]
+
+class FightStats:
+    """Streaming summary of every duel fought in one matchup."""
+
+    def __init__(self, max_turns: int):
+        self.wins = [0, 0]
+        self.draws = 0
+        self.turns = RunningStats()
+        self.turn_hist = Histogram(0, max_turns + 1, max_turns + 1)
+        self.turn_quantiles = QuantileSketch()
+        self.damage: Dict[DamageType, RunningStats] = {dtype: RunningStats() for dtype in DamageType}
+        self.crits = RunningStats()
+        self.effects: Counter = Counter()
+
+    @property
+    def fights(self) -> int:
+        return self.turns.count
+
+    def add(self, winner: Optional[int], turns: int, damage: Tuple[int, ...], crits: int, effects: Tuple[str, ...]):
+        """
+        Records one duel. `winner` is 0, 1 or `None` for a draw.
+        `damage` is the total taken per `DamageType`, in enum order.
+        """
+        if winner is None:
+            self.draws += 1
+        else:
+            self.wins[winner] += 1
+        self.turns.add(turns)
+        self.turn_hist.add(turns)
+        self.turn_quantiles.add(turns)
+        for dtype, amt in zip(DamageType, damage):
+            self.damage[dtype].add(amt)
+        self.crits.add(crits)
+        self.effects.update(effects)
+
+    def merge(self, other: "FightStats"):
+        self.wins = [a + b for a, b in zip(self.wins, other.wins)]
+        self.draws += other.draws
+        self.turns.merge(other.turns)
+        self.turn_hist.merge(other.turn_hist)
+        self.turn_quantiles.merge(other.turn_quantiles)
+        for dtype in DamageType:
+            self.damage[dtype].merge(other.damage[dtype])
+        self.crits.merge(other.crits)
+        self.effects.update(other.effects)
+
+    def summary(self) -> dict:
+        return {
+            "fights": self.fights,
+            "wins": list(self.wins),
+            "draws": self.draws,
+            "turns_mean": self.turns.mean,
+            "turns_stdev": self.turns.stdev,
+            "turns_median": self.turn_quantiles.quantile(0.5),
+            "turns_p90": self.turn_quantiles.quantile(0.9),
+            "damage_mean": {dtype.name.lower(): stats.mean for dtype, stats in self.damage.items()},
+            "crits_mean": self.crits.mean,
+            "effects": dict(self.effects)
+        }
+
+class Aggregator:
+    """
+    `FightStats` keyed by matchup. Memory grows with the number of matchups,
+    not the number of fights. Aggregators from worker processes can be merged.
+    """
+
+    def __init__(self, max_turns: int):
+        self.max_turns = max_turns
+        self.matchups: Dict[Hashable, FightStats] = dict()
+
+    def stats(self, key: Hashable) -> FightStats:
+        if not key in self.matchups:
+            self.matchups[key] = FightStats(self.max_turns)
+        return self.matchups[key]
+
+    def merge(self, other: "Aggregator"):
+        for key, stats in other.matchups.items():
+            self.stats(key).merge(stats)
+
+    def summary(self) -> dict:
+        return {key: stats.summary() for key, stats in self.matchups.items()}
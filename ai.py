@@ -0,0 +1,256 @@
+import math
+import random
+import time
+
+from character import Character
+from collections import namedtuple
+from combat import attack, tick_effects
+from concurrent.futures import Executor
+from crits import crit_for
+from effects import EffectNames
+from typing import Callable, Dict, List, Optional, Tuple
+
+Action = namedtuple('Action', ('atk_stat', 'def_stat', 'target'))
+
+MELEE_OPTIONS = (("atp", "dfp"),)
+SPELL_OPTIONS = (("pwr", "wil"), ("pwr", "tou"))
+
+#Chosen for a stunned actor, who has nothing to decide.
+SKIP: Optional[Action] = None
+
+def can_act(actor: Character) -> bool:
+    return actor.alive and not actor.find_effect(EffectNames.STUN.value)
+
+def legal_actions(actor: Character, enemies: List[Character]) -> List[Optional[Action]]:
+    """
+    Lists what `actor` can do against `enemies`.
+    Spell attacks are only offered to characters with an implement.
+    """
+    if not can_act(actor):
+        return [SKIP]
+    options = MELEE_OPTIONS + SPELL_OPTIONS if actor.implement else MELEE_OPTIONS
+    return [
+        Action(atk_stat, def_stat, idx)
+        for idx, enemy in enumerate(enemies) if enemy.alive
+        for atk_stat, def_stat in options
+    ] or [SKIP]
+
+def perform(actor: Character, enemies: List[Character], action: Optional[Action]):
+    """Carries out `action` with the normal combat rules."""
+    if action is SKIP:
+        return
+    target = enemies[action.target]
+    result = attack(actor, target, action.atk_stat, action.def_stat)
+    if result.crit and action.atk_stat == "atp":
+        crit_for(actor)(actor, target)
+
+def random_policy(actor: Character, enemies: List[Character]) -> Optional[Action]:
+    return random.choice(legal_actions(actor, enemies))
+
+class Battle:
+    """
+    A fight between two sides, played a round at a time.
+    Each round every living character acts in speed order, then effects tick.
+    """
+
+    def __init__(self, sides: Tuple[List[Character], List[Character]]):
+        self.sides = sides
+        self.round = 0
+
+    def fork(self) -> "Battle":
+        twin = Battle(tuple([c.fork() for c in side] for side in self.sides))
+        twin.round = self.round
+        return twin
+
+    def enemies(self, side: int) -> List[Character]:
+        return self.sides[1 - side]
+
+    @property
+    def over(self) -> bool:
+        return not all(any(c.alive for c in side) for side in self.sides)
+
+    def winner(self) -> Optional[int]:
+        """The winning side, or `None` if the fight isn't decided."""
+        alive = [any(c.alive for c in side) for side in self.sides]
+        if alive[0] and not alive[1]:
+            return 0
+        elif alive[1] and not alive[0]:
+            return 1
+        return None
+
+    def play_round(self, choose: Callable[[int, int, Character], Optional[Action]]):
+        """
+        Plays one round. `choose(side, index, actor)` picks each actor's action.
+        """
+        order = [
+            (actor, side, idx)
+            for side, members in enumerate(self.sides)
+            for idx, actor in enumerate(members)
+        ]
+        order.sort(key=lambda entry: -entry[0].speed)
+        for actor, side, idx in order:
+            if can_act(actor) and not self.over:
+                perform(actor, self.enemies(side), choose(side, idx, actor))
+        for side in self.sides:
+            for actor in side:
+                tick_effects(actor)
+        self.round += 1
+
+    def vitality(self, side: int) -> float:
+        total = sum(c.max_body + c.max_soul for c in self.sides[side]) or 1
+        return sum(c.body + c.soul for c in self.sides[side]) / total
+
+class Node:
+    """A search tree node: the actions we've tried from here and how they went."""
+
+    def __init__(self):
+        self.children: Dict[Optional[Action], Node] = dict()
+        self.visits = 0
+        self.value = 0.0
+
+    def best(self) -> Optional[Action]:
+        return max(self.children.items(), key=lambda kv: kv[1].visits)[0]
+
+class MCTS:
+    """
+    Monte Carlo tree search for the character at `sides[me[0]][me[1]]`.
+
+    The tree branches only on our own choices; everyone else, and our own
+    moves after the tree runs out, follow `random_policy`.
+    Dice are re-rolled on every iteration (open-loop search), so a node
+    stands for a sequence of our actions rather than one exact state.
+
+    Search runs until `time_limit` seconds pass or `rollouts` iterations are done,
+    whichever comes first.
+    """
+
+    def __init__(
+        self,
+        battle: Battle,
+        me: Tuple[int, int],
+        time_limit: float=0.1,
+        rollouts: Optional[int]=None,
+        max_depth: int=30,
+        exploration: float=1.4
+    ):
+        self.battle = battle
+        self.me = me
+        self.time_limit = time_limit
+        self.rollouts = rollouts
+        self.max_depth = max_depth
+        self.exploration = exploration
+        self.root = Node()
+
+    def select(self, node: Node, actions: List[Optional[Action]]) -> Optional[Action]:
+        untried = [a for a in actions if a not in node.children]
+        if untried:
+            return random.choice(untried)
+        log_n = math.log(node.visits or 1)
+        def uct(action):
+            child = node.children[action]
+            return child.value / child.visits + self.exploration * math.sqrt(log_n / child.visits)
+        return max(actions, key=uct)
+
+    def reward(self, sim: Battle) -> float:
+        side = self.me[0]
+        winner = sim.winner()
+        if winner is None:
+            return 0.5 + 0.5 * (sim.vitality(side) - sim.vitality(1 - side))
+        return 1.0 if winner == side else 0.0
+
+    def iterate(self):
+        sim = self.battle.fork()
+        side, idx = self.me
+        path = [self.root]
+        node = self.root
+        in_tree = True
+        depth = 0
+
+        while depth < self.max_depth and not sim.over:
+            me = sim.sides[side][idx]
+            if not me.alive:
+                break
+            if in_tree:
+                actions = legal_actions(me, sim.enemies(side))
+                action = self.select(node, actions)
+                if not action in node.children:
+                    node.children[action] = Node()
+                    in_tree = False
+                node = node.children[action]
+                path.append(node)
+            else:
+                action = random_policy(me, sim.enemies(side))
+
+            def choose(s, i, actor):
+                if (s, i) == self.me:
+                    return action
+                return random_policy(actor, sim.enemies(s))
+            sim.play_round(choose)
+            depth += 1
+
+        value = self.reward(sim)
+        for visited in path:
+            visited.visits += 1
+            visited.value += value
+
+    def run(self) -> int:
+        """Searches within the budget. Returns the number of iterations done."""
+        deadline = time.perf_counter() + self.time_limit
+        done = 0
+        while time.perf_counter() < deadline:
+            if self.rollouts is not None and done >= self.rollouts:
+                break
+            self.iterate()
+            done += 1
+        return done
+
+    def search(self, pool: Optional[Executor]=None, workers: int=0) -> Optional[Action]:
+        """
+        Searches and returns the most visited action.
+        With a process `pool`, `workers` extra searches run in parallel
+        and their root statistics are merged into this tree.
+        """
+        futures = []
+        if pool is not None:
+            for _ in range(workers):
+                futures.append(pool.submit(
+                    root_search,
+                    self.battle,
+                    self.me,
+                    self.time_limit,
+                    self.rollouts,
+                    self.max_depth,
+                    random.getrandbits(64)
+                ))
+        self.run()
+        for future in futures:
+            for action, (visits, value) in future.result().items():
+                child = self.root.children.setdefault(action, Node())
+                child.visits += visits
+                child.value += value
+                self.root.visits += visits
+                self.root.value += value
+
+        return self.root.best() if self.root.children else SKIP
+
+    def advance(self, battle: Battle, action: Optional[Action]):
+        """
+        Moves the search on to `battle` after we played `action`,
+        keeping the subtree below `action`.
+        """
+        self.battle = battle
+        self.root = self.root.children.get(action) or Node()
+
+def root_search(
+    battle: Battle,
+    me: Tuple[int, int],
+    time_limit: float,
+    rollouts: Optional[int],
+    max_depth: int,
+    seed: int
+) -> Dict[Optional[Action], Tuple[int, float]]:
+    """Runs a standalone search in a worker process and returns its root statistics."""
+    random.seed(seed)
+    tree = MCTS(battle, me, time_limit, rollouts, max_depth)
+    tree.run()
+    return {action: (child.visits, child.value) for action, child in tree.root.children.items()}
@@ -0,0 +1,286 @@
+import argparse
+import asyncio
+import itertools
+import json
+
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Optional
+from character import Character
+from combat import BadStatError, attack, tick_effects
+from crits import crit_for
+from effects import EffectNames
+from eventbus import AsyncEventBus
+from simulation import build_fighter, run_batch
+
+DEFAULT_PORT = 8765
+#Messages a client may have waiting before its arena events are dropped.
+WATCH_QUEUE = 256
+FLUSH_TIMEOUT = 5.0
+#Most fights one `simulate` command may ask for.
+MAX_SIM_FIGHTS = 10000
+
+class ArenaError(Exception):
+    """Custom exception for bad arena commands."""
+    pass
+
+def char_state(character: Character) -> dict:
+    """Summarizes `character` as plain data for clients."""
+    return {
+        "name": character.name,
+        "body": character.body,
+        "mind": character.mind,
+        "soul": character.soul,
+        "alive": character.alive,
+        "effects": sorted(character.effects.keys())
+    }
+
+class Arena:
+    """
+    Holds the characters and battle state of one live fight.
+    Everything that happens is emitted on the arena's `bus` under the `arena` topic.
+    """
+
+    def __init__(self, arena_id: str):
+        self.arena_id = arena_id
+        self.fighters: Dict[str, Character] = dict()
+        self.turn = 0
+        self.bus = AsyncEventBus()
+
+    async def publish(self, event: str, **kwargs):
+        await self.bus.emit("arena", {"event": event, "arena": self.arena_id, **kwargs})
+
+    def fighter(self, name: str) -> Character:
+        if not name in self.fighters:
+            raise ArenaError(f"{name} is not in arena {self.arena_id}")
+        return self.fighters[name]
+
+    async def join(self, spec: dict) -> Character:
+        """Builds a fighter from `spec` (see `simulation.build_fighter`) and adds it."""
+        if not isinstance(spec, dict):
+            raise ArenaError("fighter should be an object")
+        fighter = build_fighter(spec)
+        if fighter.name in self.fighters:
+            raise ArenaError(f"{fighter.name} is already in arena {self.arena_id}")
+        self.fighters[fighter.name] = fighter
+        await self.publish("joined", fighter=char_state(fighter))
+        return fighter
+
+    async def attack(
+        self,
+        attacker: str,
+        defender: str,
+        atk_stat: str="atp",
+        def_stat: str="dfp"
+    ):
+        """Has `attacker` attack `defender` by name."""
+        atk_char = self.fighter(attacker)
+        def_char = self.fighter(defender)
+        if not atk_char.alive or atk_char.find_effect(EffectNames.STUN.value):
+            raise ArenaError(f"{attacker} cannot act")
+        if not def_char.alive:
+            raise ArenaError(f"{defender} is already down")
+        try:
+            result = attack(atk_char, def_char, atk_stat, def_stat)
+        except BadStatError as e:
+            raise ArenaError(str(e))
+        if result.crit and atk_stat == "atp":
+            crit_for(atk_char)(atk_char, def_char)
+        await self.publish(
+            "attacked",
+            attacker=attacker,
+            defender=char_state(def_char),
+            roll=result._asdict()
+        )
+        return result
+
+    async def end_turn(self):
+        """Ticks every fighter's effects and announces the new turn."""
+        self.turn += 1
+        for fighter in self.fighters.values():
+            tick_effects(fighter)
+        await self.publish("turn", turn=self.turn, fighters=self.state()["fighters"])
+
+    def state(self) -> dict:
+        return {
+            "arena": self.arena_id,
+            "turn": self.turn,
+            "fighters": [char_state(f) for f in self.fighters.values()]
+        }
+
+class Watcher:
+    """
+    Owns the output side of one client connection.
+
+    Replies and watched arena events share a bounded queue that `pump` writes
+    out, so a slow client only ever stalls itself. Arena events that don't fit
+    in the queue are dropped for this client and counted in `dropped`.
+    """
+
+    def __init__(self, writer: asyncio.StreamWriter, max_queue: int=WATCH_QUEUE):
+        self.writer = writer
+        self.queue: asyncio.Queue = asyncio.Queue(max_queue)
+        self.dropped = 0
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        self._task = asyncio.ensure_future(self.pump())
+
+    def on_arena(self, event: dict):
+        if self.writer.is_closing():
+            return
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.dropped += 1
+
+    async def send(self, message: dict):
+        """Queues `message` for the client, waiting for room if its queue is full."""
+        if self._task is not None and self._task.done():
+            raise ConnectionResetError("connection writer stopped")
+        await self.queue.put(message)
+
+    async def pump(self):
+        while True:
+            message = await self.queue.get()
+            self.writer.write(json.dumps(message).encode() + b"\n")
+            await self.writer.drain()
+            self.queue.task_done()
+
+    async def flush(self, timeout: float=FLUSH_TIMEOUT):
+        """Waits up to `timeout` seconds for everything queued to be written."""
+        if self._task is None or self._task.done():
+            return
+        try:
+            await asyncio.wait_for(self.queue.join(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+
+class ArenaServer:
+    """
+    Hosts many arenas in one process.
+
+    Clients send one JSON command per line and get one JSON reply per line.
+    Watched arenas also push their events down the same connection.
+    Batch simulations go to a process pool so they never stall live arenas.
+    """
+
+    def __init__(self, workers: Optional[int]=None):
+        self.arenas: Dict[str, Arena] = dict()
+        self.workers = workers
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._ids = itertools.count(1)
+
+    @property
+    def pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(self.workers)
+        return self._pool
+
+    def arena(self, arena_id: str) -> Arena:
+        if not arena_id in self.arenas:
+            raise ArenaError(f"no arena {arena_id}")
+        return self.arenas[arena_id]
+
+    async def dispatch(self, cmd: dict, watcher: Watcher) -> dict:
+        """Runs one client command and returns the reply body."""
+        if not isinstance(cmd, dict):
+            raise ArenaError("commands should be JSON objects")
+        name = cmd.get("cmd")
+        if name == "create":
+            arena_id = str(cmd.get("arena") or next(self._ids))
+            if arena_id in self.arenas:
+                raise ArenaError(f"arena {arena_id} already exists")
+            self.arenas[arena_id] = Arena(arena_id)
+            return {"arena": arena_id}
+        elif name == "join":
+            fighter = await self.arena(cmd["arena"]).join(cmd["fighter"])
+            return {"fighter": char_state(fighter)}
+        elif name == "attack":
+            result = await self.arena(cmd["arena"]).attack(
+                cmd["attacker"],
+                cmd["defender"],
+                cmd.get("atk", "atp"),
+                cmd.get("def", "dfp")
+            )
+            return {"roll": result._asdict()}
+        elif name == "end_turn":
+            arena = self.arena(cmd["arena"])
+            await arena.end_turn()
+            return {"turn": arena.turn}
+        elif name == "state":
+            return self.arena(cmd["arena"]).state()
+        elif name == "watch":
+            self.arena(cmd["arena"]).bus.subscribe("arena", watcher)
+            return {"watching": cmd["arena"]}
+        elif name == "unwatch":
+            self.arena(cmd["arena"]).bus.unsubscribe("arena", watcher)
+            return {"watching": None}
+        elif name == "close":
+            del self.arenas[self.arena(cmd["arena"]).arena_id]
+            return {"closed": cmd["arena"]}
+        elif name == "simulate":
+            fights = int(cmd.get("fights", 1))
+            if not 1 <= fights <= MAX_SIM_FIGHTS:
+                raise ArenaError(f"fights should be between 1 and {MAX_SIM_FIGHTS}, got {fights}")
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(
+                self.pool,
+                run_batch,
+                cmd["first"],
+                cmd["second"],
+                fights,
+                cmd.get("seed")
+            )
+            return result._asdict()
+        else:
+            raise ArenaError(f"unknown command {name}")
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        watcher = Watcher(writer)
+        watcher.start()
+        try:
+            while not reader.at_eof():
+                line = await reader.readline()
+                if not line.strip():
+                    continue
+                try:
+                    reply = {"ok": True, **await self.dispatch(json.loads(line), watcher)}
+                except (ArenaError, KeyError, ValueError, TypeError, AttributeError) as e:
+                    reply = {"ok": False, "error": str(e)}
+                await watcher.send(reply)
+            await watcher.flush()
+        except ConnectionError:
+            pass
+        finally:
+            for arena in self.arenas.values():
+                arena.bus.unsubscribe("arena", watcher)
+            watcher.stop()
+            writer.close()
+
+    async def serve(self, port: int=DEFAULT_PORT, path: Optional[str]=None):
+        """Serves on `path` as a Unix socket if given, otherwise on localhost:`port`."""
+        if path:
+            server = await asyncio.start_unix_server(self.handle, path=path)
+        else:
+            server = await asyncio.start_server(self.handle, host="127.0.0.1", port=port)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            if self._pool is not None:
+                self._pool.shutdown()
+
+def main():
+    parser = argparse.ArgumentParser(description="System 12 arena server")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--unix", help="serve on this Unix socket path instead of TCP")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+    asyncio.run(ArenaServer(args.workers).serve(args.port, args.unix))
+
+if __name__ == "__main__":
+    main()
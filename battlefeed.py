@@ -0,0 +1,108 @@
+"""
+Runs fights on a background thread for a viewer on another thread.
+
+The worker puts a `TurnFrame` on a thread-safe queue after every turn and
+a `FightDone` after every fight. A frame holds forks of both fighters, so
+the viewer never reads characters that combat is still changing. The
+viewer calls `drain` on its own schedule. `drain` keeps only the newest
+frame, so a slow viewer skips turns instead of falling behind.
+
+Rolls come from the feed's own `random.Random`, so a seeded feed replays
+the same fights whatever else is rolling and never disturbs anyone else's
+random stream. Fighters come from `simulation.build_fighter`, so their gear
+is `quiet` and the worker thread never emits on `MAIN_BUS`.
+"""
+import queue
+import random
+import threading
+
+from collections import namedtuple
+from simulation import build_fighter, duel
+from typing import List, Optional, Tuple
+
+TurnFrame = namedtuple('TurnFrame', ('fight', 'turn', 'fighters'))
+#`winner` is 0 or 1 for the first or second spec, `None` on a draw.
+FightDone = namedtuple('FightDone', ('fight', 'winner', 'turns'))
+
+class BattleFeed:
+    """Duels `first_spec` against `second_spec` `fights` times on a daemon thread."""
+
+    def __init__(
+        self,
+        first_spec: dict,
+        second_spec: dict,
+        fights: int=1,
+        seed: Optional[int]=None,
+        turn_delay: float=0.0
+    ):
+        self.first_spec = first_spec
+        self.second_spec = second_spec
+        self.fights = fights
+        self.seed = seed
+        self.turn_delay = turn_delay
+        self.queue: queue.Queue = queue.Queue()
+        self.finished = False
+        self.dropped = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self.run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        """Asks the worker to stop after the current turn."""
+        self._stop.set()
+
+    def join(self, timeout: Optional[float]=None):
+        self._thread.join(timeout)
+
+    def run(self):
+        """Worker loop; don't call this on the GUI thread."""
+        rng = random.Random(self.seed)
+        try:
+            for fight in range(self.fights):
+                if self._stop.is_set():
+                    break
+                first = build_fighter(self.first_spec)
+                second = build_fighter(self.second_spec)
+                self.queue.put(TurnFrame(fight, 0, (first.fork(), second.fork())))
+
+                def on_turn(turn, a, b, fight=fight):
+                    self.queue.put(TurnFrame(fight, turn, (a.fork(), b.fork())))
+                    if self.turn_delay:
+                        self._stop.wait(self.turn_delay)
+
+                result = duel(first, second, on_turn=on_turn, rng=rng)
+                if result.winner is first:
+                    winner = 0
+                elif result.winner is second:
+                    winner = 1
+                else:
+                    winner = None
+                self.queue.put(FightDone(fight, winner, result.turns))
+        finally:
+            self.queue.put(None)
+
+    def drain(self) -> Tuple[Optional[TurnFrame], List[FightDone]]:
+        """
+        Takes everything queued so far without blocking.
+        Returns the newest frame (or `None`) and every finished fight, in order.
+        Older frames are counted in `dropped` and discarded.
+        Sets `finished` once the worker is done.
+        """
+        frame = None
+        done = []
+        while True:
+            try:
+                item = self.queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                self.finished = True
+            elif isinstance(item, FightDone):
+                done.append(item)
+            else:
+                if frame is not None:
+                    self.dropped += 1
+                frame = item
+        return frame, done
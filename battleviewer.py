@@ -0,0 +1,62 @@
+import tkinter as tk
+
+from battlefeed import BattleFeed, TurnFrame
+from charframe import CharFrame
+from typing import List, Optional
+
+FRAME_MS = 50
+
+class BattleViewer(tk.Toplevel):
+    """
+    Battle Viewer Window.
+    Starts `feed` and drains it every `FRAME_MS`. Only the newest turn is
+    drawn, so the window stays responsive however fast the fight runs.
+    """
+
+    def __init__(self, master, feed: BattleFeed):
+        super().__init__(master)
+        self.wm_title("Battle")
+        self.feed = feed
+        self.char_frames: List[CharFrame] = []
+        self.wins = [0, 0, 0]
+        self.status_var = tk.StringVar(value="Starting...")
+        tk.Label(self, textvariable=self.status_var).grid(row=0, column=0, columnspan=2)
+        self.tally_var = tk.StringVar()
+        tk.Label(self, textvariable=self.tally_var).grid(row=2, column=0, columnspan=2)
+        self.after_id: Optional[str] = None
+
+        self.feed.start()
+        self.after_id = self.after(FRAME_MS, self.poll)
+
+    def poll(self):
+        frame, done = self.feed.drain()
+        if frame:
+            self.show(frame)
+        for fight in done:
+            self.wins[2 if fight.winner is None else fight.winner] += 1
+        if done:
+            first, second, draws = self.wins
+            self.tally_var.set(f"{first} - {second} ({draws} draws)")
+
+        if self.feed.finished:
+            self.status_var.set(f"Done: {sum(self.wins)} fights")
+            self.after_id = None
+        else:
+            self.after_id = self.after(FRAME_MS, self.poll)
+
+    def show(self, frame: TurnFrame):
+        if not self.char_frames:
+            for column, character in enumerate(frame.fighters):
+                char_frame = CharFrame(self, character)
+                char_frame.grid(row=1, column=column)
+                self.char_frames.append(char_frame)
+        else:
+            for char_frame, character in zip(self.char_frames, frame.fighters):
+                char_frame.show(character)
+        self.status_var.set(f"Fight {frame.fight + 1}/{self.feed.fights}, turn {frame.turn}")
+
+    def destroy(self):
+        self.feed.stop()
+        if self.after_id:
+            self.after_cancel(self.after_id)
+        super().destroy()
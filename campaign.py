@@ -0,0 +1,169 @@
+"""
+Checkpointed simulation campaigns that can be resumed.
+
+A campaign is a list of `WorkUnit`s. Each unit is one matchup fought
+`fights` times from its own seed, run in chunks of `chunk` fights. After
+every chunk, the unit's fight count, RNG state and partial `Aggregator` are
+written atomically to the unit's own file in the checkpoint directory.
+A crashed worker or machine loses at most one chunk per running unit.
+
+Running the same campaign against the same directory again skips finished
+units. Unfinished units resume from their saved RNG state. Per-unit results
+are merged in unit order, so the final result is bit-identical to an
+uninterrupted run.
+"""
+import hashlib
+import json
+import os
+import pickle
+import random
+
+from aggregate import Aggregator
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from dataloader import GAME_DATA
+from resultcache import ResultCache
+from simulation import MAX_TURNS, aggregate_fights, build_fighter, spec_key
+from typing import List, Optional
+
+WorkUnit = namedtuple('WorkUnit', ('unit_id', 'first', 'second', 'fights', 'seed'))
+UnitState = namedtuple('UnitState', ('done', 'rng_state', 'agg'))
+
+#Bump when the checkpoint layout changes.
+CHECKPOINT_VERSION = 1
+DEFAULT_CHUNK = 1000
+MANIFEST = "campaign.json"
+
+class CampaignMismatchError(Exception):
+    """Custom exception for a checkpoint directory that belongs to a different campaign."""
+    pass
+
+def sweep_units(pairs: List[tuple], fights: int, seed: int) -> List[WorkUnit]:
+    """One unit per `(first_spec, second_spec)` pair, seeded `seed + i` like `cli sweep`."""
+    return [WorkUnit(i, a, b, fights, seed + i) for i, (a, b) in enumerate(pairs)]
+
+def campaign_digest(units: List[WorkUnit], data: dict=GAME_DATA) -> str:
+    """Hashes the units and the game data, so a checkpoint is never resumed against different inputs."""
+    payload = json.dumps(
+        {"version": CHECKPOINT_VERSION, "units": units, "data": data},
+        sort_keys=True
+    ).encode()
+    return hashlib.sha256(payload).hexdigest()
+
+def atomic_dump(obj, path: str):
+    """Pickles `obj` to `path` so readers see either the old file or the new one."""
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        pickle.dump(obj, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+def unit_path(directory: str, unit: WorkUnit) -> str:
+    return os.path.join(directory, f"unit-{unit.unit_id}.pickle")
+
+def load_unit(directory: str, unit: WorkUnit) -> Optional[UnitState]:
+    try:
+        with open(unit_path(directory, unit), "rb") as f:
+            return pickle.load(f)
+    except FileNotFoundError:
+        return None
+
+def run_unit(directory: str, unit: WorkUnit, chunk: int=DEFAULT_CHUNK, cache_path: Optional[str]=None) -> Aggregator:
+    """
+    Runs what's left of `unit`, checkpointing after every `chunk` fights.
+    With `cache_path`, a fresh unit already in that `ResultCache` isn't run,
+    and a unit finished here is added to it.
+    Rolls come from the unit's own `random.Random`, so the global RNG is left alone.
+    Safe to run in a worker process.
+    """
+    if chunk < 1:
+        raise ValueError(f"chunk should be at least 1, got {chunk}")
+    cache = ResultCache(cache_path) if cache_path else None
+    rng = random.Random(unit.seed)
+    try:
+        state = load_unit(directory, unit)
+        if state is None:
+            hit = cache.lookup(unit.first, unit.second, unit.fights, unit.seed, rng) if cache is not None else None
+            if hit is not None:
+                atomic_dump(UnitState(unit.fights, rng.getstate(), hit), unit_path(directory, unit))
+                return hit
+            done, agg = 0, Aggregator(MAX_TURNS)
+        else:
+            done, agg = state.done, state.agg
+            rng.setstate(state.rng_state)
+
+        key = (spec_key(unit.first), spec_key(unit.second))
+        make_pair = lambda: (build_fighter(unit.first), build_fighter(unit.second))
+        ran = done < unit.fights
+        while done < unit.fights:
+            count = min(chunk, unit.fights - done)
+            aggregate_fights(make_pair, count, key, agg, rng=rng)
+            done += count
+            atomic_dump(UnitState(done, rng.getstate(), agg), unit_path(directory, unit))
+        if cache is not None and ran:
+            cache.save(unit.first, unit.second, unit.fights, unit.seed, agg, rng)
+        return agg
+    finally:
+        if cache is not None:
+            cache.close()
+
+class Campaign:
+    """
+    Work units bound to a checkpoint `directory`, optionally backed by the `ResultCache` at `cache_path`.
+    Raises `CampaignMismatchError` if the directory holds another campaign's checkpoints.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        units: List[WorkUnit],
+        chunk: int=DEFAULT_CHUNK,
+        cache_path: Optional[str]=None
+    ):
+        if chunk < 1:
+            raise ValueError(f"chunk should be at least 1, got {chunk}")
+        self.directory = directory
+        self.units = units
+        self.chunk = chunk
+        self.cache_path = cache_path
+        self.digest = campaign_digest(units)
+
+        os.makedirs(directory, exist_ok=True)
+        manifest_path = os.path.join(directory, MANIFEST)
+        if os.path.exists(manifest_path):
+            with open(manifest_path) as f:
+                manifest = json.load(f)
+            if manifest.get("digest") != self.digest:
+                raise CampaignMismatchError(f"{directory} holds checkpoints for a different campaign")
+        else:
+            tmp = f"{manifest_path}.{os.getpid()}.tmp"
+            with open(tmp, "w") as f:
+                json.dump({"digest": self.digest, "units": len(units)}, f)
+            os.replace(tmp, manifest_path)
+
+    def progress(self) -> List[int]:
+        """Fights finished so far in each unit."""
+        states = (load_unit(self.directory, unit) for unit in self.units)
+        return [state.done if state else 0 for state in states]
+
+    def run(self, workers: Optional[int]=1) -> List[Aggregator]:
+        """
+        Runs every unfinished unit and returns each unit's `Aggregator`, in unit order.
+        `workers=1` runs in this process; anything else uses a process pool of that size.
+        """
+        if workers == 1:
+            return [run_unit(self.directory, unit, self.chunk, self.cache_path) for unit in self.units]
+        with ProcessPoolExecutor(workers) as pool:
+            futures = [
+                pool.submit(run_unit, self.directory, unit, self.chunk, self.cache_path)
+                for unit in self.units
+            ]
+            return [future.result() for future in futures]
+
+    def merged(self, workers: Optional[int]=1) -> Aggregator:
+        """Runs the campaign and merges every unit's results in unit order."""
+        total = Aggregator(MAX_TURNS)
+        for agg in self.run(workers):
+            total.merge(agg)
+        return total
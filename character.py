@@ -1,8 +1,11 @@
 from __future__ import annotations
 
-from dataclasses import dataclass, field
+from collections import namedtuple
+from dataclasses import dataclass, field, fields
+from functools import lru_cache
+from operator import attrgetter
 from typing import Tuple, Optional, List
-from equip import WeaponStats, ArmorStats, ImplementStats
+from equip import WeaponStats, ArmorStats, ImplementStats, silence_items
 from enum import Enum, auto
 
 class DamageType(Enum):
@@ -22,9 +25,12 @@ class Effect:
     * `on_remove` occurs when a character loses this effect, either through its duration
     expiring or through some combat action removing it.
 
+    Effects are slotted: subclasses should list any new attributes in `__slots__`.
+
     This is an abstract class.
     """
     IMMEDIATE: int = -1
+    __slots__ = ('name', 'duration', 'potency')
     
     def __init__(self, name: str, duration: int, potency: int):
         """
@@ -53,7 +59,7 @@ class Effect:
         """Triggers when an effect is applied."""
         pass
 
-@dataclass
+@dataclass(slots=True)
 class BaseStats:
     """Represents base stats of an actor."""
     strength: int = 0
@@ -83,6 +89,20 @@ class BaseStats:
             self.soul
         )
     
+    def shift(self, other: BaseStats, sign: int=1):
+        """
+        Adds `sign` times `other` to these stats in place.
+        Like `__add__`, vitals are left alone.
+        """
+        self.strength += sign * other.strength
+        self.stamina += sign * other.stamina
+        self.speed += sign * other.speed
+        self.skill += sign * other.skill
+        self.sagacity += sign * other.sagacity
+        self.smarts += sign * other.smarts
+        self.melee += sign * other.melee
+        self.magic += sign * other.magic
+    
     @classmethod
     def from_dict(cls, **kwargs) -> BaseStats:
         strength = kwargs.get("str", 0)
@@ -105,6 +125,45 @@ class BaseStats:
             magic=magic
         )
 
+STAT_FIELDS = tuple(f.name for f in fields(BaseStats))
+
+CharSnapshot = namedtuple('CharSnapshot', ('stats', 'equipment', 'effects', 'modifiers'))
+
+@lru_cache(maxsize=None)
+def slot_names(cls) -> Tuple[str, ...]:
+    """Every slot declared by `cls` and its bases, base slots first."""
+    names = []
+    for klass in reversed(cls.__mro__):
+        slots = klass.__dict__.get("__slots__", ())
+        names.extend((slots,) if isinstance(slots, str) else slots)
+    return tuple(n for n in names if n not in ("__dict__", "__weakref__"))
+
+@lru_cache(maxsize=None)
+def state_getter(cls):
+    names = slot_names(cls)
+    if len(names) == 1:
+        return lambda obj: (getattr(obj, names[0]),)
+    elif names:
+        return attrgetter(*names)
+    return lambda obj: ()
+
+def get_state(obj) -> tuple:
+    """The values of `obj`'s slots, in `slot_names` order."""
+    return state_getter(type(obj))(obj)
+
+def set_state(obj, state: tuple):
+    """Writes `state` from `get_state` back into `obj`, bypassing `__setattr__` hooks."""
+    for name, value in zip(slot_names(type(obj)), state):
+        object.__setattr__(obj, name, value)
+
+def clone(obj):
+    """Shallow-copies `obj` without running `__init__` or `__setattr__` hooks."""
+    twin = object.__new__(type(obj))
+    if hasattr(obj, "__dict__"):
+        twin.__dict__.update(obj.__dict__)
+    set_state(twin, get_state(obj))
+    return twin
+
 @dataclass
 class Character:
     """Represents an animate actor in the world."""
@@ -115,6 +174,8 @@ class Character:
     implement: Optional[ImplementStats] = None
     sort_index: int = field(repr=False, init=False)
     effects: dict[str, Effect] = field(repr=False, init=False)
+    damage_templates: dict = field(repr=False, init=False, compare=False)
+    modifiers: dict[str, BaseStats] = field(repr=False, init=False, compare=False)
 
     def __post_init__(self):
         self.sort_index = self.stats.speed
@@ -122,6 +183,8 @@ class Character:
         self.stats.soul = self.max_soul
         self.stats.mind = self.max_mind
         self.effects = dict()
+        self.damage_templates = dict()
+        self.modifiers = dict()
 
     @property
     def strength(self) -> int:
@@ -190,6 +253,10 @@ class Character:
     def crit(self) -> str:
         return self.weapon.crit if self.weapon else "effect stun 1"
     
+    @property
+    def equipment(self) -> Tuple[Optional[WeaponStats], Optional[ArmorStats], Optional[ImplementStats]]:
+        return (self.weapon, self.armor, self.implement)
+    
     @property
     def body(self) -> int:
         return self.stats.body
@@ -304,6 +371,81 @@ class Character:
         for done in to_remove:
             self.remove_effect(done)
 
+    def add_modifier(self, key: str, mods: BaseStats):
+        """
+        Layers `mods` onto the character's stats under `key`.
+        `stats` always holds the effective total; layers are added and
+        removed in place, so other layers are left intact.
+        Adding a layer under an existing `key` replaces it.
+        """
+        if key in self.modifiers:
+            self.remove_modifier(key)
+        self.modifiers[key] = mods
+        self.stats.shift(mods)
+    
+    def remove_modifier(self, key: str):
+        """Removes the layer under `key`, if any."""
+        mods = self.modifiers.pop(key, None)
+        if mods is not None:
+            self.stats.shift(mods, -1)
+
+    @property
+    def base_stats(self) -> BaseStats:
+        """Stats without any modifier layers."""
+        base = BaseStats(*get_state(self.stats))
+        for mods in self.modifiers.values():
+            base.shift(mods, -1)
+        return base
+
+    def snapshot(self) -> CharSnapshot:
+        """
+        Captures the character's mutable state: stats, equipment and durability,
+        active effects and modifier layers. Pass it to `rollback` to return to it.
+        """
+        return CharSnapshot(
+            get_state(self.stats),
+            tuple((item, item.durability) if item else None for item in self.equipment),
+            tuple((eff, get_state(eff)) for eff in self.effects.values()),
+            tuple(self.modifiers.items())
+        )
+
+    def rollback(self, snap: CharSnapshot):
+        """
+        Returns the character to `snap` in place.
+        Durability is restored without emitting threshold events.
+        """
+        set_state(self.stats, snap.stats)
+        items = []
+        for entry in snap.equipment:
+            if entry:
+                entry[0].set_durability(entry[1], emit=False)
+                items.append(entry[0])
+            else:
+                items.append(None)
+        self.weapon, self.armor, self.implement = items
+        for eff, state in snap.effects:
+            set_state(eff, state)
+        self.effects = {eff.name: eff for eff, _ in snap.effects}
+        self.modifiers = dict(snap.modifiers)
+
+    def fork(self) -> Character:
+        """
+        Makes an independent copy of the character for what-if play.
+        Only the small mutable records (stats, equipment, effects) are copied;
+        names, dice strings, compiled crits, modifier layers and the
+        damage template cache are shared with the parent.
+        The copied equipment is `quiet`, so what-if play never emits item events.
+        """
+        twin = clone(self)
+        twin.stats = clone(self.stats)
+        twin.weapon = clone(self.weapon) if self.weapon else None
+        twin.armor = clone(self.armor) if self.armor else None
+        twin.implement = clone(self.implement) if self.implement else None
+        silence_items(twin.equipment)
+        twin.effects = {name: clone(eff) for name, eff in self.effects.items()}
+        twin.modifiers = dict(self.modifiers)
+        return twin
+
     def find_effect(self, eff_name: str) -> Optional[Effect]:
         """
         Finds an effect named `eff_name` in the character's effect list.
@@ -1,9 +1,21 @@
-from character import Character, BaseStats
+from character import Character, BaseStats, clone
 from dataloader import GAME_DATA
+from typing import Dict, Iterable, Tuple
 
-def build_char(race_id: str, class_id: str, name: str=None):
-    class_data = GAME_DATA["classes"][class_id]
-    race_data = GAME_DATA["races"][race_id]
+#Combined race + class stats and default names, by (race_id, class_id).
+TEMPLATES: Dict[Tuple[str, str], Tuple[BaseStats, str]] = dict()
+
+def stat_template(race_id: str, class_id: str, data=GAME_DATA) -> Tuple[BaseStats, str]:
+    """
+    Returns the combined stats and default name for a race and class.
+    Results from `GAME_DATA` are cached in `TEMPLATES`; don't modify the returned stats.
+    """
+    key = (race_id, class_id)
+    if data is GAME_DATA and key in TEMPLATES:
+        return TEMPLATES[key]
+
+    class_data = data["classes"][class_id]
+    race_data = data["races"][race_id]
     class_stats = class_data["stats"]
     race_stats = race_data["stats"]
 
@@ -29,8 +41,21 @@ def build_char(race_id: str, class_id: str, name: str=None):
         magic=class_stats.get("magic", 0)
     )
 
-    combined_stats = stats + class_mods
-    base_name = f"{race_data['name']} {class_id}"
+    template = (stats + class_mods, f"{race_data['name']} {class_id}")
+    if data is GAME_DATA:
+        TEMPLATES[key] = template
+    return template
+
+def invalidate_templates(races: Iterable[str]=(), classes: Iterable[str]=()):
+    """Drops cached templates that use any of `races` or `classes`."""
+    races = set(races)
+    classes = set(classes)
+    for key in [k for k in TEMPLATES if k[0] in races or k[1] in classes]:
+        del TEMPLATES[key]
+
+def build_char(race_id: str, class_id: str, name: str=None, data=GAME_DATA):
+    template_stats, base_name = stat_template(race_id, class_id, data)
+    combined_stats = clone(template_stats)
     
     if name:
         char_name = name
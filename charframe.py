@@ -149,8 +149,8 @@ class CharFrame(Frame):
         super().__init__(master, relief='raised', borderwidth=3)
         self.character = character
         
-        name_label = Label(self, text=character.name)
-        name_label.grid(column=0, row=0, columnspan=3)
+        self.name_label = Label(self, text=character.name)
+        self.name_label.grid(column=0, row=0, columnspan=3)
         
         self.stat_frame = StatFrame(self, self.character)
         self.stat_frame.grid(row=1, column=0)
@@ -170,6 +170,14 @@ class CharFrame(Frame):
         for frame in frames:
             frame.refresh()
 
+    def show(self, character: Character):
+        """Switches every child frame to `character` and refreshes."""
+        self.character = character
+        self.name_label.config(text=character.name)
+        for frame in (self.stat_frame, self.dstat_frame, self.vitals_frame, self.eq_frame):
+            frame.character = character
+        self.refresh()
+
 
 
 
@@ -1,10 +1,15 @@
 import tkinter as tk
 
 from typing import Tuple, Optional, List
-from character import Character, BaseStats
+from character import Character, BaseStats, clone
 from charframe import CharFrame, create_int_label, create_label, create_str_label
 from dataloader import GAME_DATA
 from eventbus import MAIN_BUS
+from preview import compare, preview
+
+NO_CLASS = "(no class)"
+COMPARE_COLUMNS = (("ATP", "atp"), ("DFP", "dfp"), ("TOU", "tou"), ("WIL", "wil"), ("PWR", "pwr"),
+                   ("Body", "max_body"), ("Mind", "max_mind"), ("Soul", "max_soul"))
 
 class NewCharFrame(tk.Frame):
     """New Character Form."""
@@ -13,18 +18,71 @@ class NewCharFrame(tk.Frame):
     def __init__(self, master, character: Character):
         super().__init__(master)
         self.character = character
+        self.race_id: Optional[str] = None
+        self.class_id: Optional[str] = None
         race_list = list(self.RACE_TO_BUILD.keys())
-        list_var = tk.StringVar(value=race_list)
-        self.race_combo = tk.Listbox(self, listvariable=list_var)
+        self.list_var = tk.StringVar(value=race_list)
+        self.race_combo = tk.Listbox(self, listvariable=self.list_var, exportselection=False)
         self.race_combo.bind("<<ListboxSelect>>", self.update_race)
         self.race_combo.pack()
+        self.class_var = tk.StringVar(value=[NO_CLASS, *GAME_DATA["classes"]])
+        self.class_combo = tk.Listbox(self, listvariable=self.class_var, exportselection=False)
+        self.class_combo.bind("<<ListboxSelect>>", self.update_class)
+        self.class_combo.pack()
+        MAIN_BUS.subscribe("datareload", self)
+    
+    def on_datareload(self, diff: dict):
+        if "races" in diff:
+            NewCharFrame.RACE_TO_BUILD = {v["name"]: k for k, v in GAME_DATA["races"].items()}
+            self.list_var.set(list(self.RACE_TO_BUILD.keys()))
+            if not self.race_id in GAME_DATA["races"]:
+                self.race_id = None
+        if "classes" in diff:
+            self.class_var.set([NO_CLASS, *GAME_DATA["classes"]])
+            if not self.class_id in GAME_DATA["classes"]:
+                self.class_id = None
+        self.update_preview()
+    
+    def destroy(self):
+        MAIN_BUS.unsubscribe("datareload", self)
+        super().destroy()
     
     def update_race(self, event):
         cur_value = self.race_combo.get(tk.ANCHOR)
-        race_key = self.RACE_TO_BUILD[cur_value]
-        race_data = GAME_DATA["races"][race_key]
-        self.character.stats = BaseStats.from_dict(**race_data["stats"])
+        self.race_id = self.RACE_TO_BUILD[cur_value]
+        self.update_preview()
+
+    def update_class(self, event):
+        cur_value = self.class_combo.get(tk.ANCHOR)
+        self.class_id = None if cur_value == NO_CLASS else cur_value
+        self.update_preview()
+
+    def update_preview(self):
+        if self.race_id is None:
+            return
+        self.character.stats = clone(preview(self.race_id, self.class_id).stats)
         MAIN_BUS.emit("charupdate")
+
+
+class CompareFrame(tk.Frame):
+    """Compares every class of a race side by side, straight from the preview table."""
+
+    def __init__(self, master):
+        super().__init__(master, relief='sunken', borderwidth=1, padx=3, pady=3)
+        for column, (caption, _) in enumerate(COMPARE_COLUMNS, 1):
+            create_label(self, caption, 0, column, 5)
+
+    def show(self, race_id: Optional[str]):
+        for widget in self.grid_slaves():
+            if int(widget.grid_info()["row"]) > 0:
+                widget.destroy()
+        if race_id is None:
+            return
+        class_ids = [None, *GAME_DATA["classes"]]
+        for row, (class_id, prev) in enumerate(zip(class_ids, compare([race_id], class_ids)), 1):
+            create_label(self, class_id or NO_CLASS, row, 0, 10)
+            for column, (_, field) in enumerate(COMPARE_COLUMNS, 1):
+                create_int_label(self, row, column, getattr(prev, field))
         
 
 class CharGenFrame(tk.Toplevel):
@@ -35,12 +93,24 @@ class CharGenFrame(tk.Toplevel):
         self.character = Character("No Name", BaseStats())
         self.new_char_grid=NewCharFrame(self, self.character)
         self.char_frame = CharFrame(self, self.character)
+        self.compare_frame = CompareFrame(self)
         self.new_char_grid.grid(row=0, column=0)
         self.char_frame.grid(row=0, column=1)
+        self.compare_frame.grid(row=1, column=0, columnspan=2)
         MAIN_BUS.subscribe("charupdate", self)
+        MAIN_BUS.subscribe("datareload", self)
     
     def on_charupdate(self):
         self.char_frame.refresh()
+        self.compare_frame.show(self.new_char_grid.race_id)
+    
+    def on_datareload(self, diff: dict):
+        self.char_frame.refresh()
+    
+    def destroy(self):
+        MAIN_BUS.unsubscribe("charupdate", self)
+        MAIN_BUS.unsubscribe("datareload", self)
+        super().destroy()
 
 
 
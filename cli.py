@@ -0,0 +1,274 @@
+"""
+Headless command line entry point: `python -m cli <command>`.
+
+Never imports tkinter. Game modules (and with them the game data) are
+imported inside the commands that need them, so `--help` and argument
+errors return without touching data/chardata.json.
+"""
+import argparse
+import json
+import sys
+
+SPEC_SECTIONS = (
+    ("race", "races"),
+    ("class", "classes"),
+    ("weapon", "weapons"),
+    ("armor", "armor"),
+    ("implement", "implements")
+)
+
+class BadSpecError(Exception):
+    """Custom exception for fighter spec arguments that don't name real game data."""
+    pass
+
+def at_least(minimum: int):
+    """Argparse type for counts that must be at least `minimum`."""
+    def count(value: str) -> int:
+        number = int(value)
+        if number < minimum:
+            raise argparse.ArgumentTypeError(f"should be at least {minimum}, got {number}")
+        return number
+    return count
+
+positive_int = at_least(1)
+
+def load_spec(key: str) -> dict:
+    """Parses a fighter spec argument and checks every build id in it against the game data."""
+    from dataloader import GAME_DATA
+    from simulation import parse_spec
+    try:
+        spec = parse_spec(key)
+    except ValueError as e:
+        raise BadSpecError(str(e))
+    for slot, section in SPEC_SECTIONS:
+        if slot in spec and not spec[slot] in GAME_DATA[section]:
+            raise BadSpecError(f"{key}: no {slot} {spec[slot]}")
+    return spec
+
+def cmd_simulate(args) -> int:
+    from simulation import aggregate_batch
+    first, second = load_spec(args.first), load_spec(args.second)
+    if args.cache:
+        from resultcache import ResultCache
+        cache = ResultCache(args.cache)
+        agg = cache.aggregate(first, second, args.fights, args.seed)
+        cache.close()
+    else:
+        agg = aggregate_batch(first, second, args.fights, args.seed)
+    for (first, second), summary in agg.summary().items():
+        print(json.dumps({"first": first, "second": second, **summary}))
+    return 0
+
+def cmd_sweep(args) -> int:
+    from concurrent.futures import ProcessPoolExecutor
+    from simulation import aggregate_batch
+
+    pairs = sweep_pairs()
+    if args.checkpoint:
+        return sweep_campaign(args, pairs)
+    with ProcessPoolExecutor(args.workers) as pool:
+        futures = []
+        for i, (a, b) in enumerate(pairs):
+            seed = None if args.seed is None else args.seed + i
+            if args.cache:
+                from resultcache import cached_batch
+                futures.append(pool.submit(cached_batch, args.cache, a, b, args.fights, seed))
+            else:
+                futures.append(pool.submit(aggregate_batch, a, b, args.fights, seed))
+        for future in futures:
+            for (first, second), summary in future.result().summary().items():
+                print(json.dumps({"first": first, "second": second, **summary}), flush=True)
+    return 0
+
+def sweep_campaign(args, pairs) -> int:
+    from campaign import Campaign, CampaignMismatchError, sweep_units
+    try:
+        campaign = Campaign(args.checkpoint, sweep_units(pairs, args.fights, args.seed), args.chunk, args.cache)
+    except CampaignMismatchError as e:
+        print(e, file=sys.stderr)
+        return 1
+    for agg in campaign.run(args.workers):
+        for (first, second), summary in agg.summary().items():
+            print(json.dumps({"first": first, "second": second, **summary}), flush=True)
+    return 0
+
+def sweep_pairs() -> list:
+    from dataloader import GAME_DATA
+    specs = [
+        {"race": race, "class": class_id}
+        for race in sorted(GAME_DATA["races"])
+        for class_id in sorted(GAME_DATA["classes"])
+    ]
+    return [(a, b) for i, a in enumerate(specs) for b in specs[i + 1:]]
+
+def cmd_submit(args) -> int:
+    from workqueue import SQLiteQueue, shard_units
+    queue = SQLiteQueue(args.queue)
+    units = shard_units(sweep_pairs(), args.fights, args.seed, args.shard_fights)
+    queue.put(units)
+    print(f"{args.queue}: {len(units)} shards queued, {queue.remaining()} remaining")
+    return 0
+
+def cmd_work(args) -> int:
+    import os
+    import socket
+    from workqueue import SQLiteQueue, work
+    worker_id = args.worker_id or f"{socket.gethostname()}:{os.getpid()}"
+    cache = None
+    if args.cache:
+        from resultcache import ResultCache
+        cache = ResultCache(args.cache)
+    completed = work(SQLiteQueue(args.queue), worker_id, args.lease, cache=cache)
+    if cache is not None:
+        cache.close()
+    print(f"{worker_id}: {completed} shards completed")
+    return 0
+
+def cmd_collect(args) -> int:
+    from workqueue import SQLiteQueue, collect
+    try:
+        agg = collect(SQLiteQueue(args.queue), timeout=args.timeout)
+    except TimeoutError as e:
+        print(e, file=sys.stderr)
+        return 1
+    for (first, second), summary in agg.summary().items():
+        print(json.dumps({"first": first, "second": second, **summary}))
+    return 0
+
+def cmd_adaptive(args) -> int:
+    from adaptive import run_adaptive
+    first = load_spec(args.first)
+    runs = run_adaptive(
+        [(first, load_spec(second)) for second in args.second],
+        args.seed, args.width, args.round_pairs, args.max_pairs
+    )
+    for run in runs:
+        result = run.result(args.width)
+        print(json.dumps({
+            "first": result.key[0],
+            "second": result.key[1],
+            "pairs": result.pairs,
+            "score": round(result.mean, 4),
+            "half_width": round(result.half_width, 4),
+            "converged": result.converged
+        }))
+    return 0
+
+def cmd_inspect(args) -> int:
+    from character import STAT_FIELDS
+    from simulation import build_fighter
+    fighter = build_fighter(load_spec(args.spec))
+    info = {
+        "name": fighter.name,
+        "stats": {k: getattr(fighter.stats, k) for k in STAT_FIELDS},
+        "derived": {k: getattr(fighter, k) for k in ("atp", "dfp", "tou", "wil", "pwr", "defense")},
+        "vitals": {
+            "body": fighter.body_string,
+            "mind": fighter.mind_string,
+            "soul": fighter.soul_string
+        },
+        "weapon": fighter.weapon_string,
+        "armor": fighter.armor_string,
+        "implement": fighter.implement_string,
+        "damage": fighter.damage,
+        "crit": fighter.crit
+    }
+    print(json.dumps(info, indent=2))
+    return 0
+
+def cmd_validate(args) -> int:
+    from validator import DataValidationError, load_verified
+    try:
+        compiled = load_verified(args.file, use_cache=not args.no_cache)
+    except DataValidationError as e:
+        for err in e.errors:
+            print(err, file=sys.stderr)
+        print(f"{args.file}: {len(e.errors)} error(s)")
+        return 1
+    except ValueError as e:
+        print(f"{args.file}: not valid JSON: {e}", file=sys.stderr)
+        return 1
+    print(f"{args.file}: ok ({compiled.digest[:12]}, {len(compiled.crits)} crits compiled)")
+    return 0
+
+def make_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="cli", description="System 12 Arena headless tools")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    simulate = commands.add_parser("simulate", help="duel two fighters many times")
+    simulate.add_argument("first", help="race/class[/weapon/armor/implement]")
+    simulate.add_argument("second", help="race/class[/weapon/armor/implement]")
+    simulate.add_argument("-n", "--fights", type=int, default=1000)
+    simulate.add_argument("--seed", type=int, default=None)
+    simulate.add_argument("--cache", metavar="FILE", help="reuse seeded results stored in FILE")
+    simulate.set_defaults(run=cmd_simulate)
+
+    sweep = commands.add_parser("sweep", help="duel every race/class pair")
+    sweep.add_argument("-n", "--fights", type=int, default=1000)
+    sweep.add_argument("--seed", type=int, default=None)
+    sweep.add_argument("--workers", type=int, default=None)
+    sweep.add_argument("--checkpoint", metavar="DIR", help="save progress in DIR and resume from it")
+    sweep.add_argument("--chunk", type=positive_int, default=1000, help="fights between checkpoints")
+    sweep.add_argument("--cache", metavar="FILE", help="reuse seeded results stored in FILE")
+    sweep.set_defaults(run=cmd_sweep)
+
+    submit = commands.add_parser("submit", help="queue a sweep for worker processes")
+    submit.add_argument("queue", help="shared queue database file")
+    submit.add_argument("-n", "--fights", type=int, default=1000)
+    submit.add_argument("--seed", type=int, default=0)
+    submit.add_argument("--shard-fights", type=positive_int, default=250, help="fights per shard")
+    submit.set_defaults(run=cmd_submit)
+
+    worker = commands.add_parser("work", help="run queued shards until none are left")
+    worker.add_argument("queue", help="shared queue database file")
+    worker.add_argument("--worker-id", default=None)
+    worker.add_argument("--lease", type=float, default=300.0, help="seconds before an unfinished shard is handed out again")
+    worker.add_argument("--cache", metavar="FILE", help="reuse seeded results stored in FILE")
+    worker.set_defaults(run=cmd_work)
+
+    collect = commands.add_parser("collect", help="wait for a queued sweep and print it")
+    collect.add_argument("queue", help="shared queue database file")
+    collect.add_argument("--timeout", type=float, default=None)
+    collect.set_defaults(run=cmd_collect)
+
+    adaptive = commands.add_parser("adaptive", help="duel until each matchup's score is known to --width")
+    adaptive.add_argument("first", help="race/class[/weapon/armor/implement]")
+    adaptive.add_argument("second", nargs="+", help="one or more opponents")
+    adaptive.add_argument("--width", type=float, default=0.05, help="target 95%% confidence interval width")
+    adaptive.add_argument("--seed", type=int, default=0)
+    adaptive.add_argument("--round-pairs", type=positive_int, default=50, help="antithetic pairs per round")
+    adaptive.add_argument("--max-pairs", type=at_least(2), default=20000)
+    adaptive.set_defaults(run=cmd_adaptive)
+
+    inspect = commands.add_parser("inspect", help="show a fighter's stats")
+    inspect.add_argument("spec", help="race/class[/weapon/armor/implement]")
+    inspect.set_defaults(run=cmd_inspect)
+
+    validate = commands.add_parser("validate", help="check a game data file")
+    validate.add_argument("file", nargs="?", default="chardata.json", help="file in data/")
+    validate.add_argument("--no-cache", action="store_true", help="don't read or write compiled artifacts")
+    validate.set_defaults(run=cmd_validate)
+
+    return parser
+
+def main(argv=None) -> int:
+    parser = make_parser()
+    args = parser.parse_args(argv)
+    if getattr(args, "checkpoint", None) and args.seed is None:
+        parser.error("--checkpoint needs --seed so resumed runs repeat")
+    from validator import DataValidationError
+    try:
+        return args.run(args)
+    except BadSpecError as e:
+        parser.error(str(e))
+    except DataValidationError as e:
+        for err in e.errors:
+            print(err, file=sys.stderr)
+        print(f"game data has {len(e.errors)} error(s)", file=sys.stderr)
+        return 1
+    except json.JSONDecodeError as e:
+        print(f"not valid JSON: {e}", file=sys.stderr)
+        return 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,8 +1,12 @@
+import random
 import re
+import threading
 
 from character import Character, DamageType, Effect
-from typing import List, Optional, Tuple
+from typing import Callable, List, Optional, Tuple
 from collections import namedtuple
+from contextlib import contextmanager
+from functools import lru_cache
 from random import randint
 
 
@@ -19,15 +23,38 @@ class BadDiceError(Exception):
     def __init__(self, bad_str: str):
         super().__init__(f"{bad_str} is not a valid dice string.")
 
+class RollSource(threading.local):
+    """
+    Per-thread overrides for where combat rolls come from.
+    `rng` feeds `dice`; `None` uses the `random` module.
+    `d100` feeds `d100`; `None` rolls `dice(100)`. See `adaptive.D100Stream`.
+    """
+    rng: Optional[random.Random] = None
+    d100: Optional[Callable[[], int]] = None
+
+ROLLS = RollSource()
+
+@contextmanager
+def rolling_with(rng: random.Random):
+    """Draws this thread's combat rolls from `rng` while active. Other threads keep their own."""
+    saved = ROLLS.rng
+    ROLLS.rng = rng
+    try:
+        yield rng
+    finally:
+        ROLLS.rng = saved
+
 def dice(sides: int, num: int=1, bonus=0) -> int:
     """
     Rolls `num`d`sides`+`bonus`. 
     `num` defaults to 1.
     `bonus` defaults to 0.
     """
+    rng = ROLLS.rng
+    roll = randint if rng is None else rng.randint
     acc = 0
     for _ in range(num):
-        acc += randint(1, sides)
+        acc += roll(1, sides)
     
     return acc + bonus
 
@@ -79,10 +106,64 @@ def dice_script_parse(character: Character, d_str: str) -> str:
 
     return result
 
+class DamageTemplate:
+    """
+    A rollable dice string parsed ahead of time.
+    Constant terms are folded together; dice terms keep their order
+    so rolls draw from the RNG exactly like `dice_str_ext` would.
+    """
+
+    def __init__(self, d_str: str):
+        self.d_str = d_str
+        self.bonus = 0
+        self.terms: List[Tuple[int, int, int]] = []
+        for term in re.findall(DICE_PATTERN, d_str):
+            if "d" in term:
+                ns, ds = term.split("d")
+                sign = -1 if term.startswith("-") else 1
+                self.terms.append((sign, abs(int(ns)), int(ds)))
+            else:
+                self.bonus += int(term)
+
+    def roll(self) -> int:
+        acc = self.bonus
+        for sign, num, sides in self.terms:
+            acc += sign * dice(sides, num)
+        return acc
+
+    def __repr__(self):
+        return f"DamageTemplate({self.d_str!r})"
 
+@lru_cache(maxsize=1024)
+def compile_dice(d_str: str) -> DamageTemplate:
+    """Returns a cached `DamageTemplate` for the rollable string `d_str`."""
+    return DamageTemplate(d_str)
+
+def bind_damage(character: Character, d_str: str) -> DamageTemplate:
+    """
+    Returns `d_str` bound to `character` as a `DamageTemplate`.
+    Templates are cached on the character and only re-bound when
+    its weapon, implement, or the stat mods `d_str` can refer to change.
+    """
+    imp = character.implement.damage if character.implement else "0"
+    key = (character.damage, imp, character.str_mod, character.skl_mod)
+    cached = character.damage_templates.get(d_str)
+    if cached and cached[0] == key:
+        return cached[1]
+
+    template = compile_dice(dice_script_parse(character, d_str))
+    character.damage_templates[d_str] = (key, template)
+    return template
+
+def roll_damage(character: Character, d_str: str) -> int:
+    """Rolls the script dice string `d_str` for `character`."""
+    return bind_damage(character, d_str).roll()
 
 def d100() -> int:
     """Convenience method for rolling a d100. Most rolls in the combat system are d100s."""
+    source = ROLLS.d100
+    if source is not None:
+        return source()
     return dice(100)
 
 def apply_effect(victim: Character, eff: Effect):
@@ -105,16 +186,22 @@ def remove_effect(victim: Character, eff: Effect, raw=False):
     del victim.effects[eff.name]
 
 def tick_effects(victim: Character):
-    """Ticks all effects on `victim` and removes them if their durations are 0 or less."""
+    """
+    Ticks all effects on `victim` and removes them if their durations are 0 or less.
+    Effects removed by another effect's tick (like a Shield broken by Burn) are skipped.
+    """
     to_remove: List[Effect] = []
-    for eff in victim.effects.values():
+    for eff in list(victim.effects.values()):
+        if victim.effects.get(eff.name) is not eff:
+            continue
         eff.duration -= 1
         eff.on_tick(victim)
         if eff.duration <= 0:
             to_remove.append(eff)
     
     for done_effect in to_remove:
-        remove_effect(victim, done_effect)
+        if victim.effects.get(done_effect.name) is done_effect:
+            remove_effect(victim, done_effect)
 
 def hit(attacker: Character, defender: Character, atk_stat: str, def_stat: str) -> RollResult:
     if atk_stat == "atp":
@@ -154,40 +241,118 @@ def hit(attacker: Character, defender: Character, atk_stat: str, def_stat: str)
         crit=crit
     )
 
-def damage(victim: Character, amt: int, dtype: DamageType, armor_ok=True, shield_ok=True):
-    #All damage tries to go to shield first
-    maybe_shield = victim.find_effect("Shield")
-    if maybe_shield and maybe_shield.potency > 0 and shield_ok:
-        remainder = amt - maybe_shield.potency
-        maybe_shield.potency = -remainder
+class DamagePacket:
+    """
+    One instance of damage headed for `victim`.
+    Pipeline stages whittle down `remainder`, which starts at `amt`.
+    """
+    __slots__ = ('victim', 'amt', 'dtype', 'armor_ok', 'shield_ok', 'remainder')
+
+    def __init__(
+        self,
+        victim: Character,
+        amt: int,
+        dtype: DamageType,
+        armor_ok: bool=True,
+        shield_ok: bool=True
+    ):
+        self.victim = victim
+        self.amt = amt
+        self.dtype = dtype
+        self.armor_ok = armor_ok
+        self.shield_ok = shield_ok
+        self.remainder = amt
+
+def shield_stage(packet: DamagePacket):
+    """All damage tries to go to shield first."""
+    if not packet.shield_ok:
+        return
+    maybe_shield = packet.victim.find_effect("Shield")
+    if maybe_shield and maybe_shield.potency > 0:
+        packet.remainder = packet.amt - maybe_shield.potency
+        maybe_shield.potency = -packet.remainder
 
         #Shield is broken at pot 0
         if maybe_shield.potency <= 0:
-            remove_effect(victim, maybe_shield)
-    else:
-        remainder = amt
-    
-    #Damage is reduced by armor if it can be
-    maybe_armor = victim.armor
-    if maybe_armor and armor_ok:
+            remove_effect(packet.victim, maybe_shield)
+
+def armor_stage(packet: DamagePacket):
+    """Damage is reduced by armor if it can be."""
+    maybe_armor = packet.victim.armor
+    if maybe_armor and packet.armor_ok:
         #If the attack doesn't go through armor, it damages broken armor
         if maybe_armor.is_broken:
-           maybe_armor.durability -= 2
+            maybe_armor.durability -= 2
         else:
             #Damage is reduced by armor. if fully stopped, less armor damage.
-            remainder -= maybe_armor.defense
-            if remainder <= 0:
+            packet.remainder -= maybe_armor.defense
+            if packet.remainder <= 0:
                 maybe_armor.durability -= 1
             else:
                 maybe_armor.durability -= 2
+
+def vital_stage(packet: DamagePacket):
+    """Remaining damage goes to the correct vital."""
+    if packet.remainder > 0:
+        victim = packet.victim
+        if packet.dtype == DamageType.BODY:
+            victim.body -= packet.remainder
+        elif packet.dtype == DamageType.MIND:
+            victim.mind -= packet.remainder
+        elif packet.dtype == DamageType.SOUL:
+            victim.soul -= packet.remainder
+
+class DamagePipeline:
+    """
+    Resolves damage packets through an ordered list of stages.
+    A stage is any callable taking a `DamagePacket`.
+
+    Batches run stage by stage: every packet goes through the first stage
+    before any goes through the second. Packets are kept in order within a stage,
+    so this matches resolving them one at a time as long as each stage
+    only reads state that earlier stages don't write.
+    """
+
+    def __init__(self, stages: List):
+        self.stages = list(stages)
+
+    def insert(self, before, stage):
+        """Inserts `stage` ahead of the existing stage `before`."""
+        self.stages.insert(self.stages.index(before), stage)
+
+    def remove(self, stage):
+        self.stages.remove(stage)
+
+    def run(self, packets: List[DamagePacket]) -> List[DamagePacket]:
+        for stage in self.stages:
+            for packet in packets:
+                stage(packet)
+        return packets
+
+DEFAULT_STAGES = [shield_stage, armor_stage, vital_stage]
+DAMAGE_PIPELINE = DamagePipeline(DEFAULT_STAGES)
+
+def damage(victim: Character, amt: int, dtype: DamageType, armor_ok=True, shield_ok=True):
+    """Deals `amt` damage of `dtype` to `victim` through `DAMAGE_PIPELINE`."""
+    DAMAGE_PIPELINE.run((DamagePacket(victim, amt, dtype, armor_ok, shield_ok),))
+
+def attack(
+    attacker: Character,
+    defender: Character,
+    atk_stat: str="atp",
+    def_stat: str="dfp",
+    dtype: DamageType=DamageType.BODY
+) -> RollResult:
+    """
+    Makes a full attack from `attacker` against `defender`.
+    Melee attacks (`atp`) roll the attacker's weapon damage,
+    spell attacks (`pwr`) roll the attacker's implement damage.
+    Returns the `RollResult` of the attack.
+    """
+    result = hit(attacker, defender, atk_stat, def_stat)
+    if result.success:
+        d_str = attacker.damage if atk_stat == "atp" else "imp"
+        amt = roll_damage(attacker, d_str)
+        damage(defender, amt, dtype)
     
-    #Remaining damage goes to the correct vital
-    if remainder > 0:
-        if dtype == DamageType.BODY:
-            victim.body -= remainder
-        elif dtype == DamageType.MIND:
-            victim.mind -= remainder
-        elif dtype == DamageType.SOUL:
-            victim.soul -= remainder
-
-    
\ No newline at end of file
+    return result
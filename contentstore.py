@@ -0,0 +1,168 @@
+"""
+Optional SQLite backend for game content.
+
+A `ContentStore` looks like `GAME_DATA` to the factories: `store["weapons"]["dagger"]`
+returns the same dict the JSON would. It can be passed anywhere the factories
+take a `data` table. Rows are fetched on demand, and recently used rows sit
+in a small LRU per section. Numeric columns the balance tools filter on are
+indexed (see `query`).
+"""
+import json
+import sqlite3
+
+from collections import OrderedDict
+from collections.abc import Mapping
+from typing import Iterator, List, Optional, Tuple
+
+SECTIONS = ("classes", "races", "weapons", "armor", "implements")
+#Numeric fields copied out of each entry into indexed columns.
+INDEXED_FIELDS = ("atp", "defense", "pwr", "durability")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    section TEXT NOT NULL,
+    build_id TEXT NOT NULL,
+    name TEXT,
+    body TEXT NOT NULL,
+    atp INTEGER,
+    defense INTEGER,
+    pwr INTEGER,
+    durability INTEGER,
+    PRIMARY KEY (section, build_id)
+);
+CREATE INDEX IF NOT EXISTS entries_atp ON entries (section, atp);
+CREATE INDEX IF NOT EXISTS entries_defense ON entries (section, defense);
+CREATE INDEX IF NOT EXISTS entries_pwr ON entries (section, pwr);
+CREATE INDEX IF NOT EXISTS entries_durability ON entries (section, durability);
+"""
+
+class StoreSection(Mapping):
+    """One section of a `ContentStore`, mapping build ids to entries."""
+
+    def __init__(self, store: "ContentStore", section: str):
+        self.store = store
+        self.section = section
+        self.hot: OrderedDict = OrderedDict()
+
+    def __getitem__(self, build_id: str) -> dict:
+        if build_id in self.hot:
+            self.hot.move_to_end(build_id)
+            return self.hot[build_id]
+
+        row = self.store.conn.execute(
+            "SELECT body FROM entries WHERE section = ? AND build_id = ?",
+            (self.section, build_id)
+        ).fetchone()
+        if row is None:
+            raise KeyError(build_id)
+        entry = json.loads(row[0])
+        self.hot[build_id] = entry
+        if len(self.hot) > self.store.cache_size:
+            self.hot.popitem(last=False)
+        return entry
+
+    def __iter__(self) -> Iterator[str]:
+        cursor = self.store.conn.execute(
+            "SELECT build_id FROM entries WHERE section = ? ORDER BY build_id",
+            (self.section,)
+        )
+        return (row[0] for row in cursor)
+
+    def __len__(self) -> int:
+        return self.store.conn.execute(
+            "SELECT COUNT(*) FROM entries WHERE section = ?", (self.section,)
+        ).fetchone()[0]
+
+    def __contains__(self, build_id) -> bool:
+        if build_id in self.hot:
+            return True
+        return self.store.conn.execute(
+            "SELECT 1 FROM entries WHERE section = ? AND build_id = ?",
+            (self.section, build_id)
+        ).fetchone() is not None
+
+class ContentStore(Mapping):
+    """
+    Game content in an SQLite database, read through the same
+    `data[section][build_id]` lookups as `GAME_DATA`.
+    """
+
+    def __init__(self, path: str=":memory:", cache_size: int=256):
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript(SCHEMA)
+        self.cache_size = cache_size
+        self.sections = {section: StoreSection(self, section) for section in SECTIONS}
+
+    def __getitem__(self, section: str) -> StoreSection:
+        return self.sections[section]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.sections)
+
+    def __len__(self) -> int:
+        return len(self.sections)
+
+    def import_json(self, data: dict):
+        """Bulk loads `data` (the chardata.json layout), replacing entries with the same ids."""
+        rows = (
+            (
+                section,
+                build_id,
+                entry.get("name"),
+                json.dumps(entry),
+                *(entry.get(f, 0 if f == "atp" and section == "weapons" else None) for f in INDEXED_FIELDS)
+            )
+            for section in SECTIONS
+            for build_id, entry in data.get(section, {}).items()
+        )
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows
+            )
+        for section in self.sections.values():
+            section.hot.clear()
+
+    @classmethod
+    def from_json_file(cls, json_path: str, db_path: str=":memory:") -> "ContentStore":
+        store = cls(db_path)
+        with open(json_path) as f:
+            store.import_json(json.load(f))
+        return store
+
+    def query(
+        self,
+        section: str,
+        field: str,
+        lo: Optional[int]=None,
+        hi: Optional[int]=None,
+        limit: Optional[int]=None
+    ) -> List[Tuple[str, dict]]:
+        """
+        Returns `(build_id, entry)` pairs in `section` whose `field` is
+        between `lo` and `hi` inclusive, ordered by `field`.
+        Either bound can be left open. `field` must be one of `INDEXED_FIELDS`.
+        """
+        if not field in INDEXED_FIELDS:
+            raise ValueError(f"{field} is not an indexed field")
+        sql = f"SELECT build_id, body FROM entries WHERE section = ? AND {field} IS NOT NULL"
+        params: list = [section]
+        if lo is not None:
+            sql += f" AND {field} >= ?"
+            params.append(lo)
+        if hi is not None:
+            sql += f" AND {field} <= ?"
+            params.append(hi)
+        sql += f" ORDER BY {field}, build_id"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return [(build_id, json.loads(body)) for build_id, body in self.conn.execute(sql, params)]
+
+    def weapons_with_atp(self, min_atp: int) -> List[Tuple[str, dict]]:
+        return self.query("weapons", "atp", lo=min_atp)
+
+    def armor_by_defense(self, lo: int, hi: int) -> List[Tuple[str, dict]]:
+        return self.query("armor", "defense", lo, hi)
+
+    def close(self):
+        self.conn.close()
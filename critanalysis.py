@@ -0,0 +1,267 @@
+"""
+Static analysis of CritScript (see `deprecated/critscript.md`).
+
+`analyze` computes min, max and expected damage per `DamageType`, plus
+effect application counts, for the script's target and for its user. It
+never rolls anything. Damage bounds are exact: closed form, or the full
+dice distribution when clamping negative rolls to 0 changes the mean. `atk`
+blocks are weighted by hit and crit chances from the d100 rules in
+`combat.hit`. A script's cost is the number of statements it would execute
+in the worst case. Scripts over `MAX_SCRIPT_COST` are flagged as runaway
+before they reach a simulation.
+
+Damage is what the dice roll, before shields and armor.
+"""
+import re
+
+from character import Character, DamageType
+from collections import namedtuple
+from combat import DICE_PATTERN
+from crits import ChainCrit, CritAction, DamageCrit, EffectCrit, compile_crit
+from deprecated.critscript import ATK_PATTERN, DMG_PATTERN, DO_PATTERN, EFF_PATTERN, crit_compile
+from functools import lru_cache
+from typing import Dict, List, Tuple, Union
+
+MAX_SCRIPT_COST = 1000
+TARGET = "target"
+SELF = "self"
+
+Bounds = namedtuple('Bounds', ('min', 'max', 'mean'))
+ZERO = Bounds(0, 0, 0.0)
+#Keyed by (`TARGET` or `SELF`, `DamageType` or effect name).
+Tally = Dict[tuple, Bounds]
+
+ScriptAnalysis = namedtuple('ScriptAnalysis', ('damage', 'effects', 'cost', 'runaway'))
+ScriptContext = namedtuple(
+    'ScriptContext',
+    ('atp', 'pwr', 'weapon', 'imp', 'str_mod', 'skl_mod', 'crit', 'defense', 'self_defense')
+)
+
+def context_for(user: Character, target: Character) -> ScriptContext:
+    """What `analyze` needs to know about `user` using a script on `target`."""
+    return ScriptContext(
+        atp=user.atp,
+        pwr=user.pwr,
+        weapon=user.damage,
+        imp=user.implement.damage if user.implement else "0",
+        str_mod=user.str_mod,
+        skl_mod=user.skl_mod,
+        crit=user.crit,
+        defense={"dfp": target.dfp, "tou": target.tou, "wil": target.wil},
+        self_defense={"dfp": user.dfp, "tou": user.tou, "wil": user.wil}
+    )
+
+def parse_script(code: Union[List[str], str]) -> list:
+    """
+    Checks `code` with `crit_compile` and turns it into a tree of statements:
+    `("damage", dtype, d_str)`, `("effect", name)`, `("weaponcrit",)`,
+    `("do", times, body)`, `("self", body)` and
+    `("atk", atk_stat, def_stat, body, hit, miss, crit)`.
+    Raises `CritScriptSyntaxError` for bad scripts.
+    """
+    lines = crit_compile(code)
+    root: list = []
+    stack = [root]
+    for line in lines:
+        do_match = DO_PATTERN.match(line)
+        atk_match = ATK_PATTERN.match(line)
+        eff_match = EFF_PATTERN.match(line)
+        dmg_match = DMG_PATTERN.match(line)
+        if do_match:
+            body: list = []
+            stack[-1].append(("do", int(do_match.group("times")), body))
+            stack.append(body)
+        elif line == "self":
+            body = []
+            stack[-1].append(("self", body))
+            stack.append(body)
+        elif atk_match:
+            blocks: Tuple[list, list, list, list] = ([], [], [], [])
+            stack[-1].append(("atk", atk_match.group("atk_stat"), atk_match.group("defense_stat"), *blocks))
+            stack.append(blocks[0])
+        elif line in ("hit", "miss", "crit"):
+            atk = stack[-2][-1]
+            stack.append(atk[4 + ("hit", "miss", "crit").index(line)])
+        elif line in ("done", "endself", "endatk", "endhit", "endmiss", "endcrit"):
+            stack.pop()
+        elif eff_match:
+            stack[-1].append(("effect", eff_match.group("eff")))
+        elif dmg_match:
+            dtype = DamageType[dmg_match.group("dtype").upper()]
+            stack[-1].append(("damage", dtype, dmg_match.group("dmg")))
+        elif line == "weaponcrit":
+            stack[-1].append(("weaponcrit",))
+    return root
+
+def hit_chances(atk_bonus: int, def_bonus: int) -> Tuple[float, float, float]:
+    """Chances of a miss, a plain hit and a crit for one `combat.hit` roll."""
+    miss = hit = crit = 0
+    for raw_roll in range(1, 101):
+        atk_roll = atk_bonus + raw_roll
+        if atk_roll - def_bonus >= 50 or raw_roll >= 95:
+            crit += 1
+        elif atk_roll >= def_bonus:
+            hit += 1
+        else:
+            miss += 1
+    return (miss / 100, hit / 100, crit / 100)
+
+def dice_terms(d_str: str) -> Tuple[List[Tuple[int, int, int]], int]:
+    """The dice terms `(sign, num, sides)` and constant total of a rollable dice string."""
+    terms = []
+    bonus = 0
+    for term in re.findall(DICE_PATTERN, d_str):
+        if "d" in term:
+            ns, ds = term.split("d")
+            terms.append((-1 if term.startswith("-") else 1, abs(int(ns)), int(ds)))
+        else:
+            bonus += int(term)
+    return terms, bonus
+
+@lru_cache(maxsize=1024)
+def dice_bounds(d_str: str) -> Bounds:
+    """
+    Bounds of a rollable dice string, with results below 0 counted as 0 like `combat.damage` does.
+    Computed in closed form unless the clamp at 0 can change the mean.
+    """
+    terms, bonus = dice_terms(d_str)
+    low = high = bonus
+    mean = float(bonus)
+    for sign, num, sides in terms:
+        if sign > 0:
+            low += num
+            high += num * sides
+        else:
+            low -= num * sides
+            high -= num
+        mean += sign * num * (sides + 1) / 2
+    if low >= 0:
+        return Bounds(low, high, mean)
+    elif high <= 0:
+        return ZERO
+    return Bounds(0, high, clamped_mean(terms, bonus))
+
+def clamped_mean(terms: List[Tuple[int, int, int]], bonus: int) -> float:
+    """
+    Mean of `max(0, roll)`, from the exact distribution of the roll.
+    Each die is a sliding-window sum over the totals so far, so it costs
+    one pass over them instead of one per face.
+    """
+    low = bonus
+    #`dist[i]` is the chance of a total of `low + i`.
+    dist = [1.0]
+    for sign, num, sides in terms:
+        for _ in range(num):
+            new_dist = [0.0] * (len(dist) + sides - 1)
+            window = 0.0
+            for idx in range(len(new_dist)):
+                if idx < len(dist):
+                    window += dist[idx]
+                if idx >= sides:
+                    window -= dist[idx - sides]
+                new_dist[idx] = window / sides
+            dist = new_dist
+            low += 1 if sign > 0 else -sides
+    return sum(max(0, low + idx) * p for idx, p in enumerate(dist))
+
+def resolve_dice(d_str: str, context: ScriptContext) -> str:
+    """Substitutes loadout terms like `dice_script_parse` does."""
+    result = d_str.replace("weapon", context.weapon)
+    result = result.replace("imp", context.imp)
+    result = result.replace("sklmod", str(context.skl_mod))
+    return result.replace("strmod", str(context.str_mod))
+
+def add_tallies(*tallies: Tally) -> Tally:
+    total: Tally = dict()
+    for tally in tallies:
+        for key, b in tally.items():
+            a = total.get(key, ZERO)
+            total[key] = Bounds(a.min + b.min, a.max + b.max, a.mean + b.mean)
+    return total
+
+def scale_tally(tally: Tally, times: int) -> Tally:
+    return {key: Bounds(b.min * times, b.max * times, b.mean * times) for key, b in tally.items()}
+
+def branch_tallies(outcomes: List[Tuple[float, Tally]]) -> Tally:
+    """Combines mutually exclusive outcomes, each `(chance, tally)`."""
+    possible = [(p, tally) for p, tally in outcomes if p > 0]
+    keys = {key for _, tally in possible for key in tally}
+    return {
+        key: Bounds(
+            min(tally.get(key, ZERO).min for _, tally in possible),
+            max(tally.get(key, ZERO).max for _, tally in possible),
+            sum(p * tally.get(key, ZERO).mean for p, tally in possible)
+        )
+        for key in keys
+    }
+
+def crit_tally(action: CritAction, context: ScriptContext, who: str) -> Tally:
+    if isinstance(action, ChainCrit):
+        return add_tallies(*(crit_tally(a, context, who) for a in action.actions))
+    elif isinstance(action, DamageCrit):
+        return {(who, action.dtype): dice_bounds(resolve_dice(action.d_str, context))}
+    elif isinstance(action, EffectCrit):
+        return {(who, action.name): Bounds(1, 1, 1.0)}
+    return dict()
+
+def analyze_block(block: list, context: ScriptContext, who: str) -> Tuple[Tally, int]:
+    """Returns the tally and worst-case statement count of `block`."""
+    tallies = []
+    cost = 0
+    for stmt in block:
+        kind = stmt[0]
+        cost += 1
+        if kind == "damage":
+            tallies.append({(who, stmt[1]): dice_bounds(resolve_dice(stmt[2], context))})
+        elif kind == "effect":
+            tallies.append({(who, stmt[1]): Bounds(1, 1, 1.0)})
+        elif kind == "weaponcrit":
+            tallies.append(crit_tally(compile_crit(context.crit), context, who))
+        elif kind == "do":
+            tally, body_cost = analyze_block(stmt[2], context, who)
+            tallies.append(scale_tally(tally, stmt[1]))
+            cost += stmt[1] * body_cost
+        elif kind == "self":
+            tally, body_cost = analyze_block(stmt[1], context, SELF)
+            tallies.append(tally)
+            cost += body_cost
+        elif kind == "atk":
+            _, atk_stat, def_stat, body, hit_block, miss_block, crit_block = stmt
+            defense = context.defense if who == TARGET else context.self_defense
+            def_bonus = int(def_stat) if def_stat.isdigit() else defense[def_stat]
+            miss, hit, crit = hit_chances(getattr(context, atk_stat), def_bonus)
+            body_tally, body_cost = analyze_block(body, context, who)
+            hit_tally, hit_cost = analyze_block(hit_block, context, who)
+            miss_tally, miss_cost = analyze_block(miss_block, context, who)
+            crit_tally_, crit_cost = analyze_block(crit_block, context, who)
+            tallies.append(body_tally)
+            tallies.append(branch_tallies([
+                (miss, miss_tally),
+                (hit, hit_tally),
+                (crit, add_tallies(hit_tally, crit_tally_))
+            ]))
+            cost += body_cost + max(miss_cost, hit_cost + crit_cost)
+    return add_tallies(*tallies), cost
+
+def analyze(code: Union[List[str], str], context: ScriptContext, max_cost: int=MAX_SCRIPT_COST) -> ScriptAnalysis:
+    """
+    Analyzes CritScript `code` used with `context`, without running it.
+    Results are per target. Raises `CritScriptSyntaxError` for bad scripts.
+    """
+    tally, cost = analyze_block(parse_script(code), context, TARGET)
+    damage = {key: b for key, b in tally.items() if isinstance(key[1], DamageType)}
+    effects = {key: b for key, b in tally.items() if not isinstance(key[1], DamageType)}
+    return ScriptAnalysis(damage, effects, cost, cost > max_cost)
+
+def expected_damage(analysis: ScriptAnalysis, who: str=TARGET) -> float:
+    """Total expected damage of every type dealt to `who`."""
+    return sum(b.mean for (side, _), b in analysis.damage.items() if side == who)
+
+def rank(scripts: Dict[str, Union[List[str], str]], context: ScriptContext) -> List[Tuple[str, float]]:
+    """Scripts by expected damage to the target, highest first. Runaway scripts are left out."""
+    ranked = []
+    for name, code in scripts.items():
+        analysis = analyze(code, context)
+        if not analysis.runaway:
+            ranked.append((name, expected_damage(analysis)))
+    return sorted(ranked, key=lambda item: -item[1])
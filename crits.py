@@ -0,0 +1,143 @@
+import re
+
+from character import Character, DamageType
+from combat import apply_effect, bind_damage
+from effects import Bleed, Burn, Damage, Might, Shield, Soulburn, Stun, Weakness
+from typing import Callable, Dict, List, Tuple
+
+CRIT_DICE_PATTERN = re.compile(r"^(?:[+-]?(?:\d+d\d+|\d+|imp|sklmod|strmod|weapon))+$")
+
+class BadCritError(Exception):
+    """Custom exception for crit strings that can't be compiled."""
+    def __init__(self, crit_str: str, reason: str):
+        super().__init__(f"{crit_str!r} is not a valid crit: {reason}")
+        self.crit_str = crit_str
+        self.reason = reason
+
+#Builds an effect for the crit's target from (duration, potency, target).
+EFFECT_BUILDERS: Dict[str, Tuple[Callable, bool]] = {
+    "burn": (lambda dur, pot, target: Burn(dur), False),
+    "bleed": (lambda dur, pot, target: Bleed(dur), False),
+    "soulburn": (lambda dur, pot, target: Soulburn(dur), False),
+    "stun": (lambda dur, pot, target: Stun(dur), False),
+    "might": (lambda dur, pot, target: Might(dur), False),
+    "weakness": (lambda dur, pot, target: Weakness(dur), False),
+    "shield": (lambda dur, pot, target: Shield(dur, pot), True),
+}
+
+DAMAGE_TYPES = {dtype.name.lower(): dtype for dtype in DamageType}
+
+class CritAction:
+    """
+    A compiled crit. Call it with `(attacker, defender)` to apply it.
+    `effect_names` lists what it applies, for reporting.
+    This is an abstract class.
+    """
+    effect_names: Tuple[str, ...] = ()
+
+    def __call__(self, attacker: Character, defender: Character):
+        pass
+
+class EffectCrit(CritAction):
+    """Applies a fresh effect to the defender."""
+
+    def __init__(self, name: str, duration: int, potency: int=0):
+        self.name = name
+        self.duration = duration
+        self.potency = potency
+        self.effect_names = (name,)
+
+    def __call__(self, attacker: Character, defender: Character):
+        builder = EFFECT_BUILDERS[self.name][0]
+        apply_effect(defender, builder(self.duration, self.potency, defender))
+
+    def __repr__(self):
+        return f"EffectCrit({self.name!r}, {self.duration}, {self.potency})"
+
+class DamageCrit(CritAction):
+    """Deals extra damage bound to the attacker's stats and gear."""
+
+    def __init__(self, dtype: DamageType, d_str: str):
+        self.dtype = dtype
+        self.d_str = d_str
+        self.effect_names = ("damage",)
+
+    def __call__(self, attacker: Character, defender: Character):
+        rollable = bind_damage(attacker, self.d_str).d_str
+        apply_effect(defender, Damage(rollable, self.dtype))
+
+    def __repr__(self):
+        return f"DamageCrit({self.dtype}, {self.d_str!r})"
+
+class ChainCrit(CritAction):
+    """Runs several crit actions in order."""
+
+    def __init__(self, actions: List[CritAction]):
+        self.actions = actions
+        self.effect_names = tuple(name for action in actions for name in action.effect_names)
+
+    def __call__(self, attacker: Character, defender: Character):
+        for action in self.actions:
+            action(attacker, defender)
+
+def parse_crit_part(crit_str: str, part: str) -> CritAction:
+    words = part.split()
+    if len(words) < 3:
+        raise BadCritError(crit_str, f"{part!r} is too short")
+
+    kind = words[0]
+    if kind == "effect":
+        name = words[1]
+        if not name in EFFECT_BUILDERS:
+            raise BadCritError(crit_str, f"unknown effect {name}")
+        if len(words) > 4 or not all(w.isdigit() for w in words[2:]):
+            raise BadCritError(crit_str, "effects take a duration and optional potency")
+        duration = int(words[2])
+        potency = int(words[3]) if len(words) == 4 else 0
+        if duration <= 0:
+            raise BadCritError(crit_str, "duration must be positive")
+        if EFFECT_BUILDERS[name][1] and potency <= 0:
+            raise BadCritError(crit_str, f"{name} needs a potency")
+        return EffectCrit(name, duration, potency)
+    elif kind == "damage":
+        if len(words) != 3:
+            raise BadCritError(crit_str, "damage takes a type and a dice string")
+        if not words[1] in DAMAGE_TYPES:
+            raise BadCritError(crit_str, f"unknown damage type {words[1]}")
+        if not CRIT_DICE_PATTERN.match(words[2]):
+            raise BadCritError(crit_str, f"bad dice {words[2]}")
+        return DamageCrit(DAMAGE_TYPES[words[1]], words[2])
+    else:
+        raise BadCritError(crit_str, f"unknown crit kind {kind}")
+
+#Compiled crits by crit string. Can be primed with precompiled actions (see `validator`).
+CRIT_CACHE: Dict[str, CritAction] = dict()
+
+def compile_crit(crit_str: str) -> CritAction:
+    """
+    Compiles `crit_str` into a `CritAction`, caching the result.
+    Crit strings look like `effect stun 1`, `effect shield 3 10` or `damage body 2d4+sklmod`;
+    several can be chained with `;`.
+    Raises `BadCritError` if `crit_str` is invalid.
+    """
+    cached = CRIT_CACHE.get(crit_str)
+    if cached is not None:
+        return cached
+
+    parts = [p.strip().lower() for p in crit_str.split(";") if p.strip()]
+    if not parts:
+        raise BadCritError(crit_str, "empty crit")
+    actions = [parse_crit_part(crit_str, part) for part in parts]
+    action = actions[0] if len(actions) == 1 else ChainCrit(actions)
+    CRIT_CACHE[crit_str] = action
+    return action
+
+NO_CRIT = CritAction()
+
+def crit_for(character: Character) -> CritAction:
+    """Returns the compiled crit for `character`'s weapon, or the unarmed crit."""
+    weapon = character.weapon
+    if weapon and weapon.crit_action:
+        return weapon.crit_action
+    crit_str = character.crit
+    return compile_crit(crit_str) if crit_str else NO_CRIT
@@ -1,7 +1,18 @@
 import json
+import os
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
 
 def load_data(filename: str) -> dict:
-    with open(f"data/{filename}") as f:
+    with open(os.path.join(DATA_DIR, filename)) as f:
         return json.load(f)
 
-GAME_DATA = load_data("chardata.json")
\ No newline at end of file
+def __getattr__(name: str):
+    #`GAME_DATA` is loaded on first use, through `validator.load_verified`, so everything
+    #runs on verified data and importing this module never reads the data file.
+    if name == "GAME_DATA":
+        from validator import load_verified
+        data = load_verified().data
+        globals()["GAME_DATA"] = data
+        return data
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
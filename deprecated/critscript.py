@@ -48,7 +48,7 @@ class EarlyEndHitError(CritScriptSyntaxError):
 
 class EarlyEndMissError(CritScriptSyntaxError):
     """Raised when `endmiss` precedes `miss`."""
-    def __init__(self, line_no, int, line: str):
+    def __init__(self, line_no: int, line: str):
         super().__init__(line_no, line, "endmiss before miss")
 
 class NestedCritBlockError(CritScriptSyntaxError):
@@ -0,0 +1,245 @@
+"""
+Differential testing of combat engines.
+
+`REFERENCE` holds frozen copies of the original, straight-line combat rules:
+string-substituted dice, inline shield/armor/vital damage, `hit` and
+`tick_effects` (with the fix for effects removed mid-tick). They must not
+call into the live rules they are checked against. Any faster engine can be checked
+against it with `run_cases`. Each case builds random characters, loadouts and
+effect stacks, then runs the same random sequence of operations through both
+engines from the same RNG seed and compares every piece of resulting state.
+
+Run `python difftest.py [cases]` to check the live `combat` module.
+"""
+import random
+import sys
+import combat
+import effects as ef
+
+from character import Character, DamageType, clone, get_state
+from collections import namedtuple
+from contextlib import contextmanager
+from dataloader import GAME_DATA
+from simulation import build_fighter
+from typing import List, Optional
+
+Engine = namedtuple('Engine', ('name', 'hit', 'damage', 'tick_effects', 'attack'))
+Mismatch = namedtuple('Mismatch', ('seed', 'step', 'op', 'expected', 'actual'))
+
+def reference_damage(victim: Character, amt: int, dtype: DamageType, armor_ok=True, shield_ok=True):
+    maybe_shield = victim.find_effect("Shield")
+    if maybe_shield and maybe_shield.potency > 0 and shield_ok:
+        remainder = amt - maybe_shield.potency
+        maybe_shield.potency = -remainder
+        if maybe_shield.potency <= 0:
+            combat.remove_effect(victim, maybe_shield)
+    else:
+        remainder = amt
+
+    maybe_armor = victim.armor
+    if maybe_armor and armor_ok:
+        if maybe_armor.is_broken:
+            maybe_armor.durability -= 2
+        else:
+            remainder -= maybe_armor.defense
+            if remainder <= 0:
+                maybe_armor.durability -= 1
+            else:
+                maybe_armor.durability -= 2
+
+    if remainder > 0:
+        if dtype == DamageType.BODY:
+            victim.body -= remainder
+        elif dtype == DamageType.MIND:
+            victim.mind -= remainder
+        elif dtype == DamageType.SOUL:
+            victim.soul -= remainder
+
+def reference_tick_effects(victim: Character):
+    to_remove = []
+    for eff in list(victim.effects.values()):
+        if victim.effects.get(eff.name) is not eff:
+            continue
+        eff.duration -= 1
+        eff.on_tick(victim)
+        if eff.duration <= 0:
+            to_remove.append(eff)
+
+    for done_effect in to_remove:
+        if victim.effects.get(done_effect.name) is done_effect:
+            combat.remove_effect(victim, done_effect)
+
+def reference_hit(attacker: Character, defender: Character, atk_stat: str, def_stat: str) -> combat.RollResult:
+    if atk_stat == "atp":
+        atk_bonus = attacker.atp
+        atk_type = "melee"
+    elif atk_stat == "pwr":
+        atk_bonus = attacker.pwr
+        atk_type = "spell"
+    else:
+        raise combat.BadStatError(f"{atk_stat} is not a valid attack stat")
+
+    if def_stat == "dfp":
+        def_bonus = defender.dfp
+    elif def_stat == "tou":
+        def_bonus = defender.tou
+    elif def_stat == "wil":
+        def_bonus = defender.wil
+    else:
+        raise combat.BadStatError(f"{def_stat} is not a valid defense stat")
+
+    if atk_type == "melee" and attacker.weapon:
+        attacker.weapon.durability -= 1
+    elif atk_type == "spell" and attacker.implement:
+        attacker.implement.durability -= 1
+
+    raw_roll = combat.d100()
+    atk_roll = atk_bonus + raw_roll
+    threshold = atk_roll - def_bonus
+    crit = (threshold >= 50 or raw_roll >= 95)
+    success = (atk_roll >= def_bonus or crit)
+    return combat.RollResult(
+        roll=atk_roll,
+        target=def_bonus,
+        success=success,
+        threshold=threshold,
+        crit=crit
+    )
+
+def reference_attack(
+    attacker: Character,
+    defender: Character,
+    atk_stat: str="atp",
+    def_stat: str="dfp",
+    dtype: DamageType=DamageType.BODY
+):
+    result = reference_hit(attacker, defender, atk_stat, def_stat)
+    if result.success:
+        d_str = attacker.damage if atk_stat == "atp" else "imp"
+        amt = combat.dice_str_ext(combat.dice_script_parse(attacker, d_str))
+        reference_damage(defender, amt, dtype)
+    return result
+
+REFERENCE = Engine("reference", reference_hit, reference_damage, reference_tick_effects, reference_attack)
+
+def live_engine() -> Engine:
+    """The engine currently in `combat`."""
+    return Engine("combat", combat.hit, combat.damage, combat.tick_effects, combat.attack)
+
+@contextmanager
+def installed(engine: Engine):
+    """Routes effect damage (DOT ticks, crit `Damage`) through `engine` while active."""
+    saved = ef.damage
+    ef.damage = engine.damage
+    try:
+        yield
+    finally:
+        ef.damage = saved
+
+def random_spec(rng: random.Random) -> dict:
+    spec = {
+        "race": rng.choice(sorted(GAME_DATA["races"])),
+        "class": rng.choice(sorted(GAME_DATA["classes"]))
+    }
+    for slot, section in (("weapon", "weapons"), ("armor", "armor"), ("implement", "implements")):
+        if rng.random() < 0.7:
+            spec[slot] = rng.choice(sorted(GAME_DATA[section]))
+    return spec
+
+def random_effect(rng: random.Random) -> ef.Effect:
+    duration = rng.randint(1, 4)
+    kind = rng.randrange(7)
+    if kind == 0:
+        return ef.Burn(duration)
+    elif kind == 1:
+        return ef.Bleed(duration)
+    elif kind == 2:
+        return ef.Soulburn(duration)
+    elif kind == 3:
+        return ef.Shield(duration, rng.randint(1, 12))
+    elif kind == 4:
+        return ef.Might(duration)
+    elif kind == 5:
+        return ef.Weakness(duration)
+    return ef.Stun(duration)
+
+def random_ops(rng: random.Random, length: int) -> list:
+    ops = []
+    for _ in range(length):
+        kind = rng.randrange(5)
+        who = rng.randrange(2)
+        if kind == 0:
+            ops.append(("attack", who, rng.choice(("atp", "pwr")), rng.choice(("dfp", "tou", "wil"))))
+        elif kind == 1:
+            ops.append(("damage", who, rng.randint(0, 15), rng.choice(list(DamageType)), rng.random() < 0.5, rng.random() < 0.5))
+        elif kind == 2:
+            ops.append(("effect", who, random_effect(rng)))
+        elif kind == 3:
+            ops.append(("tick", who))
+        else:
+            ops.append(("hit", who, rng.choice(("atp", "pwr")), rng.choice(("dfp", "tou", "wil"))))
+    return ops
+
+def state(character: Character) -> tuple:
+    """Everything about `character` that combat can change, as plain comparable data."""
+    return (
+        get_state(character.stats),
+        tuple(item.durability if item else None for item in character.equipment),
+        tuple((type(eff), get_state(eff)) for eff in character.effects.values()),
+        tuple(character.modifiers)
+    )
+
+def run_ops(engine: Engine, fighters: List[Character], ops: list, seed: int) -> List[tuple]:
+    """Runs `ops` with `engine`, returning the state of both fighters after each step."""
+    random.seed(seed)
+    trace = []
+    with installed(engine):
+        for op in ops:
+            kind, who = op[0], op[1]
+            me, other = fighters[who], fighters[1 - who]
+            if kind == "attack":
+                out = engine.attack(other, me, op[2], op[3])
+            elif kind == "hit":
+                out = engine.hit(other, me, op[2], op[3])
+            elif kind == "damage":
+                out = engine.damage(me, op[2], op[3], op[4], op[5])
+            elif kind == "effect":
+                out = combat.apply_effect(me, clone(op[2]))
+            else:
+                out = engine.tick_effects(me)
+            trace.append((out, state(fighters[0]), state(fighters[1])))
+    return trace
+
+def run_case(engine: Engine, seed: int, length: int=20, reference: Engine=REFERENCE) -> Optional[Mismatch]:
+    """Runs one random case through both engines. Returns the first difference, if any."""
+    rng = random.Random(seed)
+    fighters = [build_fighter(random_spec(rng)) for _ in range(2)]
+    ops = random_ops(rng, length)
+    rng_seed = rng.getrandbits(32)
+
+    expected = run_ops(reference, [f.fork() for f in fighters], ops, rng_seed)
+    actual = run_ops(engine, [f.fork() for f in fighters], ops, rng_seed)
+    for step, (want, got) in enumerate(zip(expected, actual)):
+        if want != got:
+            return Mismatch(seed, step, ops[step], want, got)
+    return None
+
+def run_cases(engine: Engine, cases: int, first_seed: int=0, length: int=20) -> List[Mismatch]:
+    """Runs `cases` seeded cases and returns every mismatch."""
+    mismatches = []
+    for seed in range(first_seed, first_seed + cases):
+        found = run_case(engine, seed, length)
+        if found:
+            mismatches.append(found)
+    return mismatches
+
+if __name__ == "__main__":
+    import time
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    start = time.perf_counter()
+    found = run_cases(live_engine(), count)
+    elapsed = time.perf_counter() - start
+    for mismatch in found[:10]:
+        print(mismatch)
+    print(f"{count} cases, {len(found)} mismatches, {count / elapsed:.0f} cases/s")
+    sys.exit(1 if found else 0)
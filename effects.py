@@ -1,7 +1,7 @@
 from character import BaseStats, Effect, Character, DamageType
 from random import randint
 from enum import Enum
-from combat import damage, dice_str_ext
+from combat import damage, compile_dice
 
 
 class EffectNames(Enum):
@@ -25,6 +25,8 @@ class Damage(Effect):
     Describes an immediate instant damage effect.
     Used by spells and crit effects.
     """
+    __slots__ = ('type', 'armor_ok', 'shield_ok')
+
     def __init__(
         self, 
         dmg: str,
@@ -34,7 +36,7 @@ class Damage(Effect):
     ):
         """`dmg` should be a rollable string (see `combat.dice_str_ext`"""
         super().__init__(EffectNames.DAMAGE.value, Effect.IMMEDIATE, 0)
-        self.potency = dice_str_ext(dmg)
+        self.potency = compile_dice(dmg).roll()
         self.type = dtype
         self.armor_ok = armor_ok
         self.shield_ok = shield_ok
@@ -47,6 +49,7 @@ class DOT(Effect):
     Describes any kind of DoT effect.
     This is an abstract class.
     """
+    __slots__ = ('type', 'armor_ok', 'shield_ok')
 
     def __init__(
         self, 
@@ -73,6 +76,7 @@ class Burn(DOT):
     Stacks duration.
     Generally caused by magical effects.
     """
+    __slots__ = ()
 
     def __init__(self, duration: int):
         super().__init__(EffectNames.BURN.value, duration, 3, DamageType.BODY, False, True)
@@ -88,6 +92,7 @@ class Bleed(DOT):
     Stacks intensity, refreshes duration.
     Generally caused by big attacks.
     """
+    __slots__ = ()
 
     def __init__(self, duration: int):
         super().__init__(EffectNames.BLEED.value, duration, 1, DamageType.BODY, False, False)
@@ -105,6 +110,7 @@ class Soulburn(DOT):
     Stacks intensity and duration.
     Generally caused by foul warlock spells.
     """
+    __slots__ = ()
     def __init__(self, duration: int):
         super().__init__(EffectNames.SOULBURN.value, duration, 1, DamageType.SOUL, False, False)
     
@@ -115,25 +121,26 @@ class Soulburn(DOT):
 class StatChange(Effect):
     """
     Describes an effect that alters stats.
+    The change is layered onto the bearer's stats as a modifier
+    keyed by the effect name, so overlapping stat changes stack cleanly.
     Refreshes duration.
     This is an abstract class.
     """
+    __slots__ = ('new_stats',)
 
     def __init__(
         self, name: str,
         duration: int, 
-        orig_stats: BaseStats,
         new_stats: BaseStats
     ):
         super().__init__(name, duration, 0)
-        self.orig_stats = orig_stats
         self.new_stats = new_stats
     
     def on_remove(self, bearer: Character):
-        bearer.stats = self.orig_stats
+        bearer.remove_modifier(self.name)
     
     def on_apply(self, bearer: Character):
-        bearer.stats += self.new_stats
+        bearer.add_modifier(self.name, self.new_stats)
 
 
 class Might(StatChange):
@@ -142,12 +149,12 @@ class Might(StatChange):
     The Might effect buffs STR and STAM by 10.
     Generally caused by magic or creature skills.
     """
+    __slots__ = ()
     
-    def __init__(self, duration: int, base_stats: BaseStats):
+    def __init__(self, duration: int):
         super().__init__(
             EffectNames.MIGHT.value, 
             duration, 
-            base_stats,
             BaseStats(strength=10, stamina=10)
         )
 
@@ -157,11 +164,11 @@ class Weakness(StatChange):
     The Weakness effect debuffs STR and STAM by 10.
     Generally caused by magic or creature skills.
     """
-    def __init__(self, duration: int, base_stats: BaseStats):
+    __slots__ = ()
+    def __init__(self, duration: int):
         super().__init__(
             EffectNames.WEAKNESS.value,
             duration,
-            base_stats,
             BaseStats(strength=-10, stamina=-10)
         )
 
@@ -172,6 +179,7 @@ class Shield(Effect):
     At potency 0, shield breaks and effect is removed.
     Generally caused by magic.
     """
+    __slots__ = ()
 
     def __init__(self, duration: int, potency: int):
         super().__init__(EffectNames.SHIELD.value, duration, potency)
@@ -187,6 +195,7 @@ class Stun(Effect):
     check it at the start of bearer's turn.
     Stunned characters cannot act.
     """
+    __slots__ = ()
 
     def __init__(self, duration: int):
         super().__init__(EffectNames.STUN.value, duration, 0)
@@ -1,12 +1,65 @@
-from dataclasses import dataclass
-from typing import Tuple, Optional
+from dataclasses import dataclass, field
+from typing import Callable, Iterable, List, Tuple, Optional
+from eventbus import MAIN_BUS
 
-@dataclass
+INTACT = 0
+BROKEN = 1
+DESTROYED = 2
+
+@dataclass(slots=True)
 class DurableItem:
-    """Represents an item that has durability."""
+    """
+    Represents an item that has durability.
+
+    Changes to `durability` that cross a threshold emit on `MAIN_BUS`:
+    `itembroken`, `itemdestroyed` and `itemrepaired`, each with the item.
+    An item broken and destroyed by the same hit emits both.
+    Nothing is emitted while the item stays in the same state,
+    or ever for `quiet` items, like the throwaway gear of simulated fighters.
+
+    Items are slotted; subclasses must be `@dataclass(slots=True)` as well.
+    `build_id` is the game data id the item was made from, if any.
+    """
     durability: int
     max_dur: int
     name: str
+    build_id: Optional[str] = field(default=None, compare=False, kw_only=True)
+    quiet: bool = field(default=False, compare=False, kw_only=True)
+
+    def __setattr__(self, attr: str, value):
+        if attr == "durability" and hasattr(self, "max_dur"):
+            self.set_durability(value)
+        else:
+            object.__setattr__(self, attr, value)
+
+    def durability_state(self, durability: int) -> int:
+        if durability <= -self.max_dur:
+            return DESTROYED
+        elif durability <= 0:
+            return BROKEN
+        return INTACT
+
+    def set_durability(self, value: int, emit: bool=True) -> bool:
+        """
+        Sets durability to `value`.
+        Returns `True` if the item was broken and now isn't.
+        Pass `emit=False` to skip threshold events.
+        """
+        old_state = self.durability_state(self.durability)
+        object.__setattr__(self, "durability", value)
+        new_state = self.durability_state(value)
+        if old_state == new_state:
+            return False
+        
+        if emit and not self.quiet:
+            if new_state == INTACT:
+                MAIN_BUS.emit("itemrepaired", self)
+            else:
+                if old_state == INTACT:
+                    MAIN_BUS.emit("itembroken", self)
+                if new_state == DESTROYED:
+                    MAIN_BUS.emit("itemdestroyed", self)
+        return new_state == INTACT
 
     def restore(self):
         self.durability = self.max_dur
@@ -23,20 +76,58 @@ class DurableItem:
         return f"{self.name} {self.durability}/{self.max_dur}"
     
 
-@dataclass
+@dataclass(slots=True)
 class ArmorStats(DurableItem):
     """Represents armor stats."""
     defense: int
 
-@dataclass
+@dataclass(slots=True)
 class WeaponStats(DurableItem):
     """Represents weapon stats."""
     damage: str
     crit: Optional[str] = None
     atp: int=0
+    crit_action: Optional[Callable] = field(default=None, repr=False, compare=False)
 
-@dataclass
+@dataclass(slots=True)
 class ImplementStats(DurableItem):
     """Represents a magic implement."""
     pwr: int
-    damage: str
\ No newline at end of file
+    damage: str
+
+def repair_items(items: Iterable[Optional[DurableItem]], amount: Optional[int]=None) -> List[DurableItem]:
+    """
+    Repairs every item in `items` by `amount`, up to its max durability.
+    Fully restores items if `amount` is `None`. `None` entries are skipped.
+    Emits one `itemsrepaired` event with the list of items that are
+    no longer broken, instead of an `itemrepaired` per item.
+    `quiet` items are repaired and returned but left out of the event.
+    """
+    repaired = []
+    for item in items:
+        if item is None or item.durability >= item.max_dur:
+            continue
+        if amount is None:
+            target = item.max_dur
+        else:
+            target = min(item.durability + amount, item.max_dur)
+        if item.set_durability(target, emit=False):
+            repaired.append(item)
+    
+    announced = [item for item in repaired if not item.quiet]
+    if announced:
+        MAIN_BUS.emit("itemsrepaired", announced)
+    return repaired
+
+def silence_items(items: Iterable[Optional[DurableItem]]):
+    """Makes every item in `items` `quiet`. `None` entries are skipped."""
+    for item in items:
+        if item is not None:
+            item.quiet = True
+
+def repair_roster(characters: Iterable, amount: Optional[int]=None) -> List[DurableItem]:
+    """Repairs all equipment carried by `characters`. See `repair_items`."""
+    return repair_items(
+        (item for character in characters for item in character.equipment),
+        amount
+    )
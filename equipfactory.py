@@ -1,8 +1,26 @@
+from character import clone
+from crits import compile_crit
 from dataloader import GAME_DATA
 from equip import WeaponStats, ArmorStats, ImplementStats
+from typing import Dict, Iterable
 
-def make_weapon(build_id: str) -> WeaponStats:
-    weapon_data = GAME_DATA["weapons"][build_id]
+#Prebuilt weapons from `GAME_DATA`, by build id. `make_weapon` hands out copies.
+WEAPON_PROTOTYPES: Dict[str, WeaponStats] = dict()
+
+def make_weapon(build_id: str, data: dict=GAME_DATA) -> WeaponStats:
+    if data is GAME_DATA:
+        if not build_id in WEAPON_PROTOTYPES:
+            WEAPON_PROTOTYPES[build_id] = build_weapon(build_id, data)
+        return clone(WEAPON_PROTOTYPES[build_id])
+    return build_weapon(build_id, data)
+
+def invalidate_prototypes(build_ids: Iterable[str]):
+    """Drops cached weapon prototypes for `build_ids`."""
+    for build_id in build_ids:
+        WEAPON_PROTOTYPES.pop(build_id, None)
+
+def build_weapon(build_id: str, data: dict) -> WeaponStats:
+    weapon_data = data["weapons"][build_id]
     atp = weapon_data.get("atp", 0)
     
     return WeaponStats(
@@ -11,24 +29,28 @@ def make_weapon(build_id: str) -> WeaponStats:
         crit=weapon_data["crit"],
         damage=weapon_data["damage"],
         name=weapon_data["name"],
-        atp=atp
+        atp=atp,
+        crit_action=compile_crit(weapon_data["crit"]),
+        build_id=build_id
     )
 
-def make_armor(build_id: str) -> ArmorStats:
-    armor_data = GAME_DATA["armor"][build_id]
+def make_armor(build_id: str, data: dict=GAME_DATA) -> ArmorStats:
+    armor_data = data["armor"][build_id]
     return ArmorStats(
         durability=armor_data["durability"],
         max_dur=armor_data["durability"],
         defense=armor_data["defense"],
-        name=armor_data["name"]
+        name=armor_data["name"],
+        build_id=build_id
     )
 
-def make_implement(build_id: str) -> ImplementStats:
-    imp_data = GAME_DATA["implements"][build_id]
+def make_implement(build_id: str, data: dict=GAME_DATA) -> ImplementStats:
+    imp_data = data["implements"][build_id]
     return ImplementStats(
         durability=imp_data["durability"],
         max_dur=imp_data["durability"],
         damage=imp_data["damage"],
         name=imp_data["name"],
-        pwr=imp_data["pwr"]
+        pwr=imp_data["pwr"],
+        build_id=build_id
     )
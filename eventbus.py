@@ -1,3 +1,5 @@
+import inspect
+
 class EventBus:
     """Custom event bus."""
 
@@ -15,8 +17,12 @@ class EventBus:
             self._subscribers[topic] = set()
         self._subscribers[topic].add(obj)
     
+    def is_subscribed(self, topic: str, obj) -> bool:
+        return obj in self._subscribers.get(topic, ())
+
     def unsubscribe(self, topic: str, obj):
-        if not topic in self._subscribers:
+        """Unsubscribes `obj` from `topic`. Does nothing if it isn't subscribed."""
+        if not self.is_subscribed(topic, obj):
             return
         self._subscribers[topic].remove(obj)
         if len(self._subscribers[topic]) == 0:
@@ -25,10 +31,29 @@ class EventBus:
     def emit(self, topic: str, *args, **kwargs):
         if not topic in self._subscribers:
             return
-        for obj in self._subscribers[topic]:
+        for obj in list(self._subscribers[topic]):
             name = f"on_{topic}"
             if hasattr(obj, name):
                 mth = getattr(obj, name)
                 mth(*args, **kwargs)
 
+class AsyncEventBus(EventBus):
+    """
+    Event bus for asyncio code.
+
+    Subscribers follow the same `on_{topic}` convention as `EventBus`.
+    Coroutine handlers are awaited one at a time; plain handlers
+    are called directly.
+    """
+
+    async def emit(self, topic: str, *args, **kwargs):
+        if not topic in self._subscribers:
+            return
+        for obj in list(self._subscribers[topic]):
+            name = f"on_{topic}"
+            if hasattr(obj, name):
+                result = getattr(obj, name)(*args, **kwargs)
+                if inspect.isawaitable(result):
+                    await result
+
 MAIN_BUS = EventBus()
\ No newline at end of file
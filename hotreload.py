@@ -0,0 +1,130 @@
+"""
+Reloads game data while the program runs.
+
+`reload_data` validates the new data, diffs it against `GAME_DATA`, and
+updates `GAME_DATA` in place, so every module holding a reference sees the
+change. Only caches built from changed entries are dropped; the small
+chargen preview table is rebuilt whole. Then `datareload` is emitted on
+`MAIN_BUS` with the diff.
+"""
+import os
+import threading
+
+from charfactory import invalidate_templates
+from crits import CRIT_CACHE
+from dataloader import DATA_DIR, GAME_DATA
+from equipfactory import invalidate_prototypes
+from eventbus import MAIN_BUS
+from preview import invalidate_previews
+from typing import Callable, Dict, Optional, Set
+from validator import DataValidationError, load_verified
+
+DataDiff = Dict[str, Set[str]]
+
+def diff_data(old: dict, new: dict) -> DataDiff:
+    """Lists the ids added, removed or changed in each section."""
+    diff = dict()
+    for section in set(old) | set(new):
+        old_entries = old.get(section, {})
+        new_entries = new.get(section, {})
+        changed = {
+            build_id for build_id in set(old_entries) | set(new_entries)
+            if old_entries.get(build_id) != new_entries.get(build_id)
+        }
+        if changed:
+            diff[section] = changed
+    return diff
+
+def reload_data(filename: str="chardata.json") -> DataDiff:
+    """
+    Reloads `filename` into `GAME_DATA` and invalidates what it affects.
+    Raises `validator.DataValidationError` and leaves everything alone if the new data is bad.
+    Returns the diff; nothing is emitted if it's empty.
+    """
+    compiled = load_verified(filename)
+    diff = diff_data(GAME_DATA, compiled.data)
+    if not diff:
+        return diff
+
+    old_crits = {entry.get("crit") for entry in GAME_DATA.get("weapons", {}).values()}
+    for section in diff:
+        if section in compiled.data:
+            GAME_DATA[section] = compiled.data[section]
+        else:
+            del GAME_DATA[section]
+
+    invalidate_templates(diff.get("races", ()), diff.get("classes", ()))
+    invalidate_prototypes(diff.get("weapons", ()))
+    invalidate_previews(diff)
+    new_crits = {entry["crit"] for entry in GAME_DATA["weapons"].values()}
+    for crit_str in old_crits - new_crits:
+        CRIT_CACHE.pop(crit_str, None)
+
+    MAIN_BUS.emit("datareload", diff)
+    return diff
+
+class DataWatcher:
+    """
+    Polls a data file's modification time and reloads it when it changes.
+    Call `check` from an existing loop (the GUI uses Tk's `after`),
+    or `start` a background thread.
+    """
+
+    def __init__(self, filename: str="chardata.json", on_error=None):
+        self.filename = filename
+        self.path = os.path.join(DATA_DIR, filename)
+        self.on_error = on_error
+        self.mtime = self.current_mtime()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def current_mtime(self) -> Optional[float]:
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except OSError:
+            return None
+
+    def changed(self) -> bool:
+        """Whether the file changed since the last call. Only stats the file."""
+        mtime = self.current_mtime()
+        if mtime is None or mtime == self.mtime:
+            return False
+        self.mtime = mtime
+        return True
+
+    def reload(self) -> Optional[DataDiff]:
+        """Reloads the file now. Returns the diff, or `None` if the file was bad."""
+        try:
+            return reload_data(self.filename)
+        except (DataValidationError, ValueError, OSError) as e:
+            #Half-saved or bad files are reported and skipped; the next save retries.
+            if self.on_error:
+                self.on_error(e)
+            return None
+
+    def check(self) -> Optional[DataDiff]:
+        """Reloads if the file changed since the last check. Returns the diff, if any."""
+        if not self.changed():
+            return None
+        return self.reload()
+
+    def start(self, interval: float=1.0, dispatch: Optional[Callable[[Callable[[], object]], object]]=None):
+        """
+        Checks every `interval` seconds on a daemon thread.
+        Without `dispatch`, reloads run on that thread and so do `datareload` handlers.
+        With it, the thread only stats the file and passes `reload` to `dispatch`,
+        which should queue it for the thread that owns the handlers.
+        """
+        def loop():
+            while not self._stop.wait(interval):
+                if not self.changed():
+                    continue
+                if dispatch is None:
+                    self.reload()
+                else:
+                    dispatch(self.reload)
+        self._thread = threading.Thread(target=loop, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
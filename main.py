@@ -1,10 +1,21 @@
+import random
 import tkinter as tk
 
+from battlefeed import BattleFeed
+from battleviewer import BattleViewer
 from character import Character, BaseStats
+from dataloader import GAME_DATA
 from charframe import CharFrame
 from chargen import CharGenFrame
 from charfactory import build_char
 from equipfactory import make_armor, make_implement, make_weapon
+from hotreload import DataWatcher
+from rosterbrowser import RosterBrowser
+from rosterindex import RosterIndex
+
+RELOAD_POLL_MS = 1000
+DUEL_TURN_DELAY = 0.25
+BATCH_FIGHTS = 1000
 
 def main():
     root = tk.Tk()
@@ -17,7 +28,24 @@ def main():
             chargen = CharGenFrame(root)
     
     def open_character():
-        pass
+        roster = [
+            build_char(race, class_id)
+            for race in sorted(GAME_DATA["races"])
+            for class_id in sorted(GAME_DATA["classes"])
+        ]
+        RosterBrowser(root, RosterIndex.from_characters(roster))
+
+    def random_spec() -> dict:
+        return {
+            "race": random.choice(sorted(GAME_DATA["races"])),
+            "class": random.choice(sorted(GAME_DATA["classes"]))
+        }
+
+    def watch_duel():
+        BattleViewer(root, BattleFeed(random_spec(), random_spec(), turn_delay=DUEL_TURN_DELAY))
+
+    def watch_batch():
+        BattleViewer(root, BattleFeed(random_spec(), random_spec(), BATCH_FIGHTS))
 
     def exit_prog():
         raise SystemExit(0)
@@ -29,8 +57,20 @@ def main():
     filemenu.add_command(label="Exit", command=exit_prog)
     menubar.add_cascade(label="File", menu=filemenu)
 
+    battlemenu = tk.Menu(menubar, tearoff=0)
+    battlemenu.add_command(label="Watch Duel", command=watch_duel)
+    battlemenu.add_command(label="Watch Batch", command=watch_batch)
+    menubar.add_cascade(label="Battle", menu=battlemenu)
+
+    #Polled from Tk's loop, not `DataWatcher.start`, so `datareload` handlers run on the Tk thread.
+    watcher = DataWatcher(on_error=lambda e: print(f"Data reload failed: {e}"))
+    def poll_data():
+        watcher.check()
+        root.after(RELOAD_POLL_MS, poll_data)
+
     root.config(menu=menubar)
     root.wm_title("System 12 Arena")
+    root.after(RELOAD_POLL_MS, poll_data)
     root.mainloop()
 
 if __name__ == "__main__":
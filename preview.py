@@ -0,0 +1,95 @@
+"""
+Precomputed character previews for chargen.
+
+`preview_table` builds a `Preview` for every race, class (or none) and
+loadout in the game data at once. After that, chargen lookups are dict
+hits, with no stat math or `Character` properties. The `GAME_DATA` table
+is built on first use and dropped by `invalidate_previews` whenever a
+reload changes the data it was built from.
+"""
+import itertools
+
+from character import Character, BaseStats, clone
+from charfactory import stat_template
+from collections import namedtuple
+from dataloader import GAME_DATA
+from equipfactory import make_armor, make_implement, make_weapon
+from typing import Dict, Iterator, List, Optional, Tuple
+
+DERIVED_FIELDS = ("atp", "dfp", "tou", "wil", "pwr", "defense")
+VITAL_FIELDS = ("max_body", "max_mind", "max_soul")
+PREVIEW_SECTIONS = ("races", "classes", "weapons", "armor", "implements")
+
+#(weapon, armor, implement) build ids; `None` for an empty slot.
+Loadout = Tuple[Optional[str], Optional[str], Optional[str]]
+NO_LOADOUT: Loadout = (None, None, None)
+PreviewKey = Tuple[str, Optional[str], Loadout]
+
+Preview = namedtuple('Preview', ('name', 'stats') + DERIVED_FIELDS + VITAL_FIELDS)
+
+PREVIEWS: Dict[PreviewKey, Preview] = dict()
+
+def loadouts(data: dict=GAME_DATA) -> Iterator[Loadout]:
+    """Every combination of weapon, armor and implement, including empty slots."""
+    return itertools.product(
+        (None, *sorted(data["weapons"])),
+        (None, *sorted(data["armor"])),
+        (None, *sorted(data["implements"]))
+    )
+
+def base_preview_stats(race_id: str, class_id: Optional[str], data: dict) -> Tuple[BaseStats, str]:
+    if class_id is None:
+        race_data = data["races"][race_id]
+        return (BaseStats.from_dict(**race_data["stats"]), race_data["name"])
+    return stat_template(race_id, class_id, data)
+
+def make_preview(race_id: str, class_id: Optional[str], loadout: Loadout, data: dict=GAME_DATA) -> Preview:
+    stats, name = base_preview_stats(race_id, class_id, data)
+    character = Character(name, clone(stats))
+    weapon, armor, implement = loadout
+    if weapon:
+        character.weapon = make_weapon(weapon, data)
+    if armor:
+        character.armor = make_armor(armor, data)
+    if implement:
+        character.implement = make_implement(implement, data)
+
+    return Preview(
+        name,
+        character.stats,
+        *(getattr(character, f) for f in DERIVED_FIELDS),
+        *(getattr(character, f) for f in VITAL_FIELDS)
+    )
+
+def build_previews(data: dict=GAME_DATA, with_loadouts: bool=True) -> Dict[PreviewKey, Preview]:
+    """
+    Previews every race with every class and with no class,
+    wearing every loadout (or only `NO_LOADOUT`).
+    """
+    gear = list(loadouts(data)) if with_loadouts else [NO_LOADOUT]
+    return {
+        (race_id, class_id, loadout): make_preview(race_id, class_id, loadout, data)
+        for race_id in data["races"]
+        for class_id in (None, *data["classes"])
+        for loadout in gear
+    }
+
+def preview_table() -> Dict[PreviewKey, Preview]:
+    """The preview table for `GAME_DATA`, built on first use."""
+    if not PREVIEWS:
+        PREVIEWS.update(build_previews())
+    return PREVIEWS
+
+def preview(race_id: str, class_id: Optional[str]=None, loadout: Loadout=NO_LOADOUT) -> Preview:
+    """Looks up a preview in the `GAME_DATA` table. Don't modify its stats."""
+    return preview_table()[(race_id, class_id, loadout)]
+
+def compare(race_ids: List[str], class_ids: List[Optional[str]], loadout: Loadout=NO_LOADOUT) -> List[Preview]:
+    """Previews for every race and class pair, race-major, for side-by-side views."""
+    table = preview_table()
+    return [table[(race_id, class_id, loadout)] for race_id in race_ids for class_id in class_ids]
+
+def invalidate_previews(sections=PREVIEW_SECTIONS):
+    """Drops the `GAME_DATA` table if any of `sections` changed."""
+    if any(section in PREVIEW_SECTIONS for section in sections):
+        PREVIEWS.clear()
@@ -0,0 +1,195 @@
+"""
+Incremental Elo ratings over a stream of fight results.
+
+Every result updates the ratings of the two fighters and of their
+archetypes (race, class, loadout and full build), each rated against the
+same kind of archetype. That's O(1) work per result, and the history is
+never replayed.
+
+Ratings live in SQLite, keyed and indexed by `(kind, key)`, with a
+`(kind, rating)` index for leaderboards. Updates collect in memory and are
+written every `flush_every` results. Each flush also appends the raw results
+to a log table. `compact` drops log rows that are already folded into the
+ratings, so storage grows with the number of rated things, not fights.
+Pass `vacuum=True` to also give the freed space back to the file system.
+"""
+import random
+import sqlite3
+
+from collections import namedtuple
+from simulation import build_fighter, duel, spec_key
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+DEFAULT_RATING = 1500.0
+DEFAULT_K = 24.0
+#Rating kinds. Archetypes are keyed by their part of the spec. Characters are
+#keyed by the `name` their spec gives them; unnamed fighters get no character rating.
+CHARACTER = "character"
+ARCHETYPE_KINDS = ("race", "class", "loadout", "build")
+
+#`outcome` is 1 if `first` won, 0 if `second` won and 0.5 for a draw.
+#The names are each spec's explicit `name`, if it has one.
+FightResult = namedtuple(
+    'FightResult',
+    ('first', 'second', 'outcome', 'first_name', 'second_name'),
+    defaults=(None, None)
+)
+Rating = namedtuple('Rating', ('kind', 'key', 'rating', 'games'))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS ratings (
+    kind TEXT NOT NULL,
+    key TEXT NOT NULL,
+    rating REAL NOT NULL,
+    games INTEGER NOT NULL,
+    PRIMARY KEY (kind, key)
+);
+CREATE INDEX IF NOT EXISTS ratings_board ON ratings (kind, rating);
+CREATE TABLE IF NOT EXISTS log (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    first TEXT NOT NULL,
+    second TEXT NOT NULL,
+    outcome REAL NOT NULL
+);
+"""
+
+def expected_score(rating: float, other: float) -> float:
+    """Elo's expected score for a player rated `rating` against one rated `other`."""
+    return 1 / (1 + 10 ** ((other - rating) / 400))
+
+def archetype_keys(spec: dict) -> Dict[str, str]:
+    """The archetypes a fighter spec belongs to, by kind."""
+    return {
+        "race": spec["race"],
+        "class": spec["class"],
+        "loadout": "/".join(spec.get(slot) or "-" for slot in ("weapon", "armor", "implement")),
+        "build": spec_key(spec)
+    }
+
+class RatingLadder:
+    """Elo ratings for fighters and archetypes, updated one result at a time."""
+
+    def __init__(self, path: str=":memory:", k: float=DEFAULT_K, flush_every: int=10000):
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript(SCHEMA)
+        self.k = k
+        self.flush_every = flush_every
+        #Ratings touched since the last flush, by (kind, key): [rating, games].
+        self.dirty: Dict[Tuple[str, str], List] = dict()
+        self.pending: List[Tuple[str, str, float]] = []
+
+    def entry(self, kind: str, key: str) -> List:
+        found = self.dirty.get((kind, key))
+        if found is None:
+            row = self.conn.execute(
+                "SELECT rating, games FROM ratings WHERE kind = ? AND key = ?", (kind, key)
+            ).fetchone()
+            found = list(row) if row else [DEFAULT_RATING, 0]
+            self.dirty[(kind, key)] = found
+        return found
+
+    def update(self, kind: str, first: str, second: str, outcome: float):
+        """Rates one game between `first` and `second` of `kind`. Mirror matches are skipped."""
+        if first == second:
+            return
+        a = self.entry(kind, first)
+        b = self.entry(kind, second)
+        delta = self.k * (outcome - expected_score(a[0], b[0]))
+        a[0] += delta
+        b[0] -= delta
+        a[1] += 1
+        b[1] += 1
+
+    def record(self, result: FightResult):
+        first_keys = archetype_keys(result.first)
+        second_keys = archetype_keys(result.second)
+        for kind in ARCHETYPE_KINDS:
+            self.update(kind, first_keys[kind], second_keys[kind], result.outcome)
+        if result.first_name and result.second_name:
+            self.update(CHARACTER, result.first_name, result.second_name, result.outcome)
+
+        self.pending.append((first_keys["build"], second_keys["build"], result.outcome))
+        if len(self.pending) >= self.flush_every:
+            self.flush()
+
+    def consume(self, results: Iterable[FightResult]) -> int:
+        """Records every result from `results`, then flushes. Returns how many there were."""
+        count = 0
+        for result in results:
+            self.record(result)
+            count += 1
+        self.flush()
+        return count
+
+    def flush(self):
+        """Writes changed ratings and logged results in one transaction."""
+        with self.conn:
+            self.conn.executemany(
+                """
+                INSERT INTO ratings VALUES (?, ?, ?, ?)
+                ON CONFLICT (kind, key) DO UPDATE SET rating = excluded.rating, games = excluded.games
+                """,
+                ((kind, key, rating, games) for (kind, key), (rating, games) in self.dirty.items())
+            )
+            self.conn.executemany("INSERT INTO log (first, second, outcome) VALUES (?, ?, ?)", self.pending)
+        self.dirty.clear()
+        self.pending.clear()
+
+    def compact(self, keep: int=0, vacuum: bool=False):
+        """
+        Flushes, then drops all but the newest `keep` logged results.
+        `vacuum=True` also rewrites the database to shrink the file, which costs
+        time proportional to its whole size.
+        """
+        self.flush()
+        with self.conn:
+            self.conn.execute(
+                "DELETE FROM log WHERE seq <= (SELECT COALESCE(MAX(seq), 0) FROM log) - ?", (keep,)
+            )
+        if vacuum:
+            self.conn.execute("VACUUM")
+
+    def logged(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM log").fetchone()[0] + len(self.pending)
+
+    def rating(self, kind: str, key: str) -> Rating:
+        found = self.dirty.get((kind, key))
+        if found is None:
+            found = self.conn.execute(
+                "SELECT rating, games FROM ratings WHERE kind = ? AND key = ?", (kind, key)
+            ).fetchone() or (DEFAULT_RATING, 0)
+        return Rating(kind, key, *found)
+
+    def leaderboard(self, kind: str, limit: Optional[int]=None) -> List[Rating]:
+        """Highest rated entries of `kind`."""
+        self.flush()
+        sql = "SELECT kind, key, rating, games FROM ratings WHERE kind = ? ORDER BY rating DESC"
+        params: list = [kind]
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return [Rating(*row) for row in self.conn.execute(sql, params)]
+
+    def close(self):
+        self.flush()
+        self.conn.close()
+
+def fight_stream(pairs: List[Tuple[dict, dict]], fights: int, seed: Optional[int]=None) -> Iterator[FightResult]:
+    """
+    Duels every pair `fights` times, yielding each result as it happens.
+    Rolls come from a private `random.Random(seed)`, so the global RNG is left alone.
+    """
+    rng = random.Random(seed)
+    for _ in range(fights):
+        for first_spec, second_spec in pairs:
+            first, second = build_fighter(first_spec), build_fighter(second_spec)
+            result = duel(first, second, rng=rng)
+            if result.winner is first:
+                outcome = 1.0
+            elif result.winner is second:
+                outcome = 0.0
+            else:
+                outcome = 0.5
+            yield FightResult(
+                first_spec, second_spec, outcome, first_spec.get("name"), second_spec.get("name")
+            )
@@ -0,0 +1,213 @@
+"""
+Persistent cache of seeded simulation results.
+
+Results are keyed by a hash of the game data, both fighters as built
+(stats and every piece of gear), the source of the modules that decide
+fights or are stored in it (`RULES_VERSION`) and the seed. Under
+that key, the cache keeps one `Aggregator` per sample count, plus the RNG
+state at the end of the run. A request for more fights resumes the largest
+smaller sample from its saved RNG state instead of starting over. The
+answer is the same as running `simulation.aggregate_batch` from scratch,
+down to the RNG state it leaves behind.
+
+Entries live in SQLite and are evicted least recently used first once
+they pass `max_bytes`.
+"""
+import aggregate
+import character
+import combat
+import crits
+import effects
+import equip
+import hashlib
+import json
+import pickle
+import random
+import simulation
+import sqlite3
+
+from aggregate import Aggregator
+from character import Character, get_state, slot_names
+from dataloader import GAME_DATA
+from simulation import aggregate_batch, aggregate_fights, build_fighter, spec_key
+from typing import Optional
+from validator import source_digest
+
+#Modules whose code decides fights, plus `aggregate`, whose objects are
+#pickled into the cache. Any edit to them changes every key.
+RULES_MODULES = (aggregate, character, combat, crits, effects, equip, simulation)
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    key TEXT NOT NULL,
+    fights INTEGER NOT NULL,
+    payload BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    last_used INTEGER NOT NULL,
+    PRIMARY KEY (key, fights)
+);
+CREATE INDEX IF NOT EXISTS results_lru ON results (last_used);
+"""
+
+RULES_VERSION = source_digest(RULES_MODULES)
+
+def data_digest(data: dict=GAME_DATA) -> str:
+    return hashlib.sha256(json.dumps(data, sort_keys=True).encode()).hexdigest()
+
+def fighter_fingerprint(character: Character) -> list:
+    """Everything about a freshly built fighter that affects a duel, as plain data."""
+    gear = [
+        None if item is None else [
+            type(item).__name__,
+            *(getattr(item, name) for name in slot_names(type(item)) if name != "crit_action")
+        ]
+        for item in character.equipment
+    ]
+    return [character.name, list(get_state(character.stats)), gear]
+
+def result_key(first_spec: dict, second_spec: dict, seed: int) -> str:
+    payload = json.dumps({
+        "rules": RULES_VERSION,
+        "data": data_digest(),
+        "first": [spec_key(first_spec), fighter_fingerprint(build_fighter(first_spec))],
+        "second": [spec_key(second_spec), fighter_fingerprint(build_fighter(second_spec))],
+        "seed": seed
+    })
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+class ResultCache:
+    """
+    On-disk, size-bounded cache in front of `simulation.aggregate_batch`.
+    Any number of processes may open the same file; each needs its own `ResultCache`.
+    """
+
+    def __init__(self, path: str, max_bytes: int=DEFAULT_MAX_BYTES, timeout: float=30.0):
+        self.conn = sqlite3.connect(path, timeout=timeout)
+        self.conn.executescript(SCHEMA)
+        self.max_bytes = max_bytes
+        self.clock = self.conn.execute("SELECT COALESCE(MAX(last_used), 0) FROM results").fetchone()[0]
+        self.hits = 0
+        self.extended = 0
+        self.misses = 0
+
+    def tick(self) -> int:
+        self.clock += 1
+        return self.clock
+
+    def lookup(
+        self,
+        first_spec: dict,
+        second_spec: dict,
+        num_fights: int,
+        seed: int,
+        rng: Optional[random.Random]=None
+    ) -> Optional[Aggregator]:
+        """
+        The cached result of exactly `num_fights` seeded fights, or `None`.
+        On a hit `rng` (the `random` module by default) is left where the original run left it.
+        """
+        key = result_key(first_spec, second_spec, seed)
+        row = self.conn.execute(
+            "SELECT payload FROM results WHERE key = ? AND fights = ?", (key, num_fights)
+        ).fetchone()
+        if row is None:
+            return None
+        self.hits += 1
+        with self.conn:
+            self.conn.execute(
+                "UPDATE results SET last_used = ? WHERE key = ? AND fights = ?", (self.tick(), key, num_fights)
+            )
+        rng_state, agg = pickle.loads(row[0])
+        (random if rng is None else rng).setstate(rng_state)
+        return agg
+
+    def save(
+        self,
+        first_spec: dict,
+        second_spec: dict,
+        num_fights: int,
+        seed: int,
+        agg: Aggregator,
+        rng: Optional[random.Random]=None
+    ):
+        """
+        Stores `agg`, just computed from `seed`, with the state the run left `rng`
+        (the `random` module by default) in.
+        """
+        key = result_key(first_spec, second_spec, seed)
+        rng_state = (random if rng is None else rng).getstate()
+        self.store(key, num_fights, pickle.dumps((rng_state, agg)))
+
+    def aggregate(self, first_spec: dict, second_spec: dict, num_fights: int, seed: Optional[int]) -> Aggregator:
+        """
+        Same result as `aggregate_batch(first_spec, second_spec, num_fights, seed)`,
+        simulating only the fights not already cached. Unseeded runs aren't cached.
+        """
+        if seed is None:
+            return aggregate_batch(first_spec, second_spec, num_fights, seed)
+
+        hit = self.lookup(first_spec, second_spec, num_fights, seed)
+        if hit is not None:
+            return hit
+
+        key = result_key(first_spec, second_spec, seed)
+        row = self.conn.execute(
+            "SELECT fights, payload FROM results WHERE key = ? AND fights < ? ORDER BY fights DESC LIMIT 1",
+            (key, num_fights)
+        ).fetchone()
+        if row:
+            self.extended += 1
+            rng_state, agg = pickle.loads(row[1])
+            random.setstate(rng_state)
+            aggregate_fights(
+                lambda: (build_fighter(first_spec), build_fighter(second_spec)),
+                num_fights - row[0],
+                (spec_key(first_spec), spec_key(second_spec)),
+                agg
+            )
+        else:
+            self.misses += 1
+            agg = aggregate_batch(first_spec, second_spec, num_fights, seed)
+
+        self.store(key, num_fights, pickle.dumps((random.getstate(), agg)))
+        return agg
+
+    def store(self, key: str, num_fights: int, payload: bytes):
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?)",
+                (key, num_fights, payload, len(payload), self.tick())
+            )
+            self.evict()
+
+    def evict(self):
+        """Drops least recently used entries until the cache fits in `max_bytes`."""
+        total = self.size()
+        if total <= self.max_bytes:
+            return
+        cursor = self.conn.execute("SELECT key, fights, size FROM results ORDER BY last_used")
+        doomed = []
+        for key, fights, size in cursor:
+            if total <= self.max_bytes:
+                break
+            doomed.append((key, fights))
+            total -= size
+        self.conn.executemany("DELETE FROM results WHERE key = ? AND fights = ?", doomed)
+
+    def size(self) -> int:
+        return self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+
+    def __len__(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    def close(self):
+        self.conn.close()
+
+def cached_batch(path: str, first_spec: dict, second_spec: dict, num_fights: int, seed: Optional[int]) -> Aggregator:
+    """`ResultCache.aggregate` on the cache file at `path`, for worker processes."""
+    cache = ResultCache(path)
+    try:
+        return cache.aggregate(first_spec, second_spec, num_fights, seed)
+    finally:
+        cache.close()
@@ -0,0 +1,138 @@
+import tkinter as tk
+
+from charframe import CharFrame
+from rosterindex import Filter, RosterIndex, RosterView
+from typing import List, Optional
+
+VISIBLE_ROWS = 25
+NAME_WIDTH = 20
+COLUMN_WIDTH = 6
+COLUMN_LABELS = {
+    "strength": "STR",
+    "stamina": "STAM",
+    "speed": "SPD",
+    "skill": "SKL",
+    "sagacity": "SAG",
+    "smarts": "SMT",
+    "melee": "MEL",
+    "magic": "MAG",
+    "body": "BODY",
+    "mind": "MIND",
+    "soul": "SOUL",
+    "defense": "DEF"
+}
+
+def column_label(column: str) -> str:
+    return COLUMN_LABELS.get(column, column.upper())
+
+class RosterBrowser(tk.Toplevel):
+    """
+    Roster Browser Window.
+    Only `VISIBLE_ROWS` rows exist as widgets; scrolling refills them
+    from the current `RosterView`, so the roster size doesn't matter.
+    Click a column header to sort by it (again to reverse), and
+    a row to show that character.
+    """
+
+    def __init__(self, master, index: RosterIndex):
+        super().__init__(master)
+        self.wm_title("Roster")
+        self.index = index
+        self.sort: Optional[str] = None
+        self.descending = False
+        self.filters: List[Filter] = []
+        self.top = 0
+        self.char_frame: Optional[CharFrame] = None
+
+        filter_bar = tk.Frame(self)
+        filter_bar.grid(row=0, column=0, columnspan=2, sticky='w')
+        self.filter_column = tk.StringVar(value=index.column_names[0])
+        tk.OptionMenu(filter_bar, self.filter_column, *index.column_names).pack(side='left')
+        self.filter_lo = tk.Entry(filter_bar, width=COLUMN_WIDTH)
+        self.filter_lo.pack(side='left')
+        self.filter_hi = tk.Entry(filter_bar, width=COLUMN_WIDTH)
+        self.filter_hi.pack(side='left')
+        tk.Button(filter_bar, text="Filter", command=self.add_filter).pack(side='left')
+        tk.Button(filter_bar, text="Clear", command=self.clear_filters).pack(side='left')
+        self.count_var = tk.StringVar()
+        tk.Label(filter_bar, textvariable=self.count_var).pack(side='left')
+
+        table = tk.Frame(self)
+        table.grid(row=1, column=0, sticky='nsew')
+        header = tk.Frame(table)
+        header.pack(fill='x')
+        for column, width in (("name", NAME_WIDTH), *((c, COLUMN_WIDTH) for c in index.column_names)):
+            tk.Button(
+                header, text=column_label(column), width=width, font="TkFixedFont",
+                command=lambda c=column: self.sort_by(c)
+            ).pack(side='left')
+
+        self.row_vars = [tk.StringVar() for _ in range(VISIBLE_ROWS)]
+        for pos, var in enumerate(self.row_vars):
+            row = tk.Label(table, textvariable=var, anchor='w', font="TkFixedFont")
+            row.pack(fill='x')
+            row.bind("<Button-1>", lambda e, p=pos: self.select(self.top + p))
+            row.bind("<MouseWheel>", self.on_wheel)
+            row.bind("<Button-4>", lambda e: self.scroll_to(self.top - 3))
+            row.bind("<Button-5>", lambda e: self.scroll_to(self.top + 3))
+
+        self.scrollbar = tk.Scrollbar(self, command=self.on_scroll)
+        self.scrollbar.grid(row=1, column=1, sticky='ns')
+        self.view: RosterView = index.view()
+        self.rebuild()
+
+    def rebuild(self):
+        self.view = self.index.view(self.sort, self.descending, self.filters)
+        self.count_var.set(f"{len(self.view)} of {len(self.index)}")
+        self.scroll_to(0)
+
+    def sort_by(self, column: str):
+        self.descending = column == self.sort and not self.descending
+        self.sort = column
+        self.rebuild()
+
+    def add_filter(self):
+        try:
+            lo = int(self.filter_lo.get()) if self.filter_lo.get().strip() else None
+            hi = int(self.filter_hi.get()) if self.filter_hi.get().strip() else None
+        except ValueError:
+            return
+        self.filters.append((self.filter_column.get(), lo, hi))
+        self.rebuild()
+
+    def clear_filters(self):
+        self.filters = []
+        self.rebuild()
+
+    def scroll_to(self, top: int):
+        total = len(self.view)
+        self.top = max(0, min(top, total - VISIBLE_ROWS))
+        rows = self.view.page(self.top, VISIBLE_ROWS)
+        for var, row in zip(self.row_vars, rows + [None] * (VISIBLE_ROWS - len(rows))):
+            var.set(self.format_row(row) if row else "")
+        if total:
+            self.scrollbar.set(self.top / total, min(1.0, (self.top + VISIBLE_ROWS) / total))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    def format_row(self, row: tuple) -> str:
+        name = row[0][:NAME_WIDTH].ljust(NAME_WIDTH)
+        return name + "".join(str(v).rjust(COLUMN_WIDTH) for v in row[1:])
+
+    def on_scroll(self, *args):
+        if args[0] == "moveto":
+            self.scroll_to(int(float(args[1]) * len(self.view)))
+        elif args[0] == "scroll":
+            step = VISIBLE_ROWS if args[2] == "pages" else 1
+            self.scroll_to(self.top + int(args[1]) * step)
+
+    def on_wheel(self, event):
+        self.scroll_to(self.top - event.delta // 40)
+
+    def select(self, pos: int):
+        if pos >= len(self.view):
+            return
+        if self.char_frame:
+            self.char_frame.destroy()
+        self.char_frame = CharFrame(self, self.view.character(pos))
+        self.char_frame.grid(row=0, column=2, rowspan=2, sticky='n')
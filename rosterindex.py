@@ -0,0 +1,129 @@
+"""
+Sorting, filtering and paging for very large rosters, without Tk.
+
+A `RosterIndex` holds one int array per column plus the names. Characters
+are only built when `RosterView.character` asks for one. The sort order of
+each column is built the first time it's used and kept, so re-sorting
+and range filters are an index lookup, not a pass over `Character` objects.
+`rosterbrowser.RosterBrowser` draws these views.
+"""
+from array import array
+from bisect import bisect_left, bisect_right
+from character import Character, STAT_FIELDS
+from sharedroster import RECORD_SIZE, SharedRoster
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+DERIVED_FIELDS = ("atp", "dfp", "tou", "wil", "pwr", "defense")
+CHARACTER_COLUMNS = STAT_FIELDS + DERIVED_FIELDS
+#Filters are (column, lo, hi); either bound can be `None`.
+Filter = Tuple[str, Optional[int], Optional[int]]
+
+class RosterView:
+    """One sorted, filtered ordering of a `RosterIndex`."""
+
+    def __init__(self, index: "RosterIndex", rows: Sequence[int]):
+        self.index = index
+        self.rows = rows
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def row_ids(self, start: int, count: int) -> Sequence[int]:
+        return self.rows[max(0, start):start + count]
+
+    def page(self, start: int, count: int) -> List[tuple]:
+        """`(name, *column values)` for `count` rows starting at position `start`."""
+        names = self.index.names
+        cols = [self.index.columns[c] for c in self.index.column_names]
+        return [(names[r], *(col[r] for col in cols)) for r in self.row_ids(start, count)]
+
+    def character(self, pos: int) -> Character:
+        """Loads the character at position `pos` of this view."""
+        return self.index.loader(self.rows[pos])
+
+class RosterIndex:
+    """
+    Column store over a roster.
+    `loader` builds the full `Character` for a row id on demand.
+    """
+
+    def __init__(self, names: List[str], columns: Dict[str, array], loader: Callable[[int], Character]):
+        self.names = names
+        self.columns = columns
+        self.column_names = tuple(columns)
+        self.loader = loader
+        self.sorted: Dict[str, array] = dict()
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    @classmethod
+    def from_characters(cls, characters: List[Character]) -> "RosterIndex":
+        """Indexes base and derived stats of already built characters."""
+        columns = {
+            name: array('i', (getattr(c, name) for c in characters))
+            for name in CHARACTER_COLUMNS
+        }
+        return cls([c.name for c in characters], columns, characters.__getitem__)
+
+    @classmethod
+    def from_shared(cls, roster: SharedRoster) -> "RosterIndex":
+        """
+        Indexes the base stats of a shared roster straight from its rows.
+        Characters are only built from a row when selected.
+        """
+        columns = {
+            name: array('i', roster.rows[offset:roster.count * RECORD_SIZE:RECORD_SIZE])
+            for offset, name in enumerate(STAT_FIELDS)
+        }
+        return cls(roster.names[:roster.count], columns, roster.load)
+
+    def sort_index(self, column: str) -> array:
+        """Row ids ordered by `column`, then row id. Built once per column."""
+        if not column in self.sorted:
+            keys = self.names if column == "name" else self.columns[column]
+            self.sorted[column] = array('i', sorted(range(len(self)), key=keys.__getitem__))
+        return self.sorted[column]
+
+    def matching(self, column: str, lo: Optional[int]=None, hi: Optional[int]=None) -> Sequence[int]:
+        """Row ids with `lo <= column <= hi`, in `column` order."""
+        idx = self.sort_index(column)
+        key = self.columns[column].__getitem__
+        start = 0 if lo is None else bisect_left(idx, lo, key=key)
+        end = len(idx) if hi is None else bisect_right(idx, hi, key=key)
+        return idx[start:end]
+
+    def view(self, sort: Optional[str]=None, descending: bool=False, filters: Iterable[Filter]=()) -> RosterView:
+        """
+        Rows passing every filter, ordered by `sort` (row order if `None`).
+        The narrowest filter is answered from its sort index; the rest are checked per row.
+        """
+        filters = list(filters)
+        if not filters:
+            rows = self.sort_index(sort) if sort else range(len(self))
+        else:
+            ranges = sorted(((self.matching(*f), f) for f in filters), key=lambda m: len(m[0]))
+            candidates, _ = ranges[0]
+            for _, (column, lo, hi) in ranges[1:]:
+                col = self.columns[column]
+                candidates = [
+                    r for r in candidates
+                    if (lo is None or col[r] >= lo) and (hi is None or col[r] <= hi)
+                ]
+            if sort is None:
+                rows = array('i', sorted(candidates))
+            elif sort == ranges[0][1][0]:
+                #Still in the narrowest filter's sort order.
+                rows = candidates
+            elif len(candidates) < len(self) // 16:
+                keys = self.names if sort == "name" else self.columns[sort]
+                rows = array('i', sorted(candidates, key=lambda r: (keys[r], r)))
+            else:
+                mask = bytearray(len(self))
+                for r in candidates:
+                    mask[r] = 1
+                rows = array('i', (r for r in self.sort_index(sort) if mask[r]))
+
+        if descending:
+            rows = rows[::-1]
+        return RosterView(self, rows)
@@ -0,0 +1,155 @@
+import atexit
+import json
+
+from character import BaseStats, Character, STAT_FIELDS, get_state
+from collections import namedtuple
+from dataloader import GAME_DATA
+from equipfactory import make_armor, make_implement, make_weapon
+from multiprocessing import shared_memory
+from simulation import BatchResult, run_fights
+from typing import Dict, List, Optional
+
+RosterHandle = namedtuple('RosterHandle', ('records', 'tables', 'count'))
+
+EQUIP_KINDS = (
+    ("weapon", "weapons", make_weapon),
+    ("armor", "armor", make_armor),
+    ("implement", "implements", make_implement)
+)
+RECORD_FIELDS = STAT_FIELDS + tuple(
+    f"{kind}{suffix}" for kind, _, _ in EQUIP_KINDS for suffix in ("", "_dur")
+)
+RECORD_SIZE = len(RECORD_FIELDS)
+NO_ITEM = -1
+
+#Per-process cache of attached rosters, keyed by the records block name.
+_ATTACHED: Dict[str, "SharedRoster"] = dict()
+
+class SharedRoster:
+    """
+    A roster of characters stored in `multiprocessing.shared_memory`.
+
+    Each character is one fixed-size row of ints: base stats, vitals, and
+    an index and durability per equipment slot. The static game tables and
+    character names sit in a second block as JSON, parsed once per process.
+    Workers get a small `RosterHandle` and attach without copying rows.
+
+    Effects and modifier layers aren't stored; rosters hold characters at rest.
+    """
+
+    def __init__(self, records: shared_memory.SharedMemory, tables: shared_memory.SharedMemory, count: int, owner: bool):
+        self.records = records
+        self.tables_block = tables
+        self.count = count
+        self.owner = owner
+        self.rows = records.buf.cast("i")
+        static = json.loads(bytes(tables.buf).rstrip(b"\0"))
+        self.data = static["data"]
+        self.names: List[str] = static["names"]
+        self.build_ids = {
+            kind: sorted(self.data[table]) for kind, table, _ in EQUIP_KINDS
+        }
+        #Row index of each build id, by kind.
+        self.item_indexes = {
+            kind: {build_id: idx for idx, build_id in enumerate(build_ids)}
+            for kind, build_ids in self.build_ids.items()
+        }
+
+    @classmethod
+    def create(cls, characters: List[Character], data: dict=GAME_DATA) -> "SharedRoster":
+        """Lays `characters` and the game tables `data` out in new shared memory blocks."""
+        payload = json.dumps({
+            "data": data,
+            "names": [c.name for c in characters]
+        }).encode()
+        tables = shared_memory.SharedMemory(create=True, size=len(payload))
+        tables.buf[:len(payload)] = payload
+        records = shared_memory.SharedMemory(create=True, size=max(1, len(characters)) * RECORD_SIZE * 4)
+        roster = cls(records, tables, len(characters), True)
+        for idx, character in enumerate(characters):
+            roster.store(idx, character)
+        return roster
+
+    @classmethod
+    def attach(cls, handle: RosterHandle) -> "SharedRoster":
+        """Attaches to the roster behind `handle`, reusing this process's earlier attachment."""
+        if not handle.records in _ATTACHED:
+            _ATTACHED[handle.records] = cls(
+                shared_memory.SharedMemory(name=handle.records),
+                shared_memory.SharedMemory(name=handle.tables),
+                handle.count,
+                False
+            )
+        return _ATTACHED[handle.records]
+
+    @property
+    def handle(self) -> RosterHandle:
+        return RosterHandle(self.records.name, self.tables_block.name, self.count)
+
+    def item_index(self, kind: str, item) -> int:
+        """Index of `item`'s build id in the `kind` table. Items not made from game data can't be stored."""
+        if item is None:
+            return NO_ITEM
+        try:
+            return self.item_indexes[kind][item.build_id]
+        except KeyError:
+            raise KeyError(f"{item.name} ({item.build_id}) is not in the {kind} table")
+
+    def store(self, idx: int, character: Character):
+        """Writes `character` into row `idx`."""
+        base = idx * RECORD_SIZE
+        row = list(get_state(character.stats))
+        for kind, _, _ in EQUIP_KINDS:
+            item = getattr(character, kind)
+            row.append(self.item_index(kind, item))
+            row.append(item.durability if item else 0)
+        for offset, value in enumerate(row):
+            self.rows[base + offset] = value
+
+    def load(self, idx: int) -> Character:
+        """Builds a fresh `Character` from row `idx`."""
+        base = idx * RECORD_SIZE
+        row = self.rows[base:base + RECORD_SIZE].tolist()
+        stats = BaseStats(*row[:len(STAT_FIELDS)])
+        vitals = (stats.body, stats.mind, stats.soul)
+        character = Character(self.names[idx], stats)
+        stats.body, stats.mind, stats.soul = vitals
+
+        offset = len(STAT_FIELDS)
+        for kind, _, factory in EQUIP_KINDS:
+            item_idx, durability = row[offset], row[offset + 1]
+            offset += 2
+            if item_idx != NO_ITEM:
+                item = factory(self.build_ids[kind][item_idx], self.data)
+                item.set_durability(durability, emit=False)
+                setattr(character, kind, item)
+        return character
+
+    def close(self):
+        """Detaches; the owner also frees the blocks."""
+        self.rows.release()
+        self.records.close()
+        self.tables_block.close()
+        if self.owner:
+            self.records.unlink()
+            self.tables_block.unlink()
+
+@atexit.register
+def detach_all():
+    """Closes every roster this process attached to."""
+    while _ATTACHED:
+        _ATTACHED.popitem()[1].close()
+
+def run_shared_batch(
+    handle: RosterHandle,
+    first: int,
+    second: int,
+    num_fights: int,
+    seed: Optional[int]=None
+) -> BatchResult:
+    """
+    Like `simulation.run_batch`, but fighters come from rows of a shared roster.
+    Only the handle and row indices cross the process boundary.
+    """
+    roster = SharedRoster.attach(handle)
+    return run_fights(lambda: (roster.load(first), roster.load(second)), num_fights, seed)
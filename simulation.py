@@ -0,0 +1,217 @@
+import random
+
+from character import Character
+from charfactory import build_char
+from combat import attack, rolling_with, tick_effects
+from aggregate import Aggregator
+from crits import CritAction, crit_for
+from equip import silence_items
+from equipfactory import make_armor, make_implement, make_weapon
+from effects import EffectNames
+from collections import namedtuple
+from typing import Callable, Optional, Tuple
+
+DuelResult = namedtuple(
+    'DuelResult',
+    ('winner', 'turns', 'damage', 'crits', 'effects'),
+    defaults=((0, 0, 0), 0, ())
+)
+BatchResult = namedtuple('BatchResult', ('first_wins', 'second_wins', 'draws', 'turns'))
+
+MAX_TURNS = 100
+
+def build_fighter(spec: dict) -> Character:
+    """
+    Builds a character from a fighter `spec`.
+    `spec` needs `race` and `class` keys and may have
+    `name`, `weapon`, `armor` and `implement` build ids.
+    Specs are plain dicts so they can be sent to worker processes.
+    The fighter's gear is `quiet`: simulated wear never emits on `MAIN_BUS`.
+    """
+    fighter = build_char(spec["race"], spec["class"], spec.get("name"))
+    if spec.get("weapon"):
+        fighter.weapon = make_weapon(spec["weapon"])
+    if spec.get("armor"):
+        fighter.armor = make_armor(spec["armor"])
+    if spec.get("implement"):
+        fighter.implement = make_implement(spec["implement"])
+
+    silence_items(fighter.equipment)
+    return fighter
+
+def take_turn(actor: Character, target: Character) -> Optional[CritAction]:
+    """
+    `actor` attacks `target` unless stunned. Crits trigger the actor's weapon crit,
+    which is returned.
+    """
+    if actor.alive and not actor.find_effect(EffectNames.STUN.value):
+        result = attack(actor, target)
+        if result.crit:
+            action = crit_for(actor)
+            action(actor, target)
+            return action
+    return None
+
+def vitals(character: Character) -> Tuple[int, int, int]:
+    return (character.body, character.mind, character.soul)
+
+def duel(
+    first: Character,
+    second: Character,
+    max_turns: int=MAX_TURNS,
+    on_turn: Optional[Callable[[int, Character, Character], None]]=None,
+    rng: Optional[random.Random]=None
+) -> DuelResult:
+    """
+    Fights `first` against `second` until one falls or `max_turns` pass.
+    Faster characters act first; `first` wins ties.
+    The winner is `None` on a draw.
+    `on_turn`, if given, is called with the turn number and both fighters after every turn.
+    Rolls come from `rng` if given (see `combat.rolling_with`), otherwise from the `random` module.
+    The result also totals the vitals lost by both fighters (body, mind, soul),
+    the crits landed and the effects those crits applied.
+    """
+    if rng is not None:
+        with rolling_with(rng):
+            return duel(first, second, max_turns, on_turn)
+
+    if second.speed > first.speed:
+        order = (second, first)
+    else:
+        order = (first, second)
+    start = [a + b for a, b in zip(vitals(first), vitals(second))]
+
+    turn = 0
+    crits = 0
+    effects = []
+    while turn < max_turns and first.alive and second.alive:
+        turn += 1
+        for actor, target in (order, order[::-1]):
+            action = take_turn(actor, target)
+            if action is not None:
+                crits += 1
+                effects.extend(action.effect_names)
+        tick_effects(first)
+        tick_effects(second)
+        if on_turn:
+            on_turn(turn, first, second)
+
+    if first.alive and not second.alive:
+        winner = first
+    elif second.alive and not first.alive:
+        winner = second
+    else:
+        winner = None
+
+    end = [a + b for a, b in zip(vitals(first), vitals(second))]
+    return DuelResult(
+        winner=winner,
+        turns=turn,
+        damage=tuple(a - b for a, b in zip(start, end)),
+        crits=crits,
+        effects=tuple(effects)
+    )
+
+def run_fights(
+    make_pair: Callable[[], Tuple[Character, Character]],
+    num_fights: int,
+    seed: Optional[int]=None
+) -> BatchResult:
+    """Runs `num_fights` duels between fresh pairs from `make_pair` and tallies them."""
+    if seed is not None:
+        random.seed(seed)
+
+    first_wins = 0
+    second_wins = 0
+    draws = 0
+    turns = 0
+    for _ in range(num_fights):
+        first, second = make_pair()
+        result = duel(first, second)
+        turns += result.turns
+        if result.winner is first:
+            first_wins += 1
+        elif result.winner is second:
+            second_wins += 1
+        else:
+            draws += 1
+
+    return BatchResult(first_wins, second_wins, draws, turns)
+
+def run_batch(
+    first_spec: dict,
+    second_spec: dict,
+    num_fights: int,
+    seed: Optional[int]=None
+) -> BatchResult:
+    """
+    Runs `num_fights` duels between fresh copies of `first_spec` and `second_spec`.
+    Safe to run in a worker process: takes and returns only plain data.
+    """
+    return run_fights(
+        lambda: (build_fighter(first_spec), build_fighter(second_spec)),
+        num_fights,
+        seed
+    )
+
+def spec_key(spec: dict) -> str:
+    """A stable name for a fighter spec, like `human/warrior/dagger/chain/-`."""
+    parts = (spec["race"], spec["class"], spec.get("weapon"), spec.get("armor"), spec.get("implement"))
+    return "/".join(p or "-" for p in parts)
+
+def parse_spec(key: str) -> dict:
+    """Turns a `spec_key` string back into a fighter spec. Trailing slots may be left off."""
+    parts = key.split("/")
+    if len(parts) < 2 or len(parts) > 5:
+        raise ValueError(f"{key} is not race/class[/weapon/armor/implement]")
+    spec = {"race": parts[0], "class": parts[1]}
+    for slot, part in zip(("weapon", "armor", "implement"), parts[2:]):
+        if part and part != "-":
+            spec[slot] = part
+    return spec
+
+def aggregate_fights(
+    make_pair: Callable[[], Tuple[Character, Character]],
+    num_fights: int,
+    key,
+    agg: Aggregator,
+    seed: Optional[int]=None,
+    rng: Optional[random.Random]=None
+) -> Aggregator:
+    """
+    Runs `num_fights` duels from `make_pair` and streams them into `agg` under `key`.
+    Rolls come from `rng` if given, otherwise from the `random` module.
+    """
+    if seed is not None:
+        random.seed(seed)
+
+    stats = agg.stats(key)
+    for _ in range(num_fights):
+        first, second = make_pair()
+        result = duel(first, second, rng=rng)
+        if result.winner is first:
+            side = 0
+        elif result.winner is second:
+            side = 1
+        else:
+            side = None
+        stats.add(side, result.turns, result.damage, result.crits, result.effects)
+    return agg
+
+def aggregate_batch(
+    first_spec: dict,
+    second_spec: dict,
+    num_fights: int,
+    seed: Optional[int]=None
+) -> Aggregator:
+    """
+    Like `run_batch`, but returns an `Aggregator` keyed by matchup.
+    Results from many workers can be combined with `Aggregator.merge`.
+    """
+    return aggregate_fights(
+        lambda: (build_fighter(first_spec), build_fighter(second_spec)),
+        num_fights,
+        (spec_key(first_spec), spec_key(second_spec)),
+        Aggregator(MAX_TURNS),
+        seed
+    )
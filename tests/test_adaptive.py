@@ -0,0 +1,126 @@
+import combat
+import random
+import threading
+
+from unittest import TestCase
+from unittest.mock import patch
+from adaptive import (
+    D100Stream, MatchupRun, antithetic_pair, compare, compare_loadouts, half_width, rolling_d100, run_adaptive
+)
+
+EVEN = ({"race": "human", "class": "warrior"}, {"race": "human", "class": "warrior"})
+LOPSIDED = ({"race": "human", "class": "warrior"}, {"race": "elf", "class": "magician"})
+OPPONENT = {"race": "elf", "class": "warrior"}
+
+
+class TestD100Stream(TestCase):
+    def test_default_d100_unchanged(self):
+        self.assertIsNone(combat.ROLLS.d100)
+        with patch("combat.dice", return_value=42) as dice:
+            self.assertEqual(combat.d100(), 42)
+        dice.assert_called_once_with(100)
+
+    def test_mirror(self):
+        primary = D100Stream(5)
+        rolls = [primary() for _ in range(20)]
+        mirror = D100Stream(6, rolls)
+        self.assertEqual([mirror() for _ in range(20)], [101 - roll for roll in rolls])
+        self.assertTrue(1 <= mirror() <= 100)
+
+    def test_rolling_d100_restores(self):
+        stream = D100Stream(1)
+        with rolling_d100(stream):
+            combat.d100()
+        self.assertIsNone(combat.ROLLS.d100)
+        self.assertEqual(len(stream.rolls), 1)
+
+    def test_streams_are_per_thread(self):
+        rolls = []
+        def roll():
+            rolls.append(combat.d100())
+        with patch("combat.dice", return_value=42):
+            with rolling_d100(lambda: 7):
+                other = threading.Thread(target=roll)
+                other.start()
+                other.join()
+                roll()
+        self.assertEqual(rolls, [42, 7])
+
+    def test_scoring_leaves_global_rng_alone(self):
+        random.seed(11)
+        before = random.getstate()
+        antithetic_pair(*EVEN, 3)
+        self.assertEqual(random.getstate(), before)
+
+
+class TestHalfWidth(TestCase):
+    def test_identical_scores_arent_certain(self):
+        self.assertGreater(half_width([1.0] * 50), 0)
+        self.assertGreater(half_width([0.0] * 50, low=-1.0), 0)
+        self.assertLess(half_width([1.0] * 500), half_width([1.0] * 50))
+
+    def test_close_to_normal_for_spread_scores(self):
+        samples = [0.0, 0.25, 0.5, 0.75, 1.0] * 200
+        self.assertAlmostEqual(half_width(samples), 1.959964 * (0.125 / 1000) ** 0.5, places=3)
+
+    def test_needs_two_samples(self):
+        self.assertEqual(half_width([0.5]), float("inf"))
+
+
+class TestAdaptive(TestCase):
+    def test_rounds_must_advance(self):
+        for kwargs in ({"round_pairs": 0}, {"max_pairs": 1}):
+            with self.subTest(kwargs):
+                with self.assertRaises(ValueError):
+                    run_adaptive([EVEN], **kwargs)
+                with self.assertRaises(ValueError):
+                    compare_loadouts([EVEN[0]], OPPONENT, **kwargs)
+
+    def test_lopsided_stops_first(self):
+        even, lopsided = run_adaptive([EVEN, LOPSIDED], seed=1, width=0.1, round_pairs=25)
+        self.assertTrue(even.result(0.1).converged)
+        self.assertTrue(lopsided.result(0.1).converged)
+        self.assertLess(len(lopsided.scores), len(even.scores))
+
+    def test_seeded_runs_repeat(self):
+        a = MatchupRun(*EVEN)
+        a.run(3, 30)
+        b = MatchupRun(*EVEN)
+        b.run(3, 20)
+        b.run(3, 10)
+        self.assertEqual(a.scores, b.scores)
+
+    def test_max_pairs(self):
+        run, = run_adaptive([EVEN], seed=1, width=0.001, round_pairs=10, max_pairs=30)
+        self.assertEqual(len(run.scores), 30)
+        self.assertFalse(run.result(0.001).converged)
+
+    def test_common_random_numbers_narrow_comparison(self):
+        human = MatchupRun({"race": "human", "class": "warrior"}, OPPONENT)
+        khaladim = MatchupRun({"race": "khaladim", "class": "warrior"}, OPPONENT)
+        other_seed = MatchupRun({"race": "khaladim", "class": "warrior"}, OPPONENT)
+        human.run(5, 300)
+        khaladim.run(5, 300)
+        other_seed.run(6, 300)
+        self.assertLess(compare(khaladim, human).half_width, compare(other_seed, human).half_width)
+
+    def test_compare_reports_convergence(self):
+        human = MatchupRun({"race": "human", "class": "warrior"}, OPPONENT)
+        khaladim = MatchupRun({"race": "khaladim", "class": "warrior"}, OPPONENT)
+        human.run(5, 20)
+        khaladim.run(5, 20)
+        diff = compare(khaladim, human, 0.01)
+        self.assertFalse(diff.converged)
+        self.assertTrue(compare(khaladim, human, 2 * diff.half_width).converged)
+
+    def test_compare_loadouts_needs_candidates(self):
+        with self.assertRaises(ValueError):
+            compare_loadouts([], OPPONENT)
+
+    def test_compare_loadouts(self):
+        results = compare_loadouts(
+            [{"race": "human", "class": "warrior"}, {"race": "khaladim", "class": "warrior"}],
+            OPPONENT, seed=2, width=0.2, round_pairs=25
+        )
+        self.assertEqual(list(results), ["human/warrior/-/-/-", "khaladim/warrior/-/-/-"])
+        self.assertTrue(results["khaladim/warrior/-/-/-"].converged)
@@ -0,0 +1,44 @@
+import random
+import statistics
+
+from unittest import TestCase
+from aggregate import Histogram, QuantileSketch, RunningStats
+
+
+class TestAggregate(TestCase):
+    def setUp(self):
+        rng = random.Random(3)
+        self.data = [rng.gauss(10, 3) for _ in range(20000)]
+
+    def test_running_stats_merge(self):
+        left, right = RunningStats(), RunningStats()
+        for x in self.data[:7000]:
+            left.add(x)
+        for x in self.data[7000:]:
+            right.add(x)
+        left.merge(right)
+        self.assertEqual(left.count, len(self.data))
+        self.assertAlmostEqual(left.mean, statistics.fmean(self.data))
+        self.assertAlmostEqual(left.variance, statistics.variance(self.data))
+        self.assertEqual(left.max, max(self.data))
+
+    def test_histogram(self):
+        hist = Histogram(0, 10, 5)
+        for x in (-1, 0, 1.9, 2, 9.9, 10):
+            hist.add(x)
+        self.assertEqual((hist.under, hist.counts, hist.over), (1, [2, 1, 0, 0, 1], 1))
+
+    def test_quantile_sketch(self):
+        left, right = QuantileSketch(), QuantileSketch()
+        for x in self.data[:5000]:
+            left.add(x)
+        for x in self.data[5000:]:
+            right.add(x)
+        left.merge(right)
+        self.assertLess(sum(len(level) for level in left.levels), 2000)
+
+        ranked = sorted(self.data)
+        for q in (0.1, 0.5, 0.9):
+            estimate = left.quantile(q)
+            rank = sum(1 for x in ranked if x <= estimate) / len(ranked)
+            self.assertAlmostEqual(rank, q, delta=0.03)
@@ -0,0 +1,36 @@
+import random
+
+from unittest import TestCase
+from ai import Action, Battle, MCTS, SKIP, legal_actions
+from effects import Stun
+from simulation import build_fighter
+
+
+class TestMCTS(TestCase):
+    def setUp(self):
+        random.seed(5)
+        self.mage = build_fighter({"race": "elf", "class": "magician", "implement": "oak staff"})
+        self.brute = build_fighter({"race": "korashi", "class": "warrior", "weapon": "maul"})
+        self.battle = Battle(([self.mage], [self.brute]))
+
+    def test_legal_actions(self):
+        self.assertEqual(len(legal_actions(self.mage, [self.brute])), 3)
+        self.assertEqual(legal_actions(self.brute, [self.mage]), [Action("atp", "dfp", 0)])
+        self.brute.effects["Stun"] = Stun(1)
+        self.assertEqual(legal_actions(self.brute, [self.mage]), [SKIP])
+
+    def test_search_leaves_battle_alone(self):
+        tree = MCTS(self.battle, (0, 0), time_limit=5, rollouts=200)
+        action = tree.search()
+        self.assertIn(action, legal_actions(self.mage, [self.brute]))
+        self.assertEqual(tree.root.visits, 200)
+        self.assertEqual(self.mage.body, self.mage.max_body)
+        self.assertEqual(self.battle.round, 0)
+
+    def test_advance_reuses_subtree(self):
+        tree = MCTS(self.battle, (0, 0), time_limit=5, rollouts=100)
+        action = tree.search()
+        kept = tree.root.children[action]
+        self.battle.play_round(lambda s, i, actor: action if s == 0 else Action("atp", "dfp", 0))
+        tree.advance(self.battle, action)
+        self.assertIs(tree.root, kept)
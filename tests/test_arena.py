@@ -0,0 +1,107 @@
+import asyncio
+import json
+
+from unittest import IsolatedAsyncioTestCase
+from unittest.mock import MagicMock, patch
+from arena import MAX_SIM_FIGHTS, Arena, ArenaError, ArenaServer, Watcher
+from combat import apply_effect
+from effects import Stun
+
+
+class Recorder:
+    def __init__(self):
+        self.events = []
+
+    async def on_arena(self, event: dict):
+        self.events.append(event)
+
+
+class TestArena(IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.arena = Arena("pit")
+        self.recorder = Recorder()
+        self.arena.bus.subscribe("arena", self.recorder)
+        await self.arena.join({"race": "human", "class": "warrior", "name": "Dan"})
+        await self.arena.join({"race": "korashi", "class": "warrior", "name": "Ogluk"})
+
+    async def test_attack_events(self):
+        with patch('combat.randint', return_value=90):
+            await self.arena.attack("Ogluk", "Dan")
+        await self.arena.end_turn()
+
+        kinds = [e["event"] for e in self.recorder.events]
+        self.assertEqual(kinds, ["joined", "joined", "attacked", "turn"])
+        self.assertLess(self.arena.fighter("Dan").body, 14)
+
+    async def test_bad_commands(self):
+        with self.assertRaises(ArenaError):
+            await self.arena.attack("Nobody", "Dan")
+        with self.assertRaises(ArenaError):
+            await self.arena.attack("Dan", "Ogluk", "luck")
+        with self.assertRaises(ArenaError):
+            await self.arena.join({"race": "human", "class": "warrior", "name": "Dan"})
+
+    async def test_only_able_fighters_attack(self):
+        apply_effect(self.arena.fighter("Dan"), Stun(1))
+        with self.assertRaises(ArenaError):
+            await self.arena.attack("Dan", "Ogluk")
+        self.arena.fighter("Dan").body = 0
+        with self.assertRaises(ArenaError):
+            await self.arena.attack("Ogluk", "Dan")
+        self.assertEqual([e["event"] for e in self.recorder.events], ["joined", "joined"])
+
+    async def test_server_protocol(self):
+        server = ArenaServer()
+        handlers = []
+        async def handle(reader, writer):
+            handlers.append(asyncio.current_task())
+            await server.handle(reader, writer)
+        listener = await asyncio.start_server(handle, host="127.0.0.1", port=0)
+        port = listener.sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+
+        async def send(**cmd):
+            writer.write(json.dumps(cmd).encode() + b"\n")
+            await writer.drain()
+            return json.loads(await reader.readline())
+
+        self.assertEqual((await send(cmd="create", arena="a"))["arena"], "a")
+        self.assertTrue((await send(cmd="watch", arena="a"))["ok"])
+        #events are pushed before the reply to the command that caused them
+        pushed = await send(cmd="join", arena="a", fighter={"race": "elf", "class": "magician"})
+        self.assertEqual(pushed["event"], "joined")
+        self.assertTrue(json.loads(await reader.readline())["ok"])
+        self.assertFalse((await send(cmd="state", arena="missing"))["ok"])
+        #malformed commands get an error line and leave the connection open
+        for bad in (
+            [],
+            "x",
+            {"cmd": "join", "arena": "a", "fighter": "elf"},
+            {"cmd": "state", "arena": []},
+            {"cmd": "simulate", "first": {}, "second": {}, "fights": 0},
+            {"cmd": "simulate", "first": {}, "second": {}, "fights": MAX_SIM_FIGHTS + 1}
+        ):
+            writer.write(json.dumps(bad).encode() + b"\n")
+            self.assertFalse(json.loads(await reader.readline())["ok"])
+        self.assertTrue((await send(cmd="unwatch", arena="a"))["ok"])
+        self.assertTrue((await send(cmd="state", arena="a"))["ok"])
+
+        #hang up and let the server finish with the connection
+        writer.write_eof()
+        self.assertEqual(await reader.read(), b"")
+        await asyncio.gather(*handlers)
+        writer.close()
+        await writer.wait_closed()
+        listener.close()
+        await listener.wait_closed()
+
+    async def test_slow_watcher_never_blocks(self):
+        writer = MagicMock()
+        writer.is_closing.return_value = False
+        #never started, like a client that stopped reading
+        stalled = Watcher(writer, max_queue=4)
+        self.arena.bus.subscribe("arena", stalled)
+        for _ in range(10):
+            await asyncio.wait_for(self.arena.end_turn(), 1)
+        self.assertEqual((stalled.queue.qsize(), stalled.dropped), (4, 6))
+        self.assertEqual(len(self.recorder.events), 12)
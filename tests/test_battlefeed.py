@@ -0,0 +1,94 @@
+import combat
+import random
+import time
+
+from unittest import TestCase
+from unittest.mock import patch
+from battlefeed import BattleFeed
+from simulation import build_fighter
+
+WARRIOR = {"race": "human", "class": "warrior", "weapon": "dagger"}
+MAGICIAN = {"race": "dwarf", "class": "magician"}
+
+
+class TestBattleFeed(TestCase):
+    def test_drain_keeps_newest_frame(self):
+        feed = BattleFeed(WARRIOR, MAGICIAN, fights=20, seed=3)
+        feed.start()
+        feed.join(10)
+        frame, done = feed.drain()
+        self.assertTrue(feed.finished)
+        self.assertEqual([d.fight for d in done], list(range(20)))
+        self.assertEqual(frame.fight, 19)
+        self.assertEqual(frame.turn, done[-1].turns)
+        self.assertGreater(feed.dropped, 0)
+        self.assertEqual(feed.drain(), (None, []))
+
+    def test_frames_are_copies(self):
+        feed = BattleFeed(WARRIOR, MAGICIAN, fights=1, seed=5, turn_delay=0.001)
+        feed.start()
+        seen = []
+        while not feed.finished:
+            frame, _ = feed.drain()
+            if frame:
+                seen.append((frame, frame.fighters[0].body, frame.fighters[1].body))
+            time.sleep(0.002)
+        for frame, first_body, second_body in seen:
+            self.assertEqual((frame.fighters[0].body, frame.fighters[1].body), (first_body, second_body))
+
+    def test_worker_gear_is_quiet(self):
+        built = []
+        def build(spec):
+            built.append(build_fighter(spec))
+            return built[-1]
+        with patch("battlefeed.build_fighter", side_effect=build):
+            feed = BattleFeed(WARRIOR, MAGICIAN, fights=5, seed=3)
+            feed.start()
+            feed.join(10)
+        frame, _ = feed.drain()
+        gear = [item for fighter in (*built, *frame.fighters) for item in fighter.equipment if item]
+        self.assertEqual(len(built), 10)
+        self.assertTrue(gear and all(item.quiet for item in gear))
+
+    def test_seeded_feeds_repeat(self):
+        results = []
+        for _ in range(2):
+            feed = BattleFeed(WARRIOR, MAGICIAN, fights=10, seed=11)
+            feed.start()
+            feed.join(10)
+            results.append(feed.drain()[1])
+        self.assertEqual(results[0], results[1])
+
+    def test_stop(self):
+        feed = BattleFeed(WARRIOR, MAGICIAN, fights=10_000, turn_delay=0.01)
+        feed.start()
+        feed.stop()
+        feed.join(5)
+        feed.drain()
+        self.assertTrue(feed.finished)
+
+    def test_feeds_keep_their_own_rolls(self):
+        alone = BattleFeed(WARRIOR, MAGICIAN, fights=10, seed=11)
+        alone.start()
+        alone.join(10)
+        expected = alone.drain()[1]
+
+        random.seed(1)
+        state = random.getstate()
+        feeds = [BattleFeed(WARRIOR, MAGICIAN, fights=10, seed=11, turn_delay=0.0005) for _ in range(2)]
+        for feed in feeds:
+            feed.start()
+        #Other code rolling on the main thread meanwhile.
+        deadline = time.monotonic() + 0.05
+        while time.monotonic() < deadline:
+            random.seed(2)
+            combat.d100()
+        for feed in feeds:
+            feed.join(10)
+            self.assertEqual(feed.drain()[1], expected)
+
+        random.setstate(state)
+        feed = BattleFeed(WARRIOR, MAGICIAN, fights=3, seed=4)
+        feed.start()
+        feed.join(10)
+        self.assertEqual(random.getstate(), state)
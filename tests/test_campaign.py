@@ -0,0 +1,78 @@
+import os
+import random
+import tempfile
+
+from unittest import TestCase
+from unittest.mock import patch
+import campaign as cp
+
+WARRIOR = {"race": "human", "class": "warrior", "weapon": "dagger"}
+MAGICIAN = {"race": "dwarf", "class": "magician"}
+WARLOCK = {"race": "elf", "class": "warlock"}
+
+
+class Crash(Exception):
+    pass
+
+
+class TestCampaign(TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.units = cp.sweep_units([(WARRIOR, MAGICIAN), (MAGICIAN, WARLOCK), (WARRIOR, WARLOCK)], 250, 42)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def dir(self, name: str) -> str:
+        return os.path.join(self.tmp.name, name)
+
+    def test_resume_is_bit_identical(self):
+        whole = cp.Campaign(self.dir("whole"), self.units, chunk=100).merged()
+
+        real_dump = cp.atomic_dump
+        calls = []
+        def crashing_dump(obj, path):
+            calls.append(path)
+            if len(calls) == 5:
+                raise Crash()
+            real_dump(obj, path)
+
+        resumed_campaign = cp.Campaign(self.dir("resumed"), self.units, chunk=100)
+        with patch("campaign.atomic_dump", crashing_dump):
+            with self.assertRaises(Crash):
+                resumed_campaign.run()
+        self.assertEqual(resumed_campaign.progress(), [250, 100, 0])
+
+        resumed = cp.Campaign(self.dir("resumed"), self.units, chunk=100).merged()
+        self.assertEqual(resumed.summary(), whole.summary())
+        for key, stats in whole.matchups.items():
+            other = resumed.matchups[key]
+            self.assertEqual(vars(other.turns), vars(stats.turns))
+            self.assertEqual(vars(other.turn_quantiles), vars(stats.turn_quantiles))
+            self.assertEqual(
+                [vars(s) for s in other.damage.values()],
+                [vars(s) for s in stats.damage.values()]
+            )
+        self.assertEqual(resumed_campaign.progress(), [250, 250, 250])
+
+    def test_leaves_global_rng_alone(self):
+        random.seed(8)
+        before = random.getstate()
+        merged = cp.Campaign(self.dir("c"), self.units, chunk=100).merged()
+        self.assertEqual(random.getstate(), before)
+        self.assertEqual(merged.summary(), cp.Campaign(self.dir("c"), self.units).merged().summary())
+
+    def test_mismatch(self):
+        cp.Campaign(self.dir("c"), self.units)
+        other = cp.sweep_units([(WARRIOR, MAGICIAN)], 250, 7)
+        with self.assertRaises(cp.CampaignMismatchError):
+            cp.Campaign(self.dir("c"), other)
+
+    def test_chunk_must_advance(self):
+        for chunk in (0, -5):
+            with self.subTest(chunk):
+                with self.assertRaises(ValueError):
+                    cp.Campaign(self.dir("c"), self.units, chunk=chunk)
+                with self.assertRaises(ValueError):
+                    cp.run_unit(self.dir("c"), self.units[0], chunk)
+        self.assertFalse(os.path.exists(self.dir("c")))
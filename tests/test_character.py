@@ -1,3 +1,6 @@
+import combat as cbt
+import effects as ef
+
 from charfactory import build_char
 from equipfactory import make_armor, make_implement, make_weapon
 from equip import ImplementStats, WeaponStats, ArmorStats
@@ -56,3 +59,30 @@ class CharacterTest(TestCase):
         self.assertEqual(self.warrior.defense, 4)
         self.assertEqual(self.warrior.damage, "1d4+sklmod")
 
+
+    def test_fork_and_rollback(self):
+        self.warrior.weapon = make_weapon("dagger")
+        self.warrior.armor = make_armor("chain")
+        cbt.apply_effect(self.warrior, ef.Shield(3, 5))
+        snap = self.warrior.snapshot()
+
+        twin = self.warrior.fork()
+        cbt.damage(twin, 10, cbt.DamageType.BODY)
+        cbt.apply_effect(twin, ef.Might(2))
+        twin.weapon.durability -= 5
+        self.assertEqual(self.warrior.body, 14)
+        self.assertEqual(self.warrior.weapon.durability, 50)
+        self.assertEqual(self.warrior.find_effect("Shield").potency, 5)
+        self.assertIsNone(self.warrior.find_effect("Might"))
+        self.assertEqual(self.warrior.strength, 25)
+        self.assertIs(twin.weapon.crit_action, self.warrior.weapon.crit_action)
+
+        cbt.damage(self.warrior, 10, cbt.DamageType.BODY)
+        cbt.apply_effect(self.warrior, ef.Weakness(2))
+        self.warrior.armor.durability = -100
+        self.warrior.rollback(snap)
+        self.assertEqual(self.warrior.body, 14)
+        self.assertEqual(self.warrior.strength, 25)
+        self.assertEqual(self.warrior.armor.durability, 75)
+        self.assertEqual(list(self.warrior.effects), ["Shield"])
+        self.assertEqual(self.warrior.find_effect("Shield").potency, 5)
@@ -0,0 +1,157 @@
+import contextlib
+import io
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+from unittest import TestCase
+from cli import main
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def run_cli(*argv) -> tuple:
+    """Runs `cli.main` and returns `(exit code, stdout lines, stderr)`."""
+    out, err = io.StringIO(), io.StringIO()
+    with contextlib.redirect_stdout(out), contextlib.redirect_stderr(err):
+        try:
+            code = main(list(argv))
+        except SystemExit as e:
+            code = e.code
+    return code, out.getvalue().splitlines(), err.getvalue()
+
+
+class TestParser(TestCase):
+    def test_bad_arguments(self):
+        for argv in (
+            [],
+            ["fight"],
+            ["simulate", "human/warrior"],
+            ["simulate", "human/warrior", "elf/magician", "-n", "many"],
+            ["sweep", "--checkpoint", "somewhere"],
+            ["sweep", "--seed", "1", "--checkpoint", "somewhere", "--chunk", "0"],
+            ["inspect"],
+            ["submit"],
+            ["submit", "queue.db", "--shard-fights", "0"],
+            ["adaptive", "human/warrior"],
+            ["adaptive", "human/warrior", "elf/magician", "--round-pairs", "0"],
+            ["adaptive", "human/warrior", "elf/magician", "--max-pairs", "1"]
+        ):
+            with self.subTest(argv):
+                code, _, err = run_cli(*argv)
+                self.assertEqual(code, 2)
+                self.assertIn("usage", err)
+
+    def test_every_command_has_help(self):
+        for command in ("simulate", "sweep", "submit", "work", "collect", "adaptive", "inspect", "validate"):
+            with self.subTest(command):
+                code, lines, _ = run_cli(command, "--help")
+                self.assertEqual(code, 0)
+                self.assertTrue(lines[0].startswith(f"usage: cli {command}"))
+
+
+class TestCommands(TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_simulate(self):
+        code, lines, _ = run_cli("simulate", "human/warrior", "elf/magician", "-n", "20", "--seed", "3")
+        self.assertEqual(code, 0)
+        summary = json.loads(lines[0])
+        self.assertEqual((summary["first"], summary["second"]), ("human/warrior/-/-/-", "elf/magician/-/-/-"))
+        cache = os.path.join(self.tmp.name, "results.db")
+        cached = run_cli("simulate", "human/warrior", "elf/magician", "-n", "20", "--seed", "3", "--cache", cache)
+        self.assertEqual(cached[1], lines)
+
+    def test_bad_specs(self):
+        for argv in (
+            ["simulate", "gnome/warrior", "elf/magician"],
+            ["simulate", "human/warrior/spork", "elf/magician"],
+            ["inspect", "human"],
+            ["adaptive", "human/warrior", "elf/bard"]
+        ):
+            with self.subTest(argv):
+                code, _, err = run_cli(*argv)
+                self.assertEqual(code, 2)
+                self.assertIn("human" if argv[0] == "inspect" else "no ", err)
+
+    def test_sweep(self):
+        code, lines, _ = run_cli("sweep", "-n", "2", "--seed", "1", "--workers", "1")
+        self.assertEqual(code, 0)
+        checkpoint = os.path.join(self.tmp.name, "campaign")
+        resumed = run_cli("sweep", "-n", "2", "--seed", "1", "--workers", "1", "--checkpoint", checkpoint)
+        self.assertEqual(resumed[1], lines)
+        mismatch = run_cli("sweep", "-n", "3", "--seed", "1", "--workers", "1", "--checkpoint", checkpoint)
+        self.assertEqual(mismatch[0], 1)
+        cache = os.path.join(self.tmp.name, "results.db")
+        for argv in ([], ["--checkpoint", os.path.join(self.tmp.name, "cached")]):
+            with self.subTest(argv):
+                cached = run_cli("sweep", "-n", "2", "--seed", "1", "--workers", "1", "--cache", cache, *argv)
+                self.assertEqual(cached[1], lines)
+
+    def test_queue_commands(self):
+        queue = os.path.join(self.tmp.name, "queue.db")
+        code, lines, _ = run_cli("submit", queue, "-n", "2", "--seed", "1", "--shard-fights", "1")
+        self.assertEqual(code, 0)
+        self.assertIn("210 shards queued", lines[0])
+        code, lines, _ = run_cli("work", queue, "--worker-id", "w1", "--cache", os.path.join(self.tmp.name, "results.db"))
+        self.assertEqual((code, lines), (0, ["w1: 210 shards completed"]))
+        code, lines, _ = run_cli("collect", queue, "--timeout", "5")
+        self.assertEqual((code, len(lines)), (0, 105))
+
+    def test_collect_timeout(self):
+        queue = os.path.join(self.tmp.name, "queue.db")
+        run_cli("submit", queue, "-n", "1")
+        code, _, err = run_cli("collect", queue, "--timeout", "0")
+        self.assertEqual(code, 1)
+        self.assertIn("shards still running", err)
+
+    def test_adaptive(self):
+        code, lines, _ = run_cli("adaptive", "human/warrior", "elf/magician", "human/warrior", "--width", "0.2")
+        self.assertEqual(code, 0)
+        self.assertEqual([json.loads(line)["second"] for line in lines], ["elf/magician/-/-/-", "human/warrior/-/-/-"])
+
+    def test_inspect(self):
+        code, lines, _ = run_cli("inspect", "dwarf/warlock")
+        self.assertEqual(code, 0)
+        self.assertEqual(json.loads("\n".join(lines))["name"], "Dvergr warlock")
+
+    def test_validate(self):
+        code, lines, _ = run_cli("validate", "--no-cache")
+        self.assertEqual(code, 0)
+        self.assertTrue(lines[0].startswith("chardata.json: ok"))
+
+    def scratch_tree(self, data_file: str) -> str:
+        """A copy of the tree whose data/chardata.json holds `data_file`."""
+        tree = os.path.join(self.tmp.name, "tree")
+        shutil.rmtree(tree, ignore_errors=True)
+        shutil.copytree(ROOT, tree, ignore=shutil.ignore_patterns(".*", "tests", "data", "__pycache__"))
+        os.mkdir(os.path.join(tree, "data"))
+        with open(os.path.join(tree, "data", "chardata.json"), "w") as f:
+            f.write(data_file)
+        return tree
+
+    def run_in(self, tree: str, *argv) -> subprocess.CompletedProcess:
+        return subprocess.run([sys.executable, "cli.py", *argv], cwd=tree, capture_output=True, text=True)
+
+    def test_malformed_data_file(self):
+        tree = self.scratch_tree('{"races": {')
+        for argv in (["validate"], ["inspect", "human/warrior"]):
+            with self.subTest(argv):
+                proc = self.run_in(tree, *argv)
+                self.assertEqual(proc.returncode, 1)
+                self.assertIn("not valid JSON", proc.stderr)
+                self.assertNotIn("Traceback", proc.stderr)
+
+    def test_commands_use_verified_data(self):
+        with open(os.path.join(ROOT, "data", "chardata.json")) as f:
+            data = json.load(f)
+        del data["weapons"]["dagger"]["durability"]
+        proc = self.run_in(self.scratch_tree(json.dumps(data)), "inspect", "human/warrior")
+        self.assertEqual(proc.returncode, 1)
+        self.assertIn("weapon dagger: missing durability", proc.stderr)
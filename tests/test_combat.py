@@ -0,0 +1,68 @@
+import combat as cbt
+import effects as ef
+import random
+
+from unittest import TestCase
+from charfactory import build_char
+from character import DamageType
+from equipfactory import make_armor, make_implement, make_weapon
+
+
+class TestDamageTemplates(TestCase):
+    def setUp(self):
+        self.fighter = build_char("human", "warrior", "Dan")
+        self.fighter.weapon = make_weapon("maul")
+        self.fighter.implement = make_implement("oak staff")
+
+    def test_matches_string_path(self):
+        for d_str in ("weapon", "imp+sklmod", "2d4-1d3+strmod", "1+strmod", "-2d6+10"):
+            random.seed(7)
+            expected = [cbt.dice_str_ext(cbt.dice_script_parse(self.fighter, d_str)) for _ in range(20)]
+            random.seed(7)
+            actual = [cbt.roll_damage(self.fighter, d_str) for _ in range(20)]
+            self.assertEqual(expected, actual, d_str)
+
+    def test_rebinds_on_change(self):
+        maul = cbt.bind_damage(self.fighter, "weapon")
+        self.assertIs(maul, cbt.bind_damage(self.fighter, "weapon"))
+        self.assertEqual(maul.bonus, 4)
+
+        self.fighter.stats.strength += 10
+        self.assertEqual(cbt.bind_damage(self.fighter, "weapon").bonus, 6)
+
+        self.fighter.weapon = make_weapon("dagger")
+        dagger = cbt.bind_damage(self.fighter, "weapon")
+        self.assertEqual((dagger.terms, dagger.bonus), ([(1, 1, 4)], 2))
+
+
+class TestDamagePipeline(TestCase):
+    def setUp(self):
+        self.victims = [build_char("human", "warrior", "Dan"), build_char("dwarf", "warlock", "Gimli")]
+        self.twins = [build_char("human", "warrior", "Dan"), build_char("dwarf", "warlock", "Gimli")]
+        for group in (self.victims, self.twins):
+            group[1].armor = make_armor("chain")
+            for victim in group:
+                cbt.apply_effect(victim, ef.Shield(3, 5))
+
+    def test_batch_matches_single(self):
+        hits = [(0, 3, DamageType.BODY), (1, 6, DamageType.BODY), (0, 4, DamageType.MIND), (1, 2, DamageType.SOUL)]
+        for idx, amt, dtype in hits:
+            cbt.damage(self.victims[idx], amt, dtype)
+        cbt.DAMAGE_PIPELINE.run([cbt.DamagePacket(self.twins[idx], amt, dtype) for idx, amt, dtype in hits])
+
+        for victim, twin in zip(self.victims, self.twins):
+            self.assertEqual(victim.stats, twin.stats)
+            self.assertEqual(victim.effects.keys(), twin.effects.keys())
+        self.assertEqual(self.victims[1].armor.durability, self.twins[1].armor.durability)
+
+    def test_custom_stage(self):
+        def ward(packet: cbt.DamagePacket):
+            if packet.dtype == DamageType.SOUL:
+                packet.remainder = 0
+
+        cbt.DAMAGE_PIPELINE.insert(cbt.vital_stage, ward)
+        try:
+            cbt.damage(self.victims[0], 50, DamageType.SOUL, False, False)
+        finally:
+            cbt.DAMAGE_PIPELINE.remove(ward)
+        self.assertEqual(self.victims[0].soul, 33)
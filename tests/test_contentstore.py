@@ -0,0 +1,36 @@
+from unittest import TestCase
+from charfactory import build_char
+from contentstore import ContentStore
+from dataloader import GAME_DATA
+from equipfactory import make_armor, make_implement, make_weapon
+
+
+class TestContentStore(TestCase):
+    def setUp(self):
+        self.store = ContentStore(cache_size=2)
+        self.store.import_json(GAME_DATA)
+
+    def tearDown(self):
+        self.store.close()
+
+    def test_same_lookups(self):
+        self.assertEqual(make_weapon("dagger", self.store), make_weapon("dagger"))
+        self.assertEqual(make_armor("chain", self.store), make_armor("chain"))
+        self.assertEqual(make_implement("oak staff", self.store), make_implement("oak staff"))
+        self.assertEqual(build_char("elf", "warlock", data=self.store), build_char("elf", "warlock"))
+        self.assertEqual(sorted(self.store["weapons"]), sorted(GAME_DATA["weapons"]))
+        with self.assertRaises(KeyError):
+            self.store["weapons"]["spork"]
+
+    def test_lru(self):
+        weapons = self.store["weapons"]
+        for build_id in ("dagger", "maul", "mace", "maul"):
+            weapons[build_id]
+        self.assertEqual(list(weapons.hot), ["mace", "maul"])
+
+    def test_indexed_queries(self):
+        self.assertEqual([b for b, _ in self.store.weapons_with_atp(0)], ["longsword", "mace", "shortsword", "dagger"])
+        self.assertEqual([b for b, _ in self.store.armor_by_defense(3, 4)], ["chain", "halfplate"])
+        self.assertEqual(self.store.query("implements", "pwr", lo=10, limit=1)[0][0], "brass rod")
+        with self.assertRaises(ValueError):
+            self.store.query("weapons", "cost")
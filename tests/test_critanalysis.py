@@ -0,0 +1,108 @@
+import critanalysis as ca
+import combat as cbt
+import time
+
+from unittest import TestCase
+from character import DamageType
+from deprecated.critscript import CritScriptSyntaxError
+from simulation import build_fighter
+
+EMBERSPARK = """
+atk(pwr vs dfp)
+    hit
+        Damage Body 1d3+IMP
+        Damage Soul 1d2+IMP
+        Effect Soulburn 1
+    endhit
+    crit
+        Effect Soulburn 5
+    endcrit
+endatk
+"""
+
+SAVAGERY = """
+do 2 times
+    atk(atp vs dfp)
+        hit
+            Damage Body WEAPON
+            Effect Bleed 1
+        endhit
+    endatk
+done
+"""
+
+
+class TestCritAnalysis(TestCase):
+    def setUp(self):
+        self.user = build_fighter({"race": "human", "class": "warrior", "weapon": "dagger"})
+        self.target = build_fighter({"race": "dwarf", "class": "magician"})
+        self.context = ca.context_for(self.user, self.target)
+
+    def test_dice_bounds(self):
+        self.assertEqual(ca.dice_bounds("1d6"), (1, 6, 3.5))
+        self.assertEqual(ca.dice_bounds("2d6-3")[:2], (0, 9))
+        self.assertAlmostEqual(ca.dice_bounds("1d4-2").mean, (0 + 0 + 1 + 2) / 4)
+        self.assertAlmostEqual(ca.dice_bounds("1d6-1d6").mean, 35 / 36)
+        self.assertEqual(ca.dice_bounds("-2d6"), ca.ZERO)
+
+    def test_big_dice(self):
+        self.assertEqual(ca.dice_bounds("60d100+5"), (65, 6005, 3035.0))
+        ca.dice_bounds.cache_clear()
+        start = time.perf_counter()
+        clamped = ca.dice_bounds("60d100-3000")
+        self.assertLess(time.perf_counter() - start, 1.0)
+        self.assertEqual(clamped[:2], (0, 3000))
+        self.assertGreater(clamped.mean, 0)
+
+    def test_hit_chances_match_combat(self):
+        miss, hit, crit = ca.hit_chances(self.user.atp, self.target.dfp)
+        self.assertAlmostEqual(miss + hit + crit, 1.0)
+        counts = [0, 0, 0]
+        trials = 20000
+        for _ in range(trials):
+            result = cbt.hit(self.user.fork(), self.target, "atp", "dfp")
+            counts[2 if result.crit else 1 if result.success else 0] += 1
+        for want, got in zip((miss, hit, crit), counts):
+            self.assertAlmostEqual(want, got / trials, delta=0.02)
+
+    def test_savagery(self):
+        analysis = ca.analyze(SAVAGERY, self.context)
+        miss, hit, crit = ca.hit_chances(self.context.atp, self.context.defense["dfp"])
+        weapon = ca.dice_bounds(ca.resolve_dice("weapon", self.context))
+        body = analysis.damage[(ca.TARGET, DamageType.BODY)]
+        self.assertEqual(body.min, 0 if miss else 2 * weapon.min)
+        self.assertEqual(body.max, 2 * weapon.max)
+        self.assertAlmostEqual(body.mean, 2 * (hit + crit) * weapon.mean)
+        self.assertAlmostEqual(analysis.effects[(ca.TARGET, "bleed")].mean, 2 * (hit + crit))
+        self.assertFalse(analysis.runaway)
+
+    def test_crit_blocks_stack_on_hits(self):
+        analysis = ca.analyze(EMBERSPARK, self.context)
+        _, hit, crit = ca.hit_chances(self.context.pwr, self.context.defense["dfp"])
+        self.assertAlmostEqual(analysis.effects[(ca.TARGET, "soulburn")].mean, hit + 2 * crit)
+        self.assertEqual(analysis.effects[(ca.TARGET, "soulburn")].max, 2 if crit else 1)
+
+    def test_self_and_weaponcrit(self):
+        analysis = ca.analyze("self\nEffect Shield 10 100\nendself\nweaponcrit", self.context)
+        self.assertEqual(analysis.effects[(ca.SELF, "shield")], (1, 1, 1.0))
+        crit = ca.crit_tally(self.user.weapon.crit_action, self.context, ca.TARGET)
+        for key, bounds in crit.items():
+            merged = analysis.damage.get(key) or analysis.effects.get(key)
+            self.assertEqual(merged, bounds)
+
+    def test_runaway_and_rank(self):
+        runaway = "do 1000000 times\natk(atp vs dfp)\nhit\ndamage body weapon\nendhit\nendatk\ndone"
+        analysis = ca.analyze(runaway, self.context)
+        self.assertTrue(analysis.runaway)
+        self.assertGreater(analysis.cost, 1_000_000)
+
+        ranked = ca.rank({"savagery": SAVAGERY, "emberspark": EMBERSPARK, "runaway": runaway}, self.context)
+        self.assertEqual(sorted(name for name, _ in ranked), ["emberspark", "savagery"])
+        self.assertGreaterEqual(ranked[0][1], ranked[1][1])
+        self.assertEqual(dict(ranked)["savagery"], ca.expected_damage(ca.analyze(SAVAGERY, self.context)))
+
+    def test_syntax_errors(self):
+        with self.assertRaises(CritScriptSyntaxError):
+            ca.analyze("atk(atp vs dfp)\nhit\nendhit", self.context)
+        with self.assertRaises(CritScriptSyntaxError):
+            ca.analyze("endmiss", self.context)
@@ -0,0 +1,42 @@
+import crits as cr
+import effects as ef
+
+from unittest import TestCase
+from unittest.mock import patch
+from charfactory import build_char
+from equipfactory import make_weapon
+
+
+class TestCrits(TestCase):
+    def setUp(self):
+        self.attacker = build_char("human", "warrior", "Dan")
+        self.defender = build_char("korashi", "warrior", "Ogluk")
+
+    def test_compiled_once(self):
+        dagger = make_weapon("dagger")
+        self.assertIsInstance(dagger.crit_action, cr.DamageCrit)
+        self.assertIs(dagger.crit_action, make_weapon("dagger").crit_action)
+
+    def test_effect_crit(self):
+        cr.compile_crit("effect bleed 2")(self.attacker, self.defender)
+        cr.compile_crit("effect bleed 2")(self.attacker, self.defender)
+        bleed = self.defender.find_effect(ef.EffectNames.BLEED.value)
+        self.assertIsInstance(bleed, ef.Bleed)
+        self.assertEqual((bleed.duration, bleed.potency), (2, 2))
+
+    def test_damage_crit(self):
+        self.attacker.weapon = make_weapon("dagger")
+        with patch('combat.randint', return_value=3):
+            cr.crit_for(self.attacker)(self.attacker, self.defender)
+        #2d4+sklmod = 3+3+2
+        self.assertEqual(self.defender.body, self.defender.max_body - 8)
+
+    def test_unarmed(self):
+        cr.crit_for(self.attacker)(self.attacker, self.defender)
+        self.assertIsNotNone(self.defender.find_effect(ef.EffectNames.STUN.value))
+
+    def test_bad_crits(self):
+        for bad in ("effect frenzy 1", "effect stun", "effect stun 0", "effect shield 2",
+                    "damage spirit 1d4", "damage body 1d4+luck", "heal body 2", ""):
+            with self.assertRaises(cr.BadCritError, msg=bad):
+                cr.compile_crit(bad)
@@ -0,0 +1,23 @@
+import difftest as dt
+
+from unittest import TestCase
+
+
+class TestDifferential(TestCase):
+    def test_live_engine_matches_reference(self):
+        self.assertEqual(dt.run_cases(dt.live_engine(), 300), [])
+
+    def test_catches_divergence(self):
+        def no_armor(victim, amt, dtype, armor_ok=True, shield_ok=True):
+            dt.reference_damage(victim, amt, dtype, False, shield_ok)
+
+        broken = dt.live_engine()._replace(name="broken", damage=no_armor)
+        found = dt.run_cases(broken, 50)
+        self.assertTrue(found)
+        self.assertNotEqual(found[0].expected, found[0].actual)
+
+    def test_reference_is_frozen(self):
+        #A reference that shares a function with `combat` can't catch changes to it.
+        for field, live in zip(dt.Engine._fields[1:], dt.live_engine()[1:]):
+            with self.subTest(field):
+                self.assertIsNot(getattr(dt.REFERENCE, field), live)
@@ -46,3 +46,18 @@ class TestEffects(TestCase):
         cbt.tick_effects(self.victim)
         self.assertEqual(self.victim.mind, 10)
         self.assertEqual(shield.potency, 95)
+
+    def test_stat_layers(self):
+        cbt.apply_effect(self.victim, ef.Might(2))
+        cbt.apply_effect(self.victim, ef.Weakness(1))
+        self.assertEqual(self.victim.strength, 25)
+
+        cbt.tick_effects(self.victim)
+        self.assertIsNone(self.victim.find_effect(ef.EffectNames.WEAKNESS.value))
+        self.assertEqual((self.victim.strength, self.victim.stamina), (35, 35))
+        self.assertEqual(self.victim.base_stats.strength, 25)
+
+        self.victim.body -= 3
+        cbt.tick_effects(self.victim)
+        self.assertEqual((self.victim.strength, self.victim.stamina), (25, 25))
+        self.assertEqual(self.victim.body, 11)
@@ -0,0 +1,89 @@
+from unittest import TestCase
+from charfactory import build_char
+from equip import repair_roster
+from equipfactory import make_armor, make_weapon
+from eventbus import MAIN_BUS, EventBus
+from simulation import build_fighter
+
+
+class Recorder:
+    def __init__(self):
+        self.events = []
+
+    def on_itembroken(self, item):
+        self.events.append(("broken", item.name))
+
+    def on_itemdestroyed(self, item):
+        self.events.append(("destroyed", item.name))
+
+    def on_itemrepaired(self, item):
+        self.events.append(("repaired", item.name))
+
+    def on_itemsrepaired(self, items):
+        self.events.append(("bulk", [i.name for i in items]))
+
+
+class TestDurability(TestCase):
+    TOPICS = ("itembroken", "itemdestroyed", "itemrepaired", "itemsrepaired")
+
+    def setUp(self):
+        self.recorder = Recorder()
+        for topic in self.TOPICS:
+            MAIN_BUS.subscribe(topic, self.recorder)
+        self.dagger = make_weapon("dagger")
+
+    def tearDown(self):
+        for topic in self.TOPICS:
+            MAIN_BUS.unsubscribe(topic, self.recorder)
+
+    def test_edges_only(self):
+        self.dagger.durability = 1
+        self.assertEqual(self.recorder.events, [])
+        self.dagger.durability -= 1
+        self.dagger.durability -= 1
+        self.assertTrue(self.dagger.is_broken)
+        self.assertEqual(self.recorder.events, [("broken", "Dagger")])
+
+        self.dagger.durability = -50
+        self.dagger.restore()
+        self.assertEqual(self.recorder.events[1:], [("destroyed", "Dagger"), ("repaired", "Dagger")])
+
+    def test_straight_to_destroyed(self):
+        self.dagger.durability = -60
+        self.assertEqual(self.recorder.events, [("broken", "Dagger"), ("destroyed", "Dagger")])
+
+    def test_repair_roster(self):
+        dan = build_char("human", "warrior", "Dan")
+        dan.weapon = self.dagger
+        dan.armor = make_armor("chain")
+        self.dagger.durability = 0
+        dan.armor.durability = 70
+        self.recorder.events.clear()
+
+        repaired = repair_roster([dan, build_char("elf", "magician")], 10)
+        self.assertEqual(repaired, [self.dagger])
+        self.assertEqual((self.dagger.durability, dan.armor.durability), (10, 75))
+        self.assertEqual(self.recorder.events, [("bulk", ["Dagger"])])
+
+    def test_simulated_gear_is_quiet(self):
+        fighter = build_fighter({"race": "human", "class": "warrior", "weapon": "dagger", "armor": "chain"})
+        dan = build_char("human", "warrior", "Dan")
+        dan.weapon = self.dagger
+        twin = dan.fork()
+        for item in (*fighter.equipment[:2], twin.weapon):
+            item.durability = -100
+        self.assertEqual(repair_roster([fighter, twin]), [fighter.weapon, fighter.armor, twin.weapon])
+        self.assertEqual(self.recorder.events, [])
+        self.assertFalse(self.dagger.quiet)
+
+
+class TestEventBus(TestCase):
+    def test_subscribe_during_emit(self):
+        bus = EventBus()
+        late = Recorder()
+        class Subscriber:
+            def on_itembroken(self, item):
+                bus.subscribe("itembroken", late)
+        bus.subscribe("itembroken", Subscriber())
+        bus.emit("itembroken", make_weapon("dagger"))
+        self.assertTrue(bus.is_subscribed("itembroken", late))
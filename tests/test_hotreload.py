@@ -0,0 +1,94 @@
+import copy
+import json
+import os
+import tempfile
+import time
+import hotreload as hr
+import validator as vd
+
+from unittest import TestCase
+from unittest.mock import patch
+from charfactory import TEMPLATES, build_char
+from dataloader import GAME_DATA
+from equipfactory import make_weapon
+from eventbus import MAIN_BUS
+
+
+class TestHotReload(TestCase):
+    def setUp(self):
+        self.original = copy.deepcopy(GAME_DATA)
+        self.tmp = tempfile.TemporaryDirectory()
+        self.patches = [
+            patch.object(vd, "DATA_DIR", self.tmp.name),
+            patch.object(vd, "CACHE_DIR", os.path.join(self.tmp.name, ".cache"))
+        ]
+        for p in self.patches:
+            p.start()
+        self.diffs = []
+        MAIN_BUS.subscribe("datareload", self)
+
+    def tearDown(self):
+        MAIN_BUS.unsubscribe("datareload", self)
+        self.write(self.original)
+        hr.reload_data()
+        for p in self.patches:
+            p.stop()
+        self.tmp.cleanup()
+
+    def on_datareload(self, diff):
+        self.diffs.append(diff)
+
+    def write(self, data: dict):
+        with open(os.path.join(self.tmp.name, "chardata.json"), "w") as f:
+            json.dump(data, f)
+
+    def test_targeted_reload(self):
+        build_char("human", "warrior")
+        build_char("elf", "magician")
+        self.assertEqual(make_weapon("dagger").atp, 10)
+
+        data = copy.deepcopy(self.original)
+        data["weapons"]["dagger"]["atp"] = 15
+        data["weapons"]["dagger"]["crit"] = "effect bleed 3"
+        data["races"]["human"]["stats"]["str"] = 40
+        self.write(data)
+        diff = hr.reload_data()
+
+        self.assertEqual(diff, {"weapons": {"dagger"}, "races": {"human"}})
+        self.assertEqual(self.diffs, [diff])
+        self.assertNotIn(("human", "warrior"), TEMPLATES)
+        self.assertIn(("elf", "magician"), TEMPLATES)
+        self.assertEqual(build_char("human", "warrior").strength, 45)
+        dagger = make_weapon("dagger")
+        self.assertEqual((dagger.atp, dagger.crit_action.name), (15, "bleed"))
+
+    def test_bad_data_is_ignored(self):
+        data = copy.deepcopy(self.original)
+        data["weapons"]["dagger"]["crit"] = "effect frenzy 1"
+        self.write(data)
+        with self.assertRaises(vd.DataValidationError):
+            hr.reload_data()
+        self.assertEqual(GAME_DATA, self.original)
+        self.assertEqual(self.diffs, [])
+
+    def test_watcher_thread_dispatches_reloads(self):
+        self.write(self.original)
+        watcher = hr.DataWatcher()
+        watcher.path = os.path.join(self.tmp.name, "chardata.json")
+        watcher.mtime = watcher.current_mtime()
+        dispatched = []
+        watcher.start(0.01, dispatched.append)
+        try:
+            data = copy.deepcopy(self.original)
+            data["armor"]["chain"]["defense"] += 1
+            self.write(data)
+            for _ in range(500):
+                if dispatched:
+                    break
+                time.sleep(0.01)
+        finally:
+            watcher.stop()
+
+        self.assertEqual(self.diffs, [])
+        self.assertEqual(dispatched[0](), {"armor": {"chain"}})
+        self.assertEqual(self.diffs, [{"armor": {"chain"}}])
@@ -0,0 +1,42 @@
+import tracemalloc
+import effects as ef
+
+from unittest import TestCase
+from character import BaseStats, DamageType
+from equip import ArmorStats, ImplementStats, WeaponStats
+
+#Bytes per live object, including the list slot holding it.
+#Instance dicts cost another 30-90 bytes on top of each of these.
+BUDGETS = (
+    ("Damage", lambda: ef.Damage("2d6", DamageType.BODY), 100),
+    ("Burn", lambda: ef.Burn(3), 100),
+    ("Shield", lambda: ef.Shield(3, 10), 80),
+    ("Might", lambda: ef.Might(3), 210),
+    ("BaseStats", lambda: BaseStats(), 140),
+    ("WeaponStats", lambda: WeaponStats(10, 10, "Sword", "1d6"), 120),
+    ("ArmorStats", lambda: ArmorStats(10, 10, "Mail", 3), 90),
+    ("ImplementStats", lambda: ImplementStats(10, 10, "Rod", 5, "1d6"), 100)
+)
+
+def bytes_per_object(make, count=2000) -> float:
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        objs = [make() for _ in range(count)]
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    del objs
+    return (after - before) / count
+
+
+class TestMemory(TestCase):
+    def test_no_instance_dicts(self):
+        for name, make, _ in BUDGETS:
+            with self.subTest(name):
+                self.assertFalse(hasattr(make(), "__dict__"))
+
+    def test_budgets(self):
+        for name, make, budget in BUDGETS:
+            with self.subTest(name):
+                self.assertLessEqual(bytes_per_object(make), budget)
@@ -0,0 +1,49 @@
+import copy
+import preview as pv
+
+from unittest import TestCase
+from dataloader import GAME_DATA
+from simulation import build_fighter
+
+
+class TestPreview(TestCase):
+    def test_matches_built_characters(self):
+        table = pv.preview_table()
+        self.assertEqual(
+            len(table),
+            len(GAME_DATA["races"]) * (len(GAME_DATA["classes"]) + 1) * len(list(pv.loadouts()))
+        )
+        for (race, class_id, (weapon, armor, implement)), prev in table.items():
+            if class_id is None:
+                continue
+            fighter = build_fighter({
+                "race": race, "class": class_id,
+                "weapon": weapon, "armor": armor, "implement": implement
+            })
+            self.assertEqual(prev.stats, fighter.stats)
+            for field in pv.DERIVED_FIELDS + pv.VITAL_FIELDS:
+                self.assertEqual(getattr(prev, field), getattr(fighter, field))
+
+    def test_race_only(self):
+        prev = pv.preview("human")
+        self.assertEqual(prev.name, "Human")
+        self.assertEqual(prev.stats.strength, GAME_DATA["races"]["human"]["stats"]["str"])
+
+    def test_compare_and_invalidate(self):
+        rows = pv.compare(["human", "dwarf"], [None, "warrior"])
+        self.assertEqual([r.name for r in rows], ["Human", "Human warrior", "Dvergr", "Dvergr warrior"])
+
+        pv.invalidate_previews({"weapons": {"dagger"}})
+        self.assertEqual(pv.PREVIEWS, {})
+        pv.preview_table()
+        pv.invalidate_previews({"unrelated": {"x"}})
+        self.assertNotEqual(pv.PREVIEWS, {})
+
+    def test_other_data(self):
+        data = copy.deepcopy(GAME_DATA)
+        data["races"]["human"]["stats"]["str"] += 10
+        table = pv.build_previews(data, with_loadouts=False)
+        self.assertEqual(
+            table[("human", None, pv.NO_LOADOUT)].stats.strength,
+            pv.preview("human").stats.strength + 10
+        )
@@ -0,0 +1,79 @@
+import os
+import random
+import tempfile
+
+from unittest import TestCase
+from ratings import (
+    DEFAULT_RATING, FightResult, RatingLadder, archetype_keys, expected_score, fight_stream
+)
+
+WARRIOR = {"race": "human", "class": "warrior", "weapon": "dagger"}
+MAGICIAN = {"race": "dwarf", "class": "magician"}
+
+
+class TestRatings(TestCase):
+    def test_expected_score(self):
+        self.assertEqual(expected_score(1500, 1500), 0.5)
+        self.assertAlmostEqual(expected_score(1900, 1500), 10 / 11)
+
+    def test_update_is_zero_sum(self):
+        ladder = RatingLadder(flush_every=1)
+        ladder.record(FightResult(WARRIOR, MAGICIAN, 1.0, "A", "B"))
+        for kind, key_a, key_b in (
+            ("race", "human", "dwarf"),
+            ("build", archetype_keys(WARRIOR)["build"], archetype_keys(MAGICIAN)["build"]),
+            ("character", "A", "B")
+        ):
+            a, b = ladder.rating(kind, key_a), ladder.rating(kind, key_b)
+            self.assertAlmostEqual(a.rating, DEFAULT_RATING + 12)
+            self.assertAlmostEqual(a.rating + b.rating, 2 * DEFAULT_RATING)
+            self.assertEqual((a.games, b.games), (1, 1))
+
+    def test_mirror_archetypes_skipped(self):
+        ladder = RatingLadder()
+        ladder.record(FightResult(WARRIOR, {"race": "human", "class": "magician"}, 0.0))
+        self.assertEqual(ladder.rating("race", "human").games, 0)
+        self.assertEqual(ladder.rating("class", "warrior").games, 1)
+
+    def test_characters_need_names(self):
+        ladder = RatingLadder()
+        plain = {"race": "human", "class": "warrior"}
+        ladder.consume(fight_stream([(WARRIOR, plain)], 10, seed=1))
+        self.assertEqual(ladder.leaderboard("character"), [])
+        self.assertEqual(ladder.rating("loadout", "dagger/-/-").games, 10)
+
+        named = [({**WARRIOR, "name": "Dan"}, {**plain, "name": "Ann"})]
+        ladder.consume(fight_stream(named, 10, seed=1))
+        self.assertEqual(sorted(r.key for r in ladder.leaderboard("character")), ["Ann", "Dan"])
+
+    def test_stream_leaves_global_rng_alone(self):
+        random.seed(8)
+        before = random.getstate()
+        first = [r.outcome for r in fight_stream([(WARRIOR, MAGICIAN)], 20, seed=4)]
+        self.assertEqual(random.getstate(), before)
+        self.assertEqual([r.outcome for r in fight_stream([(WARRIOR, MAGICIAN)], 20, seed=4)], first)
+
+    def test_stream_persist_and_compact(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "ladder.db")
+            ladder = RatingLadder(path, flush_every=100)
+            count = ladder.consume(fight_stream([(WARRIOR, MAGICIAN)], 300, seed=4))
+            self.assertEqual(count, 300)
+            board = ladder.leaderboard("build")
+            self.assertEqual([r.games for r in board], [300, 300])
+            self.assertGreater(board[0].rating, board[1].rating)
+            self.assertEqual(ladder.logged(), 300)
+
+            ladder.compact(keep=10)
+            self.assertEqual(ladder.logged(), 10)
+            freed = ladder.conn.execute("PRAGMA freelist_count").fetchone()[0]
+            self.assertGreater(freed, 0)
+            ladder.compact(keep=10, vacuum=True)
+            self.assertEqual(ladder.conn.execute("PRAGMA freelist_count").fetchone()[0], 0)
+            ladder.close()
+
+            reopened = RatingLadder(path)
+            self.assertEqual(reopened.leaderboard("build"), board)
+            reopened.consume(fight_stream([(WARRIOR, MAGICIAN)], 1, seed=5))
+            self.assertEqual(reopened.rating("class", "warrior").games, 301)
+            reopened.close()
@@ -0,0 +1,93 @@
+import aggregate
+import os
+import random
+import resultcache as rc
+import tempfile
+
+from types import SimpleNamespace
+from unittest import TestCase
+from unittest.mock import patch
+from campaign import Campaign, sweep_units
+from resultcache import ResultCache
+from simulation import aggregate_batch
+from validator import source_digest
+from workqueue import run_shard
+
+WARRIOR = {"race": "human", "class": "warrior", "weapon": "dagger"}
+MAGICIAN = {"race": "dwarf", "class": "magician"}
+
+
+class TestResultCache(TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = ResultCache(os.path.join(self.tmp.name, "results.db"))
+
+    def tearDown(self):
+        self.cache.close()
+        self.tmp.cleanup()
+
+    def test_hit_matches_fresh_run(self):
+        fresh = aggregate_batch(WARRIOR, MAGICIAN, 200, 8).summary()
+        self.assertEqual(self.cache.aggregate(WARRIOR, MAGICIAN, 200, 8).summary(), fresh)
+        self.assertEqual(self.cache.aggregate(WARRIOR, MAGICIAN, 200, 8).summary(), fresh)
+        self.assertEqual((self.cache.misses, self.cache.hits), (1, 1))
+        self.cache.aggregate(WARRIOR, MAGICIAN, 200, 9)
+        self.assertEqual(self.cache.misses, 2)
+
+    def test_larger_sample_extends(self):
+        self.cache.aggregate(WARRIOR, MAGICIAN, 100, 8)
+        extended = self.cache.aggregate(WARRIOR, MAGICIAN, 300, 8)
+        self.assertEqual(self.cache.extended, 1)
+        self.assertEqual(extended.summary(), aggregate_batch(WARRIOR, MAGICIAN, 300, 8).summary())
+        self.assertEqual(len(self.cache), 2)
+
+    def test_rules_version_is_part_of_key(self):
+        self.cache.aggregate(WARRIOR, MAGICIAN, 50, 1)
+        with patch("resultcache.RULES_VERSION", 2):
+            self.cache.aggregate(WARRIOR, MAGICIAN, 50, 1)
+        self.assertEqual(self.cache.misses, 2)
+
+    def test_lru_eviction(self):
+        for seed in range(3):
+            self.cache.aggregate(WARRIOR, MAGICIAN, 20, seed)
+        one = self.cache.size() // 3
+        self.cache.aggregate(WARRIOR, MAGICIAN, 20, 0)
+        self.cache.max_bytes = 2 * one + one // 2
+        self.cache.aggregate(WARRIOR, MAGICIAN, 20, 3)
+        self.assertLessEqual(self.cache.size(), self.cache.max_bytes)
+        self.cache.aggregate(WARRIOR, MAGICIAN, 20, 0)
+        self.assertEqual(self.cache.hits, 2)
+        self.cache.aggregate(WARRIOR, MAGICIAN, 20, 1)
+        self.assertEqual(self.cache.misses, 5)
+
+    def test_hit_leaves_rng_like_a_fresh_run(self):
+        self.cache.aggregate(WARRIOR, MAGICIAN, 30, 4)
+        after_run = random.getstate()
+        random.seed(99)
+        self.cache.aggregate(WARRIOR, MAGICIAN, 30, 4)
+        self.assertEqual(self.cache.hits, 1)
+        self.assertEqual(random.getstate(), after_run)
+
+    def test_rules_digest_follows_source(self):
+        path = os.path.join(self.tmp.name, "rules.py")
+        module = SimpleNamespace(__file__=path)
+        with open(path, "w") as f:
+            f.write("ARMOR = 1\n")
+        before = source_digest((module,))
+        with open(path, "w") as f:
+            f.write("ARMOR = 2\n")
+        self.assertNotEqual(source_digest((module,)), before)
+        self.assertEqual(rc.RULES_VERSION, source_digest(rc.RULES_MODULES))
+        self.assertIn(aggregate, rc.RULES_MODULES)
+
+    def test_shared_by_campaigns_and_workers(self):
+        path = os.path.join(self.tmp.name, "results.db")
+        units = sweep_units([(WARRIOR, MAGICIAN)], 60, 5)
+        first = Campaign(os.path.join(self.tmp.name, "a"), units, 25, path).merged()
+        with patch("campaign.aggregate_fights", side_effect=AssertionError("simulated again")):
+            second = Campaign(os.path.join(self.tmp.name, "b"), units, 25, path).merged()
+        self.assertEqual(second.summary(), first.summary())
+        with patch("workqueue.aggregate_batch", side_effect=AssertionError("simulated again")):
+            shard = run_shard(units[0], self.cache)
+        self.assertEqual(shard.summary(), aggregate_batch(WARRIOR, MAGICIAN, 60, 5).summary())
+        self.assertEqual(self.cache.hits, 1)
@@ -0,0 +1,67 @@
+import random
+
+from array import array
+from unittest import TestCase
+from rosterindex import RosterIndex
+from sharedroster import SharedRoster
+from simulation import build_fighter
+
+
+def synthetic(count: int, seed: int=0) -> RosterIndex:
+    rng = random.Random(seed)
+    columns = {
+        name: array('i', (rng.randint(1, 60) for _ in range(count)))
+        for name in ("strength", "speed", "atp")
+    }
+    return RosterIndex([f"Char {i}" for i in range(count)], columns, lambda r: r)
+
+
+class TestRosterIndex(TestCase):
+    def setUp(self):
+        self.index = synthetic(100_000)
+        self.cols = self.index.columns
+
+    def test_sort_and_page(self):
+        view = self.index.view("speed")
+        self.assertEqual(len(view), 100_000)
+        speeds = [row[2] for row in view.page(50_000, 25)]
+        self.assertEqual(speeds, sorted(speeds))
+        self.assertEqual(view.page(0, 1)[0][2], min(self.cols["speed"]))
+
+        desc = self.index.view("speed", descending=True)
+        self.assertEqual(desc.page(0, 1)[0][2], max(self.cols["speed"]))
+        self.assertEqual(len(view.page(99_990, 25)), 10)
+
+    def test_filters_match_brute_force(self):
+        filters = [("strength", 10, 20), ("atp", 50, None)]
+        want = [
+            r for r in range(100_000)
+            if 10 <= self.cols["strength"][r] <= 20 and self.cols["atp"][r] >= 50
+        ]
+        for sort in (None, "strength", "speed", "name"):
+            with self.subTest(sort):
+                view = self.index.view(sort, filters=filters)
+                self.assertEqual(sorted(view.rows), want)
+                if sort and sort != "name":
+                    values = [self.cols[sort][r] for r in view.rows]
+                    self.assertEqual(values, sorted(values))
+
+    def test_from_shared(self):
+        fighters = [build_fighter({"race": "human", "class": "warrior", "weapon": "dagger"}),
+                    build_fighter({"race": "dwarf", "class": "magician"})]
+        roster = SharedRoster.create(fighters)
+        try:
+            index = RosterIndex.from_shared(roster)
+            view = index.view("speed", descending=True)
+            self.assertEqual(view.page(0, 1)[0][0], max(fighters, key=lambda f: f.speed).name)
+            self.assertEqual(view.character(1).stats, min(fighters, key=lambda f: f.speed).stats)
+        finally:
+            roster.close()
+
+    def test_from_characters(self):
+        fighters = [build_fighter({"race": "human", "class": "warrior", "weapon": "dagger"}),
+                    build_fighter({"race": "human", "class": "warrior"})]
+        index = RosterIndex.from_characters(fighters)
+        view = index.view("atp", filters=[("atp", fighters[0].atp, None)])
+        self.assertIs(view.character(0), fighters[0])
+        self.assertEqual(len(view), 1 if fighters[0].atp > fighters[1].atp else 2)
@@ -0,0 +1,51 @@
+import copy
+
+from concurrent.futures import ProcessPoolExecutor
+from unittest import TestCase
+from dataloader import GAME_DATA
+from equipfactory import make_armor
+from sharedroster import SharedRoster, detach_all, run_shared_batch
+from simulation import build_fighter, run_batch
+
+
+class TestSharedRoster(TestCase):
+    def setUp(self):
+        self.specs = [
+            {"race": "human", "class": "warrior", "weapon": "dagger", "armor": "chain"},
+            {"race": "elf", "class": "magician", "implement": "brass rod"}
+        ]
+        self.fighters = [build_fighter(spec) for spec in self.specs]
+        self.fighters[0].body -= 4
+        self.fighters[0].armor.durability = 12
+        self.roster = SharedRoster.create(self.fighters)
+
+    def tearDown(self):
+        detach_all()
+        self.roster.close()
+
+    def test_round_trip(self):
+        for idx, fighter in enumerate(self.fighters):
+            self.assertEqual(self.roster.load(idx), fighter)
+
+    def test_batch_matches_specs(self):
+        self.roster.store(0, build_fighter(self.specs[0]))
+        shared = run_shared_batch(self.roster.handle, 0, 1, 50, 9)
+        self.assertEqual(shared, run_batch(self.specs[0], self.specs[1], 50, 9))
+
+    def test_worker_process(self):
+        self.roster.store(0, build_fighter(self.specs[0]))
+        with ProcessPoolExecutor(1) as pool:
+            shared = pool.submit(run_shared_batch, self.roster.handle, 0, 1, 50, 9).result()
+        self.assertEqual(shared, run_batch(self.specs[0], self.specs[1], 50, 9))
+
+    def test_items_found_by_build_id(self):
+        data = copy.deepcopy(GAME_DATA)
+        data["armor"]["chain copy"] = dict(data["armor"]["chain"], defense=0)
+        fighter = build_fighter({"race": "human", "class": "warrior"})
+        fighter.armor = make_armor("chain copy", data)
+        roster = SharedRoster.create([fighter], data)
+        try:
+            self.assertEqual(roster.load(0).armor.build_id, "chain copy")
+            self.assertEqual(roster.load(0).armor.defense, 0)
+        finally:
+            roster.close()
@@ -0,0 +1,60 @@
+import copy
+import os
+import tempfile
+import validator as vd
+
+from unittest import TestCase
+from unittest.mock import patch
+from crits import CRIT_CACHE
+from dataloader import GAME_DATA
+
+
+class TestValidator(TestCase):
+    def test_shipped_data_is_valid(self):
+        self.assertEqual(vd.validate(GAME_DATA), [])
+
+    def test_reports_everything(self):
+        data = copy.deepcopy(GAME_DATA)
+        data["weapons"]["dagger"]["crit"] = "effect frenzy 1"
+        data["weapons"]["maul"]["damage"] = "1d8+luck"
+        del data["armor"]["chain"]["durability"]
+        data["races"]["elf"]["stats"]["charm"] = 3
+        data["implements"]["oak staff"]["damage"] = "1d6+sklmod"
+
+        with self.assertRaises(vd.DataValidationError) as ctx:
+            vd.compile_data(data)
+        self.assertEqual(len(ctx.exception.errors), 5)
+
+    def test_weapon_damage_cant_use_weapon(self):
+        data = copy.deepcopy(GAME_DATA)
+        data["weapons"]["dagger"]["damage"] = "weapon+1"
+        self.assertEqual(vd.validate(data), ["weapon dagger: bad damage dice 'weapon+1'"])
+
+    def test_artifact_cache(self):
+        with tempfile.TemporaryDirectory() as cache_dir, patch.object(vd, "CACHE_DIR", cache_dir):
+            first = vd.load_verified()
+            with patch.object(vd, "validate") as revalidate:
+                second = vd.load_verified()
+            revalidate.assert_not_called()
+
+        self.assertEqual(first.digest, second.digest)
+        self.assertEqual(second.data, GAME_DATA)
+        for crit_str, action in second.crits.items():
+            self.assertIs(CRIT_CACHE[crit_str], action)
+
+    def test_code_changes_rebuild_artifacts(self):
+        with tempfile.TemporaryDirectory() as cache_dir, patch.object(vd, "CACHE_DIR", cache_dir):
+            vd.load_verified()
+            with patch.object(vd, "CODE_VERSION", "edited"), patch.object(vd, "validate", wraps=vd.validate) as check:
+                vd.load_verified()
+            check.assert_called_once()
+            self.assertEqual(len(os.listdir(cache_dir)), 2)
+
+    def test_unloadable_artifacts_are_rebuilt(self):
+        with tempfile.TemporaryDirectory() as cache_dir, patch.object(vd, "CACHE_DIR", cache_dir):
+            path = vd.artifact_path(vd.load_verified().digest, vd.CODE_VERSION)
+            for stale in (b"cno_such_module\nThing\n.", b"ccollections\nOrderedDict\n(I1\nI2\ntR."):
+                with self.subTest(stale):
+                    with open(path, "wb") as f:
+                        f.write(stale)
+                    self.assertEqual(vd.load_verified().data, GAME_DATA)
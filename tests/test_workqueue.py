@@ -0,0 +1,70 @@
+import os
+import tempfile
+
+from multiprocessing import Process
+from unittest import TestCase
+from aggregate import Aggregator
+from simulation import MAX_TURNS
+import workqueue as wq
+
+WARRIOR = {"race": "human", "class": "warrior", "weapon": "dagger"}
+MAGICIAN = {"race": "dwarf", "class": "magician"}
+WARLOCK = {"race": "elf", "class": "warlock"}
+PAIRS = [(WARRIOR, MAGICIAN), (MAGICIAN, WARLOCK)]
+
+
+def worker_main(path: str, worker_id: str):
+    wq.work(wq.SQLiteQueue(path), worker_id)
+
+
+class TestWorkQueue(TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "queue.db")
+        self.queue = wq.SQLiteQueue(self.path)
+        self.units = wq.shard_units(PAIRS, 100, 9, 30)
+
+    def tearDown(self):
+        self.queue.close()
+        self.tmp.cleanup()
+
+    def test_shards(self):
+        self.assertEqual([u.fights for u in self.units], [30, 30, 30, 10] * 2)
+        self.assertEqual([u.seed for u in self.units], list(range(9, 17)))
+        with self.assertRaises(ValueError):
+            wq.shard_units(PAIRS, 100, 9, 0)
+
+    def test_workers_match_serial(self):
+        self.queue.put(self.units)
+        self.queue.put(self.units)
+        self.assertEqual(self.queue.remaining(), len(self.units))
+
+        workers = [Process(target=worker_main, args=(self.path, f"w{i}")) for i in range(3)]
+        for p in workers:
+            p.start()
+        for p in workers:
+            p.join(30)
+        merged = wq.collect(self.queue, poll=0.05, timeout=5)
+
+        serial = Aggregator(MAX_TURNS)
+        for unit in self.units:
+            serial.merge(wq.run_shard(unit))
+        self.assertEqual(merged.summary(), serial.summary())
+
+    def test_expired_lease_is_redelivered_once(self):
+        self.queue.put(self.units[:2])
+        lost = self.queue.claim("dead", lease=-1)
+        self.assertEqual(wq.work(self.queue, "alive"), 2)
+        self.assertEqual(self.queue.attempts()[lost.unit_id], 2)
+
+        #The dead worker turns out to be alive after all; its late result is dropped.
+        self.assertFalse(self.queue.complete(lost.unit_id, "dead", wq.run_shard(lost)))
+        self.assertEqual(len(list(self.queue.results())), 2)
+        self.assertEqual(self.queue.remaining(), 0)
+
+    def test_leased_shards_are_not_handed_out(self):
+        self.queue.put(self.units[:1])
+        self.assertIsNotNone(self.queue.claim("a"))
+        self.assertIsNone(self.queue.claim("b"))
+        with self.assertRaises(TimeoutError):
+            wq.collect(self.queue, poll=0.01, timeout=0.05)
@@ -0,0 +1,183 @@
+"""
+Checks a game data file in one pass and compiles everything in it.
+
+`load_verified` is the production entry point; `dataloader.GAME_DATA`
+comes from it on first use. It hashes the file together with the source
+of the code that checks and compiles it (`CODE_VERSION`), and reuses a
+pickled, already-compiled artifact from `data/.cache` when one exists for
+that hash. Otherwise it validates the file, compiles every crit, and
+writes the artifact for next time.
+"""
+import combat
+import crits
+import effects
+import hashlib
+import json
+import os
+import pickle
+import re
+import sys
+
+from collections import namedtuple
+from crits import CRIT_CACHE, BadCritError, CritAction, compile_crit
+from dataloader import DATA_DIR
+from typing import Dict, List
+
+CACHE_DIR = os.path.join(DATA_DIR, ".cache")
+
+STAT_KEYS = ("str", "stam", "spd", "skl", "sag", "smt", "melee", "magic")
+PURE_DICE_PATTERN = re.compile(r"^(?:[+-]?(?:\d+d\d+|\d+))+$")
+#Like `CRIT_DICE_PATTERN`, but a weapon's own damage can't refer to `weapon`.
+WEAPON_DICE_PATTERN = re.compile(r"^(?:[+-]?(?:\d+d\d+|\d+|imp|sklmod|strmod))+$")
+
+CompiledData = namedtuple('CompiledData', ('digest', 'data', 'crits'))
+
+class DataValidationError(Exception):
+    """Custom exception listing everything wrong with a data file."""
+    def __init__(self, errors: List[str]):
+        super().__init__("\n".join(errors))
+        self.errors = errors
+
+def check_int(errors: List[str], where: str, entry: dict, key: str, minimum=None, required=True):
+    if not key in entry:
+        if required:
+            errors.append(f"{where}: missing {key}")
+        return
+    value = entry[key]
+    if not isinstance(value, int) or isinstance(value, bool):
+        errors.append(f"{where}: {key} should be an integer, got {value!r}")
+    elif minimum is not None and value < minimum:
+        errors.append(f"{where}: {key} should be at least {minimum}, got {value}")
+
+def check_name(errors: List[str], where: str, entry: dict):
+    if not isinstance(entry.get("name"), str):
+        errors.append(f"{where}: missing name")
+
+def check_stats(errors: List[str], where: str, entry: dict, complete: bool):
+    stats = entry.get("stats")
+    if not isinstance(stats, dict):
+        errors.append(f"{where}: missing stats")
+        return
+    for key in stats:
+        if not key in STAT_KEYS:
+            errors.append(f"{where}: unknown stat {key}")
+    for key in STAT_KEYS:
+        check_int(errors, where, stats, key, required=complete)
+
+def check_dice(errors: List[str], where: str, entry: dict, pattern: re.Pattern):
+    d_str = entry.get("damage")
+    if not isinstance(d_str, str):
+        errors.append(f"{where}: missing damage")
+    elif not pattern.match(d_str):
+        errors.append(f"{where}: bad damage dice {d_str!r}")
+
+def validate(data: dict) -> List[str]:
+    """Returns every problem found in `data`; an empty list means it's good."""
+    errors = []
+    for section in ("classes", "races", "weapons", "armor", "implements"):
+        if not isinstance(data.get(section), dict):
+            errors.append(f"missing section {section}")
+    if errors:
+        return errors
+
+    for build_id, entry in data["classes"].items():
+        check_stats(errors, f"class {build_id}", entry, complete=False)
+    for build_id, entry in data["races"].items():
+        where = f"race {build_id}"
+        check_name(errors, where, entry)
+        check_stats(errors, where, entry, complete=True)
+    for build_id, entry in data["weapons"].items():
+        where = f"weapon {build_id}"
+        check_name(errors, where, entry)
+        check_int(errors, where, entry, "durability", 1)
+        check_int(errors, where, entry, "atp", required=False)
+        check_dice(errors, where, entry, WEAPON_DICE_PATTERN)
+        if not isinstance(entry.get("crit"), str):
+            errors.append(f"{where}: missing crit")
+        else:
+            try:
+                compile_crit(entry["crit"])
+            except BadCritError as e:
+                errors.append(f"{where}: {e}")
+    for build_id, entry in data["armor"].items():
+        where = f"armor {build_id}"
+        check_name(errors, where, entry)
+        check_int(errors, where, entry, "durability", 1)
+        check_int(errors, where, entry, "defense", 0)
+    for build_id, entry in data["implements"].items():
+        where = f"implement {build_id}"
+        check_name(errors, where, entry)
+        check_int(errors, where, entry, "durability", 1)
+        check_int(errors, where, entry, "pwr")
+        check_dice(errors, where, entry, PURE_DICE_PATTERN)
+
+    return errors
+
+def compile_data(data: dict, digest: str="") -> CompiledData:
+    """
+    Validates and compiles `data`.
+    Raises `DataValidationError` if anything is wrong.
+    """
+    errors = validate(data)
+    if errors:
+        raise DataValidationError(errors)
+
+    actions: Dict[str, CritAction] = {
+        entry["crit"]: compile_crit(entry["crit"]) for entry in data["weapons"].values()
+    }
+    return CompiledData(digest, data, actions)
+
+def source_digest(modules) -> str:
+    """Hashes the source of `modules`."""
+    digest = hashlib.sha256()
+    for module in modules:
+        with open(module.__file__, "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+#Modules holding the checks and every class pickled into an artifact.
+#Any edit to them changes every artifact's name.
+CODE_MODULES = (sys.modules[__name__], combat, crits, effects)
+CODE_VERSION = source_digest(CODE_MODULES)
+
+def file_digest(raw: bytes) -> str:
+    return hashlib.sha256(raw).hexdigest()
+
+def artifact_path(digest: str, code_version: str) -> str:
+    key = hashlib.sha256(f"{digest}:{code_version}".encode()).hexdigest()
+    return os.path.join(CACHE_DIR, f"{key}.pickle")
+
+def prime(compiled: CompiledData):
+    """Seeds the crit cache with precompiled actions so weapons never parse crit strings."""
+    CRIT_CACHE.update(compiled.crits)
+
+def load_verified(filename: str="chardata.json", use_cache: bool=True) -> CompiledData:
+    """
+    Loads `filename` from data/, verified and compiled, and primes the crit cache.
+    Artifacts are keyed by the file's content hash and `CODE_VERSION`, so edits
+    to either are picked up automatically and unchanged files never get re-validated.
+    """
+    with open(os.path.join(DATA_DIR, filename), "rb") as f:
+        raw = f.read()
+    digest = file_digest(raw)
+    path = artifact_path(digest, CODE_VERSION)
+
+    compiled = None
+    if use_cache and os.path.exists(path):
+        try:
+            with open(path, "rb") as f:
+                compiled = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError, TypeError, ValueError):
+            compiled = None
+
+    if compiled is None:
+        compiled = compile_data(json.loads(raw), digest)
+        if use_cache:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            tmp = f"{path}.{os.getpid()}.tmp"
+            with open(tmp, "wb") as f:
+                pickle.dump(compiled, f)
+            os.replace(tmp, path)
+
+    prime(compiled)
+    return compiled
@@ -0,0 +1,192 @@
+"""
+Fan-out of simulation work across machines through a pluggable queue.
+
+A coordinator splits matchups into shards: `campaign.WorkUnit`s, each one
+matchup over one seed range. It puts them on a `WorkQueue`. Worker processes
+claim shards, run them with the usual combat code and complete them with a
+pickled `Aggregator`. The coordinator merges the results in shard
+order, so the outcome doesn't depend on how many workers ran or in which
+order.
+
+Delivery is at-least-once. A claim is a lease, and a shard whose worker
+dies before completing is handed out again when the lease runs out. The
+first result stored for a shard wins; later duplicates are dropped.
+
+`SQLiteQueue` is for worker processes on one host. It uses SQLite's WAL
+mode, which doesn't work over network filesystems, so it can't be shared
+between machines. A backend that spans nodes only needs the `WorkQueue`
+methods.
+"""
+import pickle
+import sqlite3
+import time
+
+from aggregate import Aggregator
+from campaign import WorkUnit
+from resultcache import ResultCache
+from simulation import MAX_TURNS, aggregate_batch
+from typing import Dict, Iterator, List, Optional
+
+DEFAULT_LEASE = 300.0
+
+def shard_units(pairs: List[tuple], fights: int, seed: int, shard_fights: int) -> List[WorkUnit]:
+    """
+    Splits each `(first_spec, second_spec)` pair into shards of at most `shard_fights`.
+    Shard `i` is seeded `seed + i`.
+    """
+    if shard_fights < 1:
+        raise ValueError(f"shard_fights should be at least 1, got {shard_fights}")
+    units = []
+    for first, second in pairs:
+        for start in range(0, fights, shard_fights):
+            unit_id = len(units)
+            units.append(WorkUnit(unit_id, first, second, min(shard_fights, fights - start), seed + unit_id))
+    return units
+
+def run_shard(unit: WorkUnit, cache: Optional[ResultCache]=None) -> Aggregator:
+    if cache is not None:
+        return cache.aggregate(unit.first, unit.second, unit.fights, unit.seed)
+    return aggregate_batch(unit.first, unit.second, unit.fights, unit.seed)
+
+class WorkQueue:
+    """
+    Interface for work queue backends.
+    This is an abstract class.
+    """
+
+    def put(self, units: List[WorkUnit]):
+        """Adds `units`. Units whose ids are already queued are ignored."""
+        pass
+
+    def claim(self, worker_id: str, lease: float=DEFAULT_LEASE) -> Optional[WorkUnit]:
+        """Leases a shard that is neither done nor leased, or `None` if there's nothing to claim."""
+        pass
+
+    def complete(self, unit_id: int, worker_id: str, result: Aggregator) -> bool:
+        """Stores the result for `unit_id`. Returns `False` if it was already done."""
+        pass
+
+    def remaining(self) -> int:
+        """Shards without a result yet."""
+        pass
+
+    def results(self) -> Iterator[Aggregator]:
+        """Stored results, in shard order."""
+        pass
+
+class SQLiteQueue(WorkQueue):
+    """`WorkQueue` in an SQLite database file shared by worker processes on one host."""
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS shards (
+        unit_id INTEGER PRIMARY KEY,
+        payload BLOB NOT NULL,
+        worker TEXT,
+        lease_until REAL NOT NULL DEFAULT 0,
+        attempts INTEGER NOT NULL DEFAULT 0
+    );
+    CREATE TABLE IF NOT EXISTS results (
+        unit_id INTEGER PRIMARY KEY,
+        worker TEXT NOT NULL,
+        payload BLOB NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS shards_lease ON shards (lease_until);
+    """
+
+    def __init__(self, path: str, timeout: float=30.0):
+        self.path = path
+        self.conn = sqlite3.connect(path, timeout=timeout, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(self.SCHEMA)
+
+    def put(self, units: List[WorkUnit]):
+        self.conn.execute("BEGIN IMMEDIATE")
+        self.conn.executemany(
+            "INSERT OR IGNORE INTO shards (unit_id, payload) VALUES (?, ?)",
+            ((unit.unit_id, pickle.dumps(unit)) for unit in units)
+        )
+        self.conn.execute("COMMIT")
+
+    def claim(self, worker_id: str, lease: float=DEFAULT_LEASE) -> Optional[WorkUnit]:
+        now = time.time()
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = self.conn.execute(
+                """
+                SELECT unit_id, payload FROM shards
+                WHERE lease_until < ? AND unit_id NOT IN (SELECT unit_id FROM results)
+                ORDER BY unit_id LIMIT 1
+                """,
+                (now,)
+            ).fetchone()
+            if row is None:
+                return None
+            self.conn.execute(
+                "UPDATE shards SET worker = ?, lease_until = ?, attempts = attempts + 1 WHERE unit_id = ?",
+                (worker_id, now + lease, row[0])
+            )
+            return pickle.loads(row[1])
+        finally:
+            self.conn.execute("COMMIT")
+
+    def complete(self, unit_id: int, worker_id: str, result: Aggregator) -> bool:
+        cursor = self.conn.execute(
+            "INSERT OR IGNORE INTO results VALUES (?, ?, ?)",
+            (unit_id, worker_id, pickle.dumps(result))
+        )
+        return cursor.rowcount == 1
+
+    def remaining(self) -> int:
+        return self.conn.execute(
+            "SELECT COUNT(*) FROM shards WHERE unit_id NOT IN (SELECT unit_id FROM results)"
+        ).fetchone()[0]
+
+    def results(self) -> Iterator[Aggregator]:
+        cursor = self.conn.execute("SELECT payload FROM results ORDER BY unit_id")
+        return (pickle.loads(row[0]) for row in cursor)
+
+    def attempts(self) -> Dict[int, int]:
+        """How many times each shard was claimed; more than once means it was redelivered."""
+        return dict(self.conn.execute("SELECT unit_id, attempts FROM shards"))
+
+    def close(self):
+        self.conn.close()
+
+def work(
+    queue: WorkQueue,
+    worker_id: str,
+    lease: float=DEFAULT_LEASE,
+    max_shards: Optional[int]=None,
+    cache: Optional[ResultCache]=None
+) -> int:
+    """
+    Claims and runs shards until none are left to claim (or `max_shards` ran).
+    Shards already in `cache` aren't simulated again.
+    Returns how many shards this worker completed first.
+    """
+    completed = 0
+    ran = 0
+    while max_shards is None or ran < max_shards:
+        unit = queue.claim(worker_id, lease)
+        if unit is None:
+            break
+        ran += 1
+        if queue.complete(unit.unit_id, worker_id, run_shard(unit, cache)):
+            completed += 1
+    return completed
+
+def collect(queue: WorkQueue, poll: float=1.0, timeout: Optional[float]=None) -> Aggregator:
+    """
+    Waits until every shard has a result, then merges them in shard order.
+    Raises `TimeoutError` if `timeout` seconds pass first.
+    """
+    deadline = None if timeout is None else time.monotonic() + timeout
+    while queue.remaining():
+        if deadline is not None and time.monotonic() > deadline:
+            raise TimeoutError(f"{queue.remaining()} shards still running")
+        time.sleep(poll)
+
+    total = Aggregator(MAX_TURNS)
+    for result in queue.results():
+        total.merge(result)
+    return total